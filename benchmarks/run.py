@@ -0,0 +1,258 @@
+"""LOCAST benchmark suite.
+
+Run from the repository root:
+
+    python benchmarks/run.py -o bench.json
+    python benchmarks/run.py --quick --compare bench.json   # compare against an earlier run
+
+Covers the scoring kernels, parameter bar HTML, chart figure construction,
+batch throughput and end-to-end reruns of the Streamlit page via AppTest.
+Results are written as JSON (median/min seconds per call, plus throughput
+where it applies) so runs from different commits can be compared.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import timeit
+from datetime import datetime, timezone
+
+import numpy as np
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from locast import (
+    calculate_suitability,
+    get_parameter_defaults,
+    param_ranges,
+    param_steps,
+    rules,
+    score_all_stages,
+    score_batch,
+)
+from locast.lut import score_batch_lut, tables
+
+STAGE = "Egg Laying"
+
+
+def measure(func, repeat=5, min_time=0.2):
+    """Time func(); returns per-call seconds for each repeat (timeit autoranging)"""
+    timer = timeit.Timer(func)
+    number, elapsed = timer.autorange()
+    if elapsed < min_time:
+        number = max(1, int(number * min_time / max(elapsed, 1e-9)))
+    return [seconds / number for seconds in timer.repeat(repeat=repeat, number=number)]
+
+
+def record(results, name, timings, items=None, **params):
+    """Add one benchmark result and print a summary line"""
+    entry = {
+        "name": name,
+        "params": params,
+        "median_s": statistics.median(timings),
+        "min_s": min(timings),
+        "repeat": len(timings),
+    }
+    if items:
+        entry["items_per_s"] = items / entry["median_s"]
+    results.append(entry)
+    rate = f"  {entry['items_per_s']:.3g} items/s" if items else ""
+    print(f"{name:<40} {entry['median_s'] * 1e3:10.4f} ms{rate}", file=sys.stderr)
+
+
+def default_inputs(stage):
+    return {param: get_parameter_defaults(param) for param in rules[stage].params}
+
+
+def random_columns(params, cells, seed=0):
+    rng = np.random.default_rng(seed)
+    # Drawn on each parameter's input grid, like sidebar or quantized telemetry readings
+    columns = {}
+    for param in params:
+        low, high = param_ranges[param]
+        step = param_steps[param]
+        columns[param] = np.round(low + rng.integers(0, round((high - low) / step) + 1, cells) * step, 1)
+    return columns
+
+
+def bench_kernels(results):
+    for stage in rules:
+        inputs = default_inputs(stage)
+        record(results, "calculate_suitability", measure(lambda: calculate_suitability(inputs, stage)), stage=stage)
+
+
+def bench_parameter_bars(results):
+    import streamlit_app
+
+    inputs = default_inputs(STAGE)
+    cache = streamlit_app.get_bar_cache()
+
+    def cold():
+        cache.clear()
+        streamlit_app.render_parameter_bars(inputs, STAGE)
+
+    record(results, "render_parameter_bars.cold", measure(cold), stage=STAGE, bars=len(inputs))
+    record(
+        results, "render_parameter_bars.cached",
+        measure(lambda: streamlit_app.render_parameter_bars(inputs, STAGE)), stage=STAGE, bars=len(inputs),
+    )
+    param, value = next(iter(inputs.items()))
+    record(
+        results, "create_parameter_bar.cached",
+        measure(lambda: streamlit_app.create_parameter_bar(param, value, STAGE)), stage=STAGE,
+    )
+
+
+def bench_chart(results):
+    import plotly.io as pio
+    import plotly.tools
+    import streamlit_app
+    from locast import parameter_suitability
+
+    inputs = default_inputs(STAGE)
+    record(
+        results, "build_chart_template",
+        measure(lambda: streamlit_app.build_chart_template(inputs, STAGE)), stage=STAGE,
+    )
+
+    fig = streamlit_app.build_chart_template(inputs, STAGE)
+
+    def patch_and_serialize():
+        # What render_chart and st.plotly_chart do per rerun once the template exists
+        fig.data[0].y = parameter_suitability(inputs, STAGE)
+        figure = plotly.tools.return_figure_from_figure_or_data(fig, validate_figure=True)
+        return pio.to_json(figure, validate=False)
+
+    record(results, "chart_patch_and_serialize", measure(patch_and_serialize), stage=STAGE)
+
+
+def bench_batch(results, sizes):
+    params = rules[STAGE].params
+    for cells in sizes:
+        columns = random_columns(params, cells)
+        repeat = 3 if cells >= 10**6 else 5
+        record(
+            results, "score_batch", measure(lambda: score_batch(columns, STAGE), repeat=repeat),
+            items=cells, stage=STAGE, cells=cells,
+        )
+        record(
+            results, "score_batch_lut", measure(lambda: score_batch_lut(columns, STAGE), repeat=repeat),
+            items=cells, stage=STAGE, cells=cells,
+        )
+        codes = tables[STAGE].quantize(columns)
+        record(
+            results, "lut.score_codes", measure(lambda: tables[STAGE].score_codes(codes), repeat=repeat),
+            items=cells, stage=STAGE, cells=cells,
+        )
+        del columns, codes
+
+    cells = min(sizes[-1], 10**6)
+    columns = random_columns(rules.parameters, cells)
+    record(
+        results, "score_all_stages", measure(lambda: score_all_stages(columns), repeat=3),
+        items=cells * len(rules), cells=cells, stages=len(rules),
+    )
+
+
+def bench_reruns(results, repeat):
+    from streamlit.testing.v1 import AppTest
+
+    script = os.path.join(REPO_ROOT, "streamlit_app.py")
+    cold = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        app = AppTest.from_file(script, default_timeout=60).run()
+        cold.append(time.perf_counter() - started)
+        if app.exception:
+            raise RuntimeError(f"App raised during benchmark: {app.exception}")
+    record(results, "app.first_run", cold)
+
+    warm = []
+    values = [10.0, 25.0]
+    for index in range(repeat * 2):
+        started = time.perf_counter()
+        app.sidebar.number_input[0].set_value(values[index % 2]).run()
+        warm.append(time.perf_counter() - started)
+    record(results, "app.input_change_rerun", warm)
+
+    stages = list(rules)
+    switches = []
+    for index in range(repeat):
+        started = time.perf_counter()
+        app.sidebar.selectbox[1].select(stages[(index + 1) % len(stages)]).run()
+        switches.append(time.perf_counter() - started)
+    record(results, "app.stage_change_rerun", switches)
+
+
+def environment():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def compare(results, baseline_path):
+    """Print the median time ratio of each benchmark against an earlier run"""
+    with open(baseline_path, encoding="utf-8") as handle:
+        baseline = {
+            (entry["name"], json.dumps(entry["params"], sort_keys=True)): entry
+            for entry in json.load(handle)["results"]
+        }
+    print(f"\nCompared with {baseline_path} (ratio > 1 is slower):", file=sys.stderr)
+    for entry in results:
+        old = baseline.get((entry["name"], json.dumps(entry["params"], sort_keys=True)))
+        if old:
+            ratio = entry["median_s"] / old["median_s"]
+            print(f"{entry['name']:<40} {ratio:6.2f}x  {entry['params']}", file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-o", "--output", help="Write results JSON here (default: stdout)")
+    parser.add_argument("--quick", action="store_true", help="Skip the 1e7-cell batch and use fewer reruns")
+    parser.add_argument("--skip-app", action="store_true", help="Skip the AppTest rerun benchmarks")
+    parser.add_argument("--compare", metavar="JSON", help="Earlier results to compare against")
+    args = parser.parse_args(argv)
+
+    # Importing the app outside `streamlit run` logs bare-mode warnings
+    import streamlit.logger
+    streamlit.logger.set_log_level("ERROR")
+
+    sizes = [10**3, 10**5] if args.quick else [10**3, 10**5, 10**7]
+    results = []
+    bench_kernels(results)
+    bench_parameter_bars(results)
+    bench_chart(results)
+    bench_batch(results, sizes)
+    if not args.skip_app:
+        bench_reruns(results, repeat=2 if args.quick else 5)
+
+    report = {"environment": environment(), "results": results}
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+    if args.compare:
+        compare(results, args.compare)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,25 @@
+"""LOCAST scoring core.
+
+Everything in this package is importable without Streamlit or Plotly, so
+batch jobs and workers can reuse the same rules as the app.
+"""
+
+from locast.scoring import (
+    calculate_suitability,
+    classify_danger,
+    compile_stage_bounds,
+    danger_levels,
+    get_all_parameters,
+    get_parameter_defaults,
+    get_stage_parameters,
+    param_ranges,
+    param_steps,
+    param_units,
+    parameter_suitability,
+    resolve_profile,
+    rules,
+    score_all_stages,
+    score_batch,
+    score_sweep,
+    thresholds,
+)
@@ -0,0 +1,106 @@
+"""Danger class change detection for streams of scores.
+
+Downstream alerting only cares when a station or cell moves between
+SAFE CONDITIONS, MODERATE DANGER and HIGH DANGER. An AlertEngine keeps the
+last class of every location in one uint8 array and, for each batch of new
+scores, returns only the locations whose class changed:
+
+    engine = AlertEngine(n_locations, hysteresis=10)
+    for locations, danger_percentage in feed:
+        transitions = engine.update(danger_percentage, locations)
+
+With hysteresis, a location moves up a class as soon as it reaches the
+50%/80% cutoff but only moves back down once it falls `hysteresis` points
+below it, so readings hovering around a cutoff do not flap.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from locast.scoring import classify_danger, danger_levels
+
+# Class of a location that has not been scored yet
+UNSEEN = 255
+
+
+@dataclass(frozen=True)
+class Transitions:
+    """Locations whose danger class changed in one update, as parallel arrays"""
+
+    locations: np.ndarray
+    previous: np.ndarray
+    current: np.ndarray
+
+    def __len__(self):
+        return len(self.locations)
+
+    def events(self, names=None):
+        """Transitions as dicts with danger level names, e.g. for JSON fan-out"""
+        return [
+            {
+                "location": location if names is None else names[location],
+                "previous": None if previous == UNSEEN else danger_levels[previous][0],
+                "current": danger_levels[current][0],
+            }
+            for location, previous, current in zip(
+                self.locations.tolist(), self.previous.tolist(), self.current.tolist()
+            )
+        ]
+
+
+class AlertEngine:
+    """Last danger class per location, updated batch by batch"""
+
+    def __init__(self, n_locations, hysteresis=0.0, report_initial=False):
+        if hysteresis < 0:
+            raise ValueError("hysteresis must not be negative")
+        self.state = np.full(n_locations, UNSEEN, dtype=np.uint8)
+        self.hysteresis = hysteresis
+        self.report_initial = report_initial
+
+    def update(self, danger_percentage, locations=None):
+        """Apply new danger percentages and return the resulting Transitions.
+
+        `locations` indexes the scored locations (default: all of them, in
+        order). A location's first score only counts as a transition when
+        the engine was created with report_initial=True.
+        """
+        danger_percentage = np.asarray(danger_percentage, dtype=np.float64).ravel()
+        if locations is None:
+            locations = np.arange(self.state.size)
+        locations = np.asarray(locations, dtype=np.intp).ravel()
+        if locations.size != danger_percentage.size:
+            raise ValueError(f"Got {danger_percentage.size} scores for {locations.size} locations")
+
+        previous = self.state[locations]
+        current = classify_danger(danger_percentage)
+        if self.hysteresis:
+            # Dropping a class needs the score to clear the cutoff by the hysteresis margin
+            held = np.minimum(previous, classify_danger(danger_percentage + self.hysteresis))
+            current = np.where((current < previous) & (previous != UNSEEN), held, current)
+        return self.apply(locations, previous, current)
+
+    def update_classes(self, danger_class, locations=None):
+        """Apply new danger classes directly (no hysteresis) and return the Transitions"""
+        danger_class = np.asarray(danger_class, dtype=np.uint8).ravel()
+        if locations is None:
+            locations = np.arange(self.state.size)
+        locations = np.asarray(locations, dtype=np.intp).ravel()
+        if locations.size != danger_class.size:
+            raise ValueError(f"Got {danger_class.size} classes for {locations.size} locations")
+        return self.apply(locations, self.state[locations], danger_class)
+
+    def apply(self, locations, previous, current):
+        changed = previous != current
+        if not self.report_initial:
+            changed &= previous != UNSEEN
+        self.state[locations] = current
+        return Transitions(locations[changed], previous[changed], current[changed])
+
+    def stream(self, batches):
+        """Consume (locations, danger percentages) batches, yielding the non-empty Transitions"""
+        for locations, danger_percentage in batches:
+            transitions = self.update(danger_percentage, locations)
+            if len(transitions):
+                yield transitions
@@ -0,0 +1,594 @@
+"""Headless command-line entry point: python -m locast <command>"""
+
+import argparse
+import asyncio
+import csv
+import itertools
+import os
+import sys
+from contextlib import nullcontext
+
+import numpy as np
+
+from locast.alerts import UNSEEN, AlertEngine
+from locast.development import (
+    DEVELOPMENT_STAGES,
+    EGG,
+    HOPPER,
+    NOT_REACHED,
+    day_dates,
+    predict_development,
+    score_by_stage,
+    stage_by_day,
+)
+from locast.ensemble import ensemble_probabilities
+from locast.ingest import Ingestor
+from locast.profiles import load_profile
+from locast.pyramid import Pyramid, latest_slice, pyramid_path
+from locast.raster import open_class_raster, open_grid, score_raster
+from locast.service import ScoringService
+from locast.timeseries import DEFAULT_WINDOW_DAYS, RollingWindow, score_day
+from locast.scoring import (
+    danger_levels,
+    get_all_parameters,
+    get_stage_parameters,
+    resolve_profile,
+    score_all_stages,
+    score_batch,
+    stage_slug,
+)
+
+ALL_STAGES = "all"
+
+
+def to_float_array(values, locations=None):
+    """Convert raw cell values to floats; blanks become NaN (never optimal).
+
+    A value that is not a number stops the run, naming locations[i] (the
+    file and line of values[i]) when given.
+    """
+    try:
+        return np.array([np.nan if value in ("", None) else float(value) for value in values], dtype=np.float64)
+    except (TypeError, ValueError):
+        for index, value in enumerate(values):
+            try:
+                float(value)
+            except (TypeError, ValueError):
+                where = locations[index] if locations is not None else f"row {index + 1}"
+                raise SystemExit(f"{where}: {value!r} is not a number")
+        raise
+
+
+def read_csv_chunks(path, chunk_size):
+    """Yield (header, rows, columns, locations) chunks of a CSV file without loading it whole.
+
+    locations name each row's file and line. The first chunk is always
+    yielded, with no rows for a header-only file.
+    """
+    with open(path, newline="") as handle:
+        reader = csv.reader(handle)
+        header = next(reader, None)
+        if header is None:
+            raise SystemExit(f"{path} is empty")
+        rows = iter_complete_rows(reader, len(header), path)
+        for chunk_index in itertools.count():
+            numbered = list(itertools.islice(rows, chunk_size))
+            if not numbered and chunk_index:
+                return
+            chunk = [row for _, row in numbered]
+            locations = [f"{path}, line {line}" for line, _ in numbered]
+            columns = {name: [row[index] for row in chunk] for index, name in enumerate(header)}
+            yield header, chunk, columns, locations
+
+
+def iter_complete_rows(reader, width, path):
+    """(line number, row) pairs of a CSV reader, skipping blank lines and rejecting rows of the wrong length"""
+    for row in reader:
+        if not row:
+            continue
+        if len(row) != width:
+            raise SystemExit(f"{path}, line {reader.line_num}: expected {width} fields, got {len(row)}")
+        yield reader.line_num, row
+
+
+def read_parquet_chunks(path, chunk_size):
+    """Yield (header, rows, columns, locations) chunks of a Parquet file batch by batch"""
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise SystemExit("Reading Parquet input requires pyarrow (pip install pyarrow)")
+
+    parquet_file = pq.ParquetFile(path)
+    header = parquet_file.schema_arrow.names
+    start = 0
+    for batch in parquet_file.iter_batches(batch_size=chunk_size):
+        columns = {name: batch.column(name).to_pylist() for name in header}
+        rows = list(zip(*(columns[name] for name in header)))
+        yield header, rows, columns, [f"{path}, row {start + index + 1}" for index in range(len(rows))]
+        start += len(rows)
+    if not start:
+        yield header, [], {name: [] for name in header}, []
+
+
+def score_chunk(columns, stage, profile=None, locations=None):
+    """Score one chunk, returning the result columns in output order"""
+    readings = {param: to_float_array(columns[param], locations) for param in required_parameters(stage, profile)}
+    if stage == ALL_STAGES:
+        return result_columns(stage, score_all_stages(readings, profile=profile))
+    return result_columns(stage, score_batch(readings, stage, profile))
+
+
+def result_columns(stage, result):
+    """Output columns for a score_batch result, or a score_all_stages result when stage is 'all'"""
+    if stage == ALL_STAGES:
+        stages, danger_percentage, danger_class = result
+        results = {}
+        for index, name in enumerate(stages):
+            results[f"{stage_slug(name)}_danger_percentage"] = danger_percentage[index]
+            results[f"{stage_slug(name)}_danger_level"] = [danger_levels[c][0] for c in danger_class[index]]
+        return results
+
+    optimal_count, danger_percentage, danger_class = result
+    return {
+        "optimal_count": optimal_count,
+        "danger_percentage": danger_percentage,
+        "danger_level": [danger_levels[c][0] for c in danger_class],
+    }
+
+
+def required_parameters(stage, profile=None):
+    """Parameters an input file must provide to score the given stage"""
+    if stage == ALL_STAGES:
+        return get_all_parameters(profile)
+    return get_stage_parameters(stage, profile)
+
+
+def score_command(args):
+    """Stream readings through the scorer and write results incrementally"""
+    profile = load_cli_profile(args)
+    if args.stage != ALL_STAGES and args.stage not in resolve_profile(profile):
+        raise SystemExit(f"Unknown stage {args.stage!r} for profile {resolve_profile(profile).name}")
+
+    if args.input.endswith(".parquet"):
+        chunks = read_parquet_chunks(args.input, args.chunk_size)
+    else:
+        chunks = read_csv_chunks(args.input, args.chunk_size)
+
+    # The output is only created once the first chunk has been read and scored
+    output = None
+    scored = 0
+    try:
+        for chunk_index, (header, rows, columns, locations) in enumerate(chunks):
+            if chunk_index == 0:
+                missing = [param for param in required_parameters(args.stage, profile) if param not in columns]
+                if missing:
+                    raise SystemExit(f"Input is missing columns for {args.stage}: {', '.join(missing)}")
+
+            results = score_chunk(columns, args.stage, profile, locations)
+            if chunk_index == 0:
+                output = open(args.output, "w", newline="") if args.output else sys.stdout
+                writer = csv.writer(output)
+                writer.writerow(list(header) + list(results))
+            writer.writerows(
+                list(row) + [format_value(value) for value in result_row]
+                for row, result_row in zip(rows, zip(*results.values()))
+            )
+            scored += len(rows)
+    finally:
+        if output not in (None, sys.stdout):
+            output.close()
+
+    print(f"Scored {scored} readings", file=sys.stderr)
+    return 0
+
+
+def raster_command(args):
+    """Score gridded parameter fields tile by tile into a danger class raster"""
+    profile = load_cli_profile(args)
+    grid_paths = parse_grid_specs(args.grid)
+
+    try:
+        counts = score_raster(
+            grid_paths, args.stage, args.output, tile_shape=(args.tile_size, args.tile_size), profile=profile
+        )
+    except (KeyError, OSError, ValueError) as error:
+        raise SystemExit(f"Could not score grids: {error}")
+
+    for level, count in counts.items():
+        print(f"{level}: {count}", file=sys.stderr)
+
+    # Built once here so map views never have to reduce the full raster
+    raster = latest_slice(open_class_raster(args.output))
+    pyramid = Pyramid.build(raster, tile_shape=(args.tile_size, args.tile_size))
+    pyramid.save(pyramid_path(args.output))
+    print(f"Map pyramid: {pyramid.depth} levels in {pyramid_path(args.output)}", file=sys.stderr)
+    return 0
+
+
+def develop_command(args):
+    """Predict hatching and fledging days from daily temperature grids, optionally scoring each day"""
+    profile = resolve_profile(load_cli_profile(args))
+    grid_paths = parse_grid_specs(args.grid)
+    required = [EGG.parameter, HOPPER.parameter]
+    if args.score:
+        required += [param for stage in DEVELOPMENT_STAGES for param in profile[stage].params]
+    missing = [param for param in dict.fromkeys(required) if param not in grid_paths]
+    if missing:
+        raise SystemExit(f"No grid given for {', '.join(missing)}")
+
+    grids = {}
+    for param, path in grid_paths.items():
+        try:
+            grid, nodata = open_grid(path)
+        except (OSError, ValueError) as error:
+            raise SystemExit(f"Could not open grid for {param}: {error}")
+        # Missing readings become NaN: no development that day, never optimal
+        grids[param] = grid if nodata is None else np.where(grid == nodata, np.nan, grid)
+
+    soil, air = grids[EGG.parameter], grids[HOPPER.parameter]
+    if soil.shape != air.shape:
+        raise SystemExit(f"Temperature grids differ in shape: {soil.shape} vs {air.shape}")
+    hatch_day, fledge_day = predict_development(soil, air, lay_day=args.lay_day)
+    results = {"hatch_day": hatch_day, "fledge_day": fledge_day}
+    if args.start:
+        results["hatch_date"] = day_dates(hatch_day, args.start)
+        results["fledge_date"] = day_dates(fledge_day, args.start)
+    if args.score:
+        stage_index = stage_by_day(hatch_day, fledge_day, soil.shape[0])
+        results["stage_index"] = stage_index
+        results["danger_class"] = score_by_stage(grids, stage_index, profile)
+    np.savez(args.output, stages=np.array(DEVELOPMENT_STAGES), **results)
+
+    for name, day in (("Hatched", hatch_day), ("Fledged", fledge_day)):
+        reached = day[day != NOT_REACHED]
+        median = f", median day {np.median(reached):g}" if reached.size else ""
+        print(f"{name}: {reached.size} of {day.size} cells{median}", file=sys.stderr)
+    return 0
+
+
+def ensemble_command(args):
+    """Reduce ensemble forecast grids to danger class exceedance probabilities"""
+    profile = resolve_profile(load_cli_profile(args))
+    if args.stage not in profile:
+        raise SystemExit(f"Unknown stage {args.stage!r} for profile {profile.name}")
+    grid_paths = parse_grid_specs(args.grid)
+    missing = [param for param in profile[args.stage].params if param not in grid_paths]
+    if missing:
+        raise SystemExit(f"No grid given for {', '.join(missing)}")
+
+    grids = {}
+    for param in profile[args.stage].params:
+        try:
+            grid, nodata = open_grid(grid_paths[param])
+        except (OSError, ValueError) as error:
+            raise SystemExit(f"Could not open grid for {param}: {error}")
+        if nodata is not None:
+            raise SystemExit(f"Grid for {param} declares nodata; ensemble grids must be complete")
+        grids[param] = grid
+
+    try:
+        probabilities = ensemble_probabilities(grids, args.stage, profile)
+    except ValueError as error:
+        raise SystemExit(f"Could not score ensemble: {error}")
+    np.savez(
+        args.output,
+        levels=np.array([level for level, _, _ in danger_levels]),
+        exceedance=probabilities,
+    )
+
+    high = probabilities[-1].reshape(probabilities.shape[1], -1)
+    for lead, lead_high in enumerate(high):
+        print(f"Lead {lead}: P(HIGH DANGER) mean {lead_high.mean():.2f}, max {lead_high.max():.2f}", file=sys.stderr)
+    return 0
+
+
+def parse_grid_specs(specs):
+    """Map parameters to grid paths from repeated PARAMETER=PATH options"""
+    grid_paths = {}
+    for spec in specs:
+        param, separator, path = spec.partition("=")
+        if not separator:
+            raise SystemExit(f"--grid expects PARAMETER=PATH, got {spec!r}")
+        grid_paths[param] = path
+    return grid_paths
+
+
+def daily_command(args):
+    """Add one day of station readings to the rolling window state and score it"""
+    profile = load_cli_profile(args)
+    with open(args.input, newline="") as handle:
+        reader = csv.DictReader(handle)
+        if reader.fieldnames is None or args.id_column not in reader.fieldnames:
+            raise SystemExit(f"Input needs a {args.id_column!r} column")
+        rows, locations = [], []
+        for row in reader:
+            rows.append(row)
+            locations.append(f"{args.input}, line {reader.line_num}")
+
+    if os.path.exists(args.state):
+        rolling, extra = RollingWindow.load(args.state)
+        if args.window is not None and args.window != rolling.window:
+            raise SystemExit(
+                f"{args.state} holds a {rolling.window}-day window; --window {args.window} only applies to a new state"
+            )
+        stations = [str(station) for station in extra["stations"]]
+    else:
+        stations = []
+        window = DEFAULT_WINDOW_DAYS if args.window is None else args.window
+        rolling = RollingWindow(get_all_parameters(profile), 0, window=window)
+        extra = {}
+
+    # New stations join with an empty history; stations missing from today's file get NaN readings,
+    # which are never optimal
+    positions = {station: position for position, station in enumerate(stations)}
+    added = [station for station in dict.fromkeys(row[args.id_column] for row in rows) if station not in positions]
+    if added:
+        positions.update((station, len(stations) + index) for index, station in enumerate(added))
+        stations += added
+        rolling.add_locations(len(added))
+        if "alert_state" in extra:
+            unseen = np.full((len(extra["alert_state"]), len(added)), UNSEEN, dtype=np.uint8)
+            extra["alert_state"] = np.concatenate([extra["alert_state"], unseen], axis=1)
+        if os.path.exists(args.state):
+            print(f"Added {len(added)} new stations to the window state", file=sys.stderr)
+    indices = np.array([positions[row[args.id_column]] for row in rows], dtype=np.int64)
+    readings = {}
+    for param in rolling.params:
+        readings[param] = np.full(len(stations), np.nan)
+        if rows and param in rows[0]:
+            readings[param][indices] = to_float_array([row[param] for row in rows], locations)
+
+    stage = None if args.stage == ALL_STAGES else args.stage
+    scores = score_day(rolling, readings, stage, profile)
+    results = result_columns(args.stage, scores)
+    with open(args.output, "w", newline="") if args.output else nullcontext(sys.stdout) as output:
+        writer = csv.writer(output)
+        writer.writerow([args.id_column, "window_days"] + list(results))
+        window_days = min(rolling.days, rolling.window)
+        writer.writerows(
+            [station, window_days] + [format_value(value) for value in result_row]
+            for station, result_row in zip(stations, zip(*results.values()))
+        )
+
+    # Alert state rides along in the window state; kept as is on runs without --alerts
+    alert_arrays = {key: extra[key] for key in ("alert_stages", "alert_state") if key in extra}
+    if args.alerts:
+        transitions, alert_arrays = update_alerts(args.stage, scores, extra, len(stations), args.hysteresis)
+        with open(args.alerts, "w", newline="") as output:
+            writer = csv.writer(output)
+            writer.writerow([args.id_column, "stage", "previous_level", "danger_level"])
+            writer.writerows(
+                [stations[event["location"]], alert_stage, event["previous"], event["current"]]
+                for alert_stage, event in transitions
+            )
+        print(f"{len(transitions)} danger level changes", file=sys.stderr)
+
+    rolling.save(args.state, stations=np.array(stations), **alert_arrays)
+    print(f"Scored day {rolling.days} for {len(stations)} stations", file=sys.stderr)
+    return 0
+
+
+def update_alerts(stage, scores, saved, n_stations, hysteresis):
+    """Run a day's scores through per-stage alert engines kept in the window state.
+
+    Returns the (stage, event) transitions and the arrays to save with the state.
+    """
+    if stage == ALL_STAGES:
+        stages, danger_percentages, _ = scores
+    else:
+        stages, danger_percentages = [stage], [scores[1]]
+    states = dict(zip((str(name) for name in saved.get("alert_stages", [])), saved.get("alert_state", [])))
+
+    transitions = []
+    for name, danger_percentage in zip(stages, danger_percentages):
+        engine = AlertEngine(n_stations, hysteresis)
+        if name in states:
+            engine.state[:] = states[name]
+        transitions += [(name, event) for event in engine.update(danger_percentage).events()]
+        states[name] = engine.state
+    return transitions, {"alert_stages": np.array(list(states)), "alert_state": np.stack(list(states.values()))}
+
+
+def ingest_command(args):
+    """Run the station feed ingestion service until interrupted"""
+    profile = load_cli_profile(args)
+    station_urls = []
+    if args.stations:
+        with open(args.stations, encoding="utf-8") as handle:
+            station_urls = [line.strip() for line in handle if line.strip() and not line.startswith("#")]
+    if not station_urls and not args.listen:
+        raise SystemExit("Nothing to ingest: give --stations and/or --listen")
+
+    host, port = None, None
+    if args.listen:
+        host, _, port = args.listen.rpartition(":")
+        host, port = host or "127.0.0.1", int(port)
+    ingestor = Ingestor(
+        station_urls,
+        interval=args.interval,
+        state_path=args.state,
+        profile=profile,
+        batch_size=args.batch_size,
+        max_delay=args.max_delay,
+        queue_size=args.queue_size,
+        connections=args.connections,
+    )
+    print(
+        f"Ingesting {len(station_urls)} polled stations"
+        + (f", accepting POST /readings on {host}:{port}" if host else "")
+        + f"; state in {args.state}",
+        file=sys.stderr,
+    )
+    try:
+        asyncio.run(ingestor.run(host, port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def serve_command(args):
+    """Run the JSON scoring service until interrupted"""
+    host, _, port = args.listen.rpartition(":")
+    host, port = host or "127.0.0.1", int(port)
+    service = ScoringService(
+        profile=load_cli_profile(args),
+        max_batch=args.max_batch,
+        max_delay=args.max_delay,
+        queue_size=args.queue_size,
+    )
+    print(f"Scoring on http://{host}:{port} (POST /score, GET /health)", file=sys.stderr)
+    try:
+        asyncio.run(service.run(host, port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def load_cli_profile(args):
+    """Load the --profile file, if any, exiting with a readable error"""
+    if not args.profile:
+        return None
+    try:
+        return load_profile(args.profile)
+    except (OSError, ValueError) as error:
+        raise SystemExit(f"Could not load profile: {error}")
+
+
+def format_value(value):
+    """Format a result value for CSV output"""
+    if isinstance(value, (float, np.floating)):
+        return f"{value:g}"
+    return value
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="locast", description="LOCAST batch tools")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    score = subparsers.add_parser("score", help="Score station readings from a CSV or Parquet file")
+    score.add_argument("input", help="CSV or .parquet file with one column per parameter")
+    score.add_argument("-o", "--output", help="Output CSV path (default: stdout)")
+    score.add_argument(
+        "-s", "--stage",
+        default=ALL_STAGES,
+        help="Locust stage to score, or 'all' for every stage (default: all)",
+    )
+    score.add_argument("-p", "--profile", help="JSON or TOML threshold profile (default: built-in thresholds)")
+    score.add_argument("--chunk-size", type=int, default=50_000, help="Rows scored per chunk (default: 50000)")
+    score.set_defaults(handler=score_command)
+
+    raster = subparsers.add_parser("raster", help="Score gridded fields into a uint8 danger class raster")
+    raster.add_argument("-s", "--stage", required=True, help="Locust stage to score")
+    raster.add_argument(
+        "-g", "--grid",
+        action="append",
+        default=[],
+        metavar="PARAMETER=PATH",
+        help="Grid file for one parameter (.npy, or raw binary with a .json header); repeat per parameter",
+    )
+    raster.add_argument("-o", "--output", required=True, help="Danger class raster to write (.npy or raw binary)")
+    raster.add_argument("--tile-size", type=int, default=1024, help="Tile edge length in cells (default: 1024)")
+    raster.add_argument("-p", "--profile", help="JSON or TOML threshold profile (default: built-in thresholds)")
+    raster.set_defaults(handler=raster_command)
+
+    daily = subparsers.add_parser("daily", help="Add one day of station readings to a rolling window and score it")
+    daily.add_argument("input", help="CSV with one row per station for a single day")
+    daily.add_argument("--state", required=True, help="Window state file (.npz), created on the first run")
+    daily.add_argument("-o", "--output", help="Output CSV path (default: stdout)")
+    daily.add_argument(
+        "-s", "--stage",
+        default=ALL_STAGES,
+        help="Locust stage to score, or 'all' for every stage (default: all)",
+    )
+    daily.add_argument("--id-column", default="station", help="Station id column (default: station)")
+    daily.add_argument(
+        "--window",
+        type=int,
+        help=f"Window length in days when creating a new state (default: {DEFAULT_WINDOW_DAYS})",
+    )
+    daily.add_argument("-p", "--profile", help="JSON or TOML threshold profile (default: built-in thresholds)")
+    daily.add_argument("--alerts", metavar="CSV", help="Write the stations whose danger level changed since the last run")
+    daily.add_argument(
+        "--hysteresis",
+        type=float,
+        default=0.0,
+        help="Percentage points a score must fall below a cutoff before an alert level drops (default: 0)",
+    )
+    daily.set_defaults(handler=daily_command)
+
+    develop = subparsers.add_parser(
+        "develop", help="Predict hatching and fledging days from daily temperature grids (days first)"
+    )
+    develop.add_argument(
+        "-g", "--grid",
+        action="append",
+        default=[],
+        metavar="PARAMETER=PATH",
+        help="Daily grid for one parameter (.npy, or raw binary with a .json header); "
+        "Soil and Air Temperature are required",
+    )
+    develop.add_argument("-o", "--output", required=True, help="Output .npz with the predicted days")
+    develop.add_argument("--lay-day", type=int, default=0, help="Day index eggs are laid (default: 0)")
+    develop.add_argument("--start", metavar="YYYY-MM-DD", help="Date of day 0; adds hatch_date and fledge_date")
+    develop.add_argument(
+        "--score",
+        action="store_true",
+        help="Also score every day against the stage each cell is in (needs grids for all their parameters)",
+    )
+    develop.add_argument("-p", "--profile", help="JSON or TOML threshold profile (default: built-in thresholds)")
+    develop.set_defaults(handler=develop_command)
+
+    ensemble = subparsers.add_parser(
+        "ensemble", help="Score ensemble forecast grids (members x lead times x cells) into class probabilities"
+    )
+    ensemble.add_argument("-s", "--stage", required=True, help="Locust stage to score")
+    ensemble.add_argument(
+        "-g", "--grid",
+        action="append",
+        default=[],
+        metavar="PARAMETER=PATH",
+        help="Ensemble grid for one parameter, members first (a member axis of length 1 is shared)",
+    )
+    ensemble.add_argument("-o", "--output", required=True, help="Output .npz with the exceedance probabilities")
+    ensemble.add_argument("-p", "--profile", help="JSON or TOML threshold profile (default: built-in thresholds)")
+    ensemble.set_defaults(handler=ensemble_command)
+
+    ingest = subparsers.add_parser("ingest", help="Run the station feed ingestion service")
+    ingest.add_argument("--stations", help="File with one station feed URL per line, polled every --interval")
+    ingest.add_argument("--listen", metavar="[HOST:]PORT", help="Accept pushed readings (POST /readings) here")
+    ingest.add_argument("--interval", type=float, default=60.0, help="Seconds between polls of a station (default: 60)")
+    ingest.add_argument(
+        "--state",
+        default=os.environ.get("LOCAST_INGEST_STATE", "station_state.json"),
+        help="Latest-state JSON the app reads (default: $LOCAST_INGEST_STATE or station_state.json)",
+    )
+    ingest.add_argument("--batch-size", type=int, default=1024, help="Records scored per micro-batch (default: 1024)")
+    ingest.add_argument(
+        "--max-delay", type=float, default=0.05, help="Seconds a micro-batch waits to fill up (default: 0.05)"
+    )
+    ingest.add_argument(
+        "--queue-size", type=int, default=10_000, help="Records queued before feeds are slowed down (default: 10000)"
+    )
+    ingest.add_argument("--connections", type=int, default=100, help="Concurrent poll connections (default: 100)")
+    ingest.add_argument("-p", "--profile", help="JSON or TOML threshold profile (default: built-in thresholds)")
+    ingest.set_defaults(handler=ingest_command)
+
+    serve = subparsers.add_parser("serve", help="Run the JSON scoring service for machine clients")
+    serve.add_argument(
+        "--listen", metavar="[HOST:]PORT", default="127.0.0.1:8080", help="Address to serve on (default: 127.0.0.1:8080)"
+    )
+    serve.add_argument("--max-batch", type=int, default=1024, help="Requests scored per batch, at most (default: 1024)")
+    serve.add_argument(
+        "--max-delay", type=float, default=0.002, help="Seconds a batch waits for more requests (default: 0.002)"
+    )
+    serve.add_argument(
+        "--queue-size", type=int, default=10_000, help="Requests queued before callers are slowed down (default: 10000)"
+    )
+    serve.add_argument("-p", "--profile", help="JSON or TOML threshold profile (default: built-in thresholds)")
+    serve.set_defaults(handler=serve_command)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
@@ -0,0 +1,137 @@
+"""Degree-day development model: when each cell moves Egg -> Hopper -> Adult.
+
+Development of eggs and hoppers is driven by heat above a base temperature.
+Daily degree-days are max(T - base, 0); eggs hatch once the soil has
+accumulated the egg stage's thermal constant since laying, and hoppers
+fledge once the air has accumulated the hopper constant since hatching.
+
+The default constants are approximate calibrations chosen to match the
+durations shown in the app (eggs 2-4 weeks at 22-30°C soil, hoppers 5-6
+weeks at 28-30°C air); pass regional values as DevelopmentStage objects.
+
+Everything is computed for (days, *cells) series at once: cumulative sums
+over the day axis, and the hatching and fledging days found by counting the
+days whose cumulative total is still below the target (the sums never
+decrease). Cells are processed in chunks so the temporary arrays stay
+bounded for multi-year grids.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from locast.scoring import resolve_profile, score_batch
+
+# Day index used where a transition is not reached within the series
+NOT_REACHED = -1
+
+# Threshold stage that applies before hatching, between hatching and fledging, and after fledging
+DEVELOPMENT_STAGES = ("Egg Laying", "Hopper", "Adult")
+
+# Day x cell values processed at a time; bounds the temporary arrays at a few tens of MB
+CHUNK_VALUES = 1 << 22
+
+
+@dataclass(frozen=True)
+class DevelopmentStage:
+    """Thermal requirement of one development stage"""
+
+    name: str
+    parameter: str
+    base_temperature: float
+    degree_days: float
+
+
+EGG = DevelopmentStage("egg", "Soil Temperature", base_temperature=15.0, degree_days=200.0)
+HOPPER = DevelopmentStage("hopper", "Air Temperature", base_temperature=18.0, degree_days=400.0)
+
+
+def daily_degree_days(temperature, base_temperature):
+    """Degree-days per day above the base temperature (missing readings count as none)"""
+    degree_days = np.subtract(temperature, base_temperature, dtype=np.float64)
+    return np.fmax(degree_days, 0, out=degree_days)  # fmax also maps NaN to 0
+
+
+def total_before(cumulative, day):
+    """Cumulative total up to (not including) the given day, per cell"""
+    previous = np.take_along_axis(cumulative, np.maximum(day - 1, 0)[None], axis=0)[0]
+    return np.where(day > 0, previous, 0.0)
+
+
+def first_day_reaching(cumulative, target):
+    """First day each cell's cumulative total reaches its target, or NOT_REACHED"""
+    day = np.count_nonzero(cumulative < target, axis=0)
+    day[day == cumulative.shape[0]] = NOT_REACHED
+    return day
+
+
+def predict_development(soil_temperature, air_temperature, lay_day=0, egg=EGG, hopper=HOPPER, chunk_cells=None):
+    """Hatching and fledging day of every cell.
+
+    Temperatures are daily (days, *cells) series; `lay_day` is the day
+    index eggs are laid (scalar or per cell). Returns (hatch_day,
+    fledge_day) arrays of the cell shape, NOT_REACHED where the series ends
+    first.
+    """
+    soil_temperature = np.asarray(soil_temperature)
+    air_temperature = np.asarray(air_temperature)
+    if soil_temperature.shape != air_temperature.shape:
+        raise ValueError(f"Soil {soil_temperature.shape} and air {air_temperature.shape} series differ in shape")
+    days, *cell_shape = soil_temperature.shape
+    soil = soil_temperature.reshape(days, -1)
+    air = air_temperature.reshape(days, -1)
+    cells = soil.shape[1]
+    lay_day = np.broadcast_to(np.asarray(lay_day, dtype=np.int64), cell_shape).ravel()
+    chunk_cells = chunk_cells or max(1, CHUNK_VALUES // max(days, 1))
+
+    hatch_day = np.empty(cells, dtype=np.int64)
+    fledge_day = np.empty(cells, dtype=np.int64)
+    for start in range(0, cells, chunk_cells):
+        chunk = slice(start, start + chunk_cells)
+        soil_total = daily_degree_days(soil[:, chunk], egg.base_temperature)
+        np.cumsum(soil_total, axis=0, out=soil_total)
+        laid = np.clip(lay_day[chunk], 0, days)  # laid after the series ends: never reaches the target
+        hatch = first_day_reaching(soil_total, total_before(soil_total, laid) + egg.degree_days)
+
+        # Hopper development counts from the hatching day itself
+        hatched = hatch != NOT_REACHED
+        air_total = daily_degree_days(air[:, chunk], hopper.base_temperature)
+        np.cumsum(air_total, axis=0, out=air_total)
+        hopper_start = total_before(air_total, np.where(hatched, hatch, 0))
+        fledge = first_day_reaching(air_total, hopper_start + hopper.degree_days)
+        fledge[~hatched] = NOT_REACHED
+
+        hatch_day[chunk] = hatch
+        fledge_day[chunk] = fledge
+    return hatch_day.reshape(cell_shape), fledge_day.reshape(cell_shape)
+
+
+def stage_by_day(hatch_day, fledge_day, days):
+    """Index into DEVELOPMENT_STAGES of the stage each cell is in on each day, shape (days, *cells)"""
+    hatch_day = np.where(hatch_day == NOT_REACHED, days, hatch_day)
+    fledge_day = np.where(fledge_day == NOT_REACHED, days, fledge_day)
+    day = np.arange(days).reshape((days,) + (1,) * np.ndim(hatch_day))
+    return (day >= hatch_day).astype(np.uint8) + (day >= fledge_day)
+
+
+def score_by_stage(columns, stage_index, profile=None):
+    """Danger class of each day and cell, scored against the stage it is in that day.
+
+    `columns` holds (days, *cells) series for every parameter of the
+    DEVELOPMENT_STAGES; `stage_index` comes from stage_by_day.
+    """
+    profile = resolve_profile(profile)
+    danger_class = np.zeros(stage_index.shape, dtype=np.uint8)
+    for index, stage in enumerate(DEVELOPMENT_STAGES):
+        in_stage = stage_index == index
+        if not in_stage.any():
+            continue
+        stage_columns = {param: np.asarray(columns[param])[in_stage] for param in profile[stage].params}
+        danger_class[in_stage] = score_batch(stage_columns, stage, profile)[2]
+    return danger_class
+
+
+def day_dates(day, start_date):
+    """Calendar dates of day indices counted from start_date (NaT where NOT_REACHED)"""
+    dates = np.datetime64(start_date, "D") + np.asarray(day).astype("timedelta64[D]")
+    return np.where(np.asarray(day) == NOT_REACHED, np.datetime64("NaT"), dates)
@@ -0,0 +1,115 @@
+"""Ensemble forecast scoring: probability of each danger class.
+
+Ensemble forecasts give every parameter as a (members, lead times, *cells)
+array. Rather than scoring the whole cube at once, members are scored one
+at a time against the stage bounds and only the number of members at or
+above MODERATE and HIGH DANGER is accumulated per lead time and cell. Peak
+memory is one member's slice plus two uint16 count arrays, however many
+members the ensemble has, and memory-mapped inputs are read member by
+member.
+
+Small point forecasts (one station, as in the app) can come as CSV with one
+row per member and lead time:
+
+    member,lead,Rainfall,Air Temperature
+    0,0,22.5,31.0
+
+A parameter whose member axis has length 1 (e.g. an observed NDVI) is
+shared by every member.
+"""
+
+import csv
+
+import numpy as np
+
+from locast.scoring import compile_stage_bounds, danger_levels, score_with_bounds
+
+
+def ensemble_shape(columns, params):
+    """Broadcast (members, lead times, *cells) shape of the given parameters' arrays"""
+    shape = np.broadcast_shapes(*(np.shape(columns[param]) for param in params))
+    if len(shape) < 2:
+        raise ValueError(f"Ensemble readings need member and lead time axes, got shape {shape}")
+    return shape
+
+
+def member_columns(columns, params, member, shape):
+    """One member's readings, each broadcast to the (lead times, *cells) shape"""
+    selected = {}
+    for param in params:
+        values = columns[param]
+        if np.ndim(values) == len(shape):
+            values = values[member if np.shape(values)[0] > 1 else 0]
+        selected[param] = np.broadcast_to(values, shape[1:])
+    return selected
+
+
+def exceedance_counts(columns, stage, profile=None):
+    """Members at or above each danger class, per lead time and cell.
+
+    Returns the member count and a (len(danger_levels) - 1, lead times,
+    *cells) uint16 array: row 0 counts MODERATE DANGER or worse, row 1 HIGH
+    DANGER.
+    """
+    params, lower, upper = compile_stage_bounds(stage, columns, profile)
+    shape = ensemble_shape(columns, params)
+    members = shape[0]
+    if members > np.iinfo(np.uint16).max:
+        raise ValueError(f"At most {np.iinfo(np.uint16).max} members are supported, got {members}")
+    counts = np.zeros((len(danger_levels) - 1,) + shape[1:], dtype=np.uint16)
+    for member in range(members):
+        danger_class = score_with_bounds(member_columns(columns, params, member, shape), params, lower, upper)[2]
+        for index, row in enumerate(counts, start=1):
+            row += danger_class >= index
+    return members, counts
+
+
+def ensemble_probabilities(columns, stage, profile=None):
+    """Exceedance probabilities of an ensemble forecast.
+
+    `columns` maps each parameter of the stage to a (members, lead times,
+    *cells) array. Returns a (len(danger_levels), lead times, *cells) array
+    whose row k is the fraction of members at danger class k or worse, so
+    row 0 is all ones, row 1 is P(MODERATE DANGER or worse) and row 2 is
+    P(HIGH DANGER).
+    """
+    members, counts = exceedance_counts(columns, stage, profile)
+    probabilities = np.ones((len(danger_levels),) + counts.shape[1:], dtype=np.float32)
+    np.divide(counts, members, out=probabilities[1:])
+    return probabilities
+
+
+def class_probabilities(exceedance):
+    """Probability of each danger class exactly, from ensemble_probabilities' exceedance rows"""
+    exceedance = np.asarray(exceedance)
+    probabilities = exceedance.copy()
+    probabilities[:-1] -= exceedance[1:]
+    return probabilities
+
+
+def read_ensemble_csv(lines):
+    """Point ensemble readings from CSV lines with 'member' and 'lead' columns.
+
+    Every other column is a parameter. Returns the sorted lead times and
+    {param: (members, lead times) array}; member/lead pairs missing from
+    the table are NaN (never optimal).
+    """
+    reader = csv.DictReader(lines)
+    fieldnames = reader.fieldnames or []
+    if "member" not in fieldnames or "lead" not in fieldnames:
+        raise ValueError("Ensemble CSV needs 'member' and 'lead' columns")
+    params = [name for name in fieldnames if name not in ("member", "lead")]
+    rows = list(reader)
+    if not rows:
+        raise ValueError("Ensemble CSV has no rows")
+
+    members = {member: index for index, member in enumerate(dict.fromkeys(row["member"] for row in rows))}
+    leads = sorted({int(row["lead"]) for row in rows})
+    lead_index = {lead: index for index, lead in enumerate(leads)}
+    columns = {param: np.full((len(members), len(leads)), np.nan) for param in params}
+    for row in rows:
+        position = members[row["member"]], lead_index[int(row["lead"])]
+        for param in params:
+            if row[param] not in ("", None):
+                columns[param][position] = float(row[param])
+    return leads, columns
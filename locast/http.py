@@ -0,0 +1,193 @@
+"""Minimal asyncio HTTP/1.1 client and server, standard library only.
+
+Just enough HTTP for machine-to-machine JSON: keep-alive connections,
+Content-Length and chunked bodies, and a bounded body size. The ingestion
+and scoring services use it so LOCAST needs no web framework.
+"""
+
+import asyncio
+import json
+from urllib.parse import urlsplit
+
+# Largest request or response body accepted, in bytes
+MAX_BODY_SIZE = 8 << 20
+
+REASONS = {
+    200: "OK",
+    202: "Accepted",
+    204: "No Content",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+}
+
+
+class HTTPError(Exception):
+    """Malformed or unexpected HTTP message"""
+
+
+async def read_message(reader, max_body=MAX_BODY_SIZE):
+    """Read one HTTP message; returns (start line, headers with lower-case names, body)"""
+    start_line = await reader.readline()
+    if not start_line:
+        raise asyncio.IncompleteReadError(b"", None)
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n"):
+            break
+        if not line:
+            raise asyncio.IncompleteReadError(line, None)
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+        body = bytearray()
+        while True:
+            size = int((await reader.readline()).split(b";")[0], 16)
+            if size == 0:
+                await reader.readline()
+                break
+            if len(body) + size > max_body:
+                raise HTTPError("Body too large")
+            body += await reader.readexactly(size)
+            await reader.readexactly(2)
+        body = bytes(body)
+    else:
+        length = int(headers.get("content-length", "0"))
+        if length > max_body:
+            raise HTTPError("Body too large")
+        body = await reader.readexactly(length) if length else b""
+    return start_line.decode("latin-1").strip(), headers, body
+
+
+def keep_alive(start_line, headers):
+    """Whether the connection stays open after this message"""
+    connection = headers.get("connection", "").lower()
+    if start_line.startswith("HTTP/1.0") or start_line.endswith("HTTP/1.0"):
+        return connection == "keep-alive"
+    return connection != "close"
+
+
+def format_response(status, payload, close=False):
+    """Encode a JSON response"""
+    body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    head = (
+        f"HTTP/1.1 {status} {REASONS.get(status, 'Unknown')}\r\n"
+        f"Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'close' if close else 'keep-alive'}\r\n\r\n"
+    )
+    return head.encode("latin-1") + body
+
+
+async def serve_connection(reader, writer, handler):
+    """Answer requests on one connection until the client closes it.
+
+    `handler(method, path, body)` is a coroutine returning (status, payload).
+    """
+    try:
+        while True:
+            try:
+                start_line, headers, body = await read_message(reader)
+            except (asyncio.IncompleteReadError, ConnectionError):
+                break
+            except (HTTPError, ValueError) as error:
+                writer.write(format_response(400, {"error": str(error)}, close=True))
+                break
+            try:
+                method, path, _ = start_line.split(" ", 2)
+            except ValueError:
+                writer.write(format_response(400, {"error": "Malformed request line"}, close=True))
+                break
+            close = not keep_alive(start_line, headers)
+            try:
+                status, payload = await handler(method, path, body)
+            except Exception as error:  # report and keep serving other requests
+                status, payload = 500, {"error": f"{type(error).__name__}: {error}"}
+            writer.write(format_response(status, payload, close))
+            await writer.drain()
+            if close:
+                break
+    finally:
+        writer.close()
+
+
+async def start_server(handler, host="127.0.0.1", port=8080):
+    """Start a JSON HTTP server; returns the asyncio Server"""
+    return await asyncio.start_server(
+        lambda reader, writer: serve_connection(reader, writer, handler), host, port
+    )
+
+
+class ConnectionPool:
+    """Keep-alive HTTP client connections, reused per host and bounded in number"""
+
+    def __init__(self, limit=100, per_host=10, timeout=10.0):
+        self.semaphore = asyncio.Semaphore(limit)
+        self.per_host = per_host
+        self.timeout = timeout
+        self.idle = {}
+
+    async def request(self, method, url, payload=None):
+        """Send a request (JSON payload optional); returns (status, body bytes)"""
+        parts = urlsplit(url)
+        if parts.scheme != "http":
+            raise ValueError(f"Only http:// URLs are supported, got {url!r}")
+        address = (parts.hostname, parts.port or 80)
+        target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        body = b"" if payload is None else json.dumps(payload).encode("utf-8")
+        head = (
+            f"{method} {target} HTTP/1.1\r\nHost: {parts.netloc}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            + ("Content-Type: application/json\r\n" if payload is not None else "")
+            + "\r\n"
+        )
+        message = head.encode("latin-1") + body
+
+        async with self.semaphore:
+            idle = self.idle.setdefault(address, [])
+            while idle:
+                # A pooled connection may have been closed by the server meanwhile; retry on a new one
+                reader, writer = idle.pop()
+                try:
+                    return await self.exchange(address, reader, writer, message)
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    continue
+            reader, writer = await asyncio.wait_for(asyncio.open_connection(*address), self.timeout)
+            return await self.exchange(address, reader, writer, message)
+
+    async def exchange(self, address, reader, writer, message):
+        try:
+            writer.write(message)
+            await writer.drain()
+            start_line, headers, body = await asyncio.wait_for(read_message(reader), self.timeout)
+        except BaseException:
+            writer.close()
+            raise
+        idle = self.idle.setdefault(address, [])
+        if keep_alive(start_line, headers) and len(idle) < self.per_host:
+            idle.append((reader, writer))
+        else:
+            writer.close()
+        try:
+            status = int(start_line.split(" ", 2)[1])
+        except (IndexError, ValueError):
+            raise HTTPError(f"Malformed status line {start_line!r}") from None
+        return status, body
+
+    async def get_json(self, url):
+        """GET a URL and decode its JSON body, raising HTTPError on a non-2xx status"""
+        status, body = await self.request("GET", url)
+        if not 200 <= status < 300:
+            raise HTTPError(f"GET {url} returned {status}")
+        return json.loads(body)
+
+    def close(self):
+        for connections in self.idle.values():
+            for _, writer in connections:
+                writer.close()
+        self.idle.clear()
@@ -0,0 +1,232 @@
+"""Asyncio ingestion of station feeds into the scorer.
+
+Stations either push readings (POST /readings to the built-in listener)
+or are polled over pooled keep-alive HTTP connections. A record is a JSON
+object such as
+
+    {"station": "JSL-014", "time": "2025-07-14T06:00:00Z",
+     "readings": {"Rainfall": 22.0, "Air Temperature": 31.5}}
+
+(or a list of them). Records go through one bounded queue: when scoring
+falls behind, pushes and polls wait instead of piling up in memory. The
+scorer drains the queue in micro-batches, scores each batch against every
+stage with score_all_stages, and keeps the latest state per station, which
+is written atomically to a JSON file the Streamlit page reads.
+
+Everything runs on one event loop; thousands of stations cost one
+coroutine per concurrent connection, not per station.
+"""
+
+import asyncio
+import json
+import os
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+from locast.http import ConnectionPool, start_server
+from locast.scoring import danger_levels, resolve_profile, score_all_stages
+
+
+def utc_now():
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+def parse_record(data):
+    """Validate one station record; returns (station, time, {param: float})"""
+    if not isinstance(data, dict) or "station" not in data:
+        raise ValueError("Record needs a 'station'")
+    readings = data.get("readings")
+    if not isinstance(readings, dict):
+        raise ValueError(f"Record for {data['station']!r} needs a 'readings' object")
+    values = {}
+    for param, value in readings.items():
+        if value is None:
+            continue
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError(f"Reading {param!r} of {data['station']!r} must be a number")
+        values[param] = float(value)
+    return str(data["station"]), data.get("time") or utc_now(), values
+
+
+def write_json_atomic(path, data):
+    temporary = f"{path}.tmp"
+    with open(temporary, "w", encoding="utf-8") as handle:
+        json.dump(data, handle, separators=(",", ":"))
+    os.replace(temporary, path)
+
+
+def read_state(path):
+    """Load a state file written by the ingestion service"""
+    with open(path, encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+async def collect_batch(queue, batch_size, max_delay):
+    """Wait for an item, then collect more for up to max_delay seconds or batch_size items"""
+    batch = [await queue.get()]
+    deadline = time.monotonic() + max_delay
+    while len(batch) < batch_size:
+        if queue.empty():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        else:
+            batch.append(queue.get_nowait())
+    return batch
+
+
+class Ingestor:
+    """Bounded-queue pipeline from station feeds to the latest scored state"""
+
+    def __init__(
+        self,
+        station_urls=(),
+        interval=60.0,
+        state_path=None,
+        profile=None,
+        batch_size=1024,
+        max_delay=0.05,
+        queue_size=10_000,
+        connections=100,
+        write_interval=5.0,
+    ):
+        self.station_urls = list(station_urls)
+        self.interval = interval
+        self.state_path = state_path
+        self.profile = resolve_profile(profile)
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.queue_size = queue_size
+        self.connections = connections
+        self.write_interval = write_interval
+        self.stations = {}
+        self.stats = {"received": 0, "rejected": 0, "scored": 0, "batches": 0, "poll_errors": 0}
+        self.queue = None
+        self.dirty = False
+
+    async def submit(self, records):
+        """Validate raw records and queue them, all or none; waits while the queue is full"""
+        try:
+            parsed = [parse_record(data) for data in records]
+        except ValueError:
+            self.stats["rejected"] += len(records)
+            raise
+        self.stats["received"] += len(parsed)
+        for record in parsed:
+            await self.queue.put(record)
+
+    async def handle(self, method, path, body):
+        """HTTP handler: POST /readings to push records, GET /state for the latest state"""
+        if path == "/readings":
+            if method != "POST":
+                return 405, {"error": "Use POST"}
+            try:
+                data = json.loads(body)
+                # A rejected body queues nothing, so the station can fix it and resend without duplicates
+                await self.submit(data if isinstance(data, list) else [data])
+            except ValueError as error:
+                return 400, {"error": str(error)}
+            return 202, {"queued": self.queue.qsize()}
+        if path == "/state" and method == "GET":
+            return 200, self.snapshot()
+        return 404, {"error": f"No route for {method} {path}"}
+
+    async def poll_worker(self, pool, urls):
+        """Fetch station URLs from the round queue and submit what they return"""
+        while True:
+            url = await urls.get()
+            try:
+                data = await pool.get_json(url)
+                await self.submit(data if isinstance(data, list) else [data])
+            except Exception:  # one failing station must not stop this worker
+                self.stats["poll_errors"] += 1
+            finally:
+                urls.task_done()
+
+    async def poll(self):
+        """Poll every station URL once per interval over pooled connections"""
+        pool = ConnectionPool(limit=self.connections)
+        urls = asyncio.Queue(maxsize=self.connections * 2)
+        workers = [asyncio.create_task(self.poll_worker(pool, urls)) for _ in range(self.connections)]
+        try:
+            while True:
+                started = time.monotonic()
+                for url in self.station_urls:
+                    await urls.put(url)
+                await urls.join()
+                await asyncio.sleep(max(0.0, self.interval - (time.monotonic() - started)))
+        finally:
+            for worker in workers:
+                worker.cancel()
+            pool.close()
+
+    async def next_batch(self):
+        return await collect_batch(self.queue, self.batch_size, self.max_delay)
+
+    def score(self, batch):
+        """Score a micro-batch against every stage and update the per-station state"""
+        columns = {
+            param: np.array([readings.get(param, np.nan) for _, _, readings in batch])
+            for param in self.profile.parameters
+        }
+        stages, danger_percentage, danger_class = score_all_stages(columns, profile=self.profile)
+        for index, (station, reading_time, readings) in enumerate(batch):
+            self.stations[station] = {
+                "time": reading_time,
+                "readings": readings,
+                "stages": {
+                    stage: {
+                        "level": danger_levels[danger_class[row, index]][0],
+                        "percentage": float(danger_percentage[row, index]),
+                    }
+                    for row, stage in enumerate(stages)
+                },
+            }
+        self.stats["scored"] += len(batch)
+        self.stats["batches"] += 1
+        self.dirty = True
+
+    async def score_batches(self):
+        while True:
+            self.score(await self.next_batch())
+
+    def snapshot(self):
+        return {
+            "updated": utc_now(),
+            "profile": self.profile.name,
+            "service": {**self.stats, "queued": self.queue.qsize(), "stations": len(self.stations)},
+            "stations": dict(self.stations),  # entries are replaced, never mutated, so a shallow copy is safe to dump
+        }
+
+    async def write_state(self):
+        """Write the latest state to state_path whenever it changed, at most every write_interval"""
+        while True:
+            await asyncio.sleep(self.write_interval)
+            if self.dirty:
+                self.dirty = False
+                await asyncio.to_thread(write_json_atomic, self.state_path, self.snapshot())
+
+    async def run(self, host=None, port=8081):
+        """Run the pipeline: the push listener (if host is given), pollers, scorer and state writer"""
+        self.queue = asyncio.Queue(maxsize=self.queue_size)
+        tasks = [asyncio.create_task(self.score_batches())]
+        if self.station_urls:
+            tasks.append(asyncio.create_task(self.poll()))
+        if self.state_path:
+            tasks.append(asyncio.create_task(self.write_state()))
+        server = await start_server(self.handle, host, port) if host else None
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            if server is not None:
+                server.close()
+            if self.state_path and self.stations:
+                write_json_atomic(self.state_path, self.snapshot())
@@ -0,0 +1,169 @@
+"""Lookup-table scoring for readings on the sidebar's input grid.
+
+Every input is bounded and stepped (Rainfall 0-50 by 1.0, temperatures
+15-50 by 0.5, wind 0-10 by 0.1, ...), so each parameter only ever takes a
+few dozen distinct values. For each stage the optimal flag of every grid
+value is precomputed, as is the danger class for every possible optimal
+count, and scoring becomes integer indexing:
+
+    grid index -> optimal flag -> summed count -> danger class
+
+Telemetry that already arrives as grid indices (`quantize` produces them)
+is scored by `StageTable.score_codes` with gathers only. Float readings are
+mapped to grid indices first; any reading that is not exactly a grid value
+(off-step, out of range, NaN) falls back to the exact threshold comparison,
+so results always match `score_batch`.
+"""
+
+import numpy as np
+
+from locast.cache import LRUCache
+from locast.scoring import classify_danger, param_steps, resolve_profile, rules
+
+# Grid index used for readings that are not on a parameter's grid
+OFF_GRID = -1
+
+# Rule sets other than the built-in one whose tables are kept (each profile edit is a new rule set)
+PROFILE_TABLES_SIZE = 8
+
+
+class ParameterGrid:
+    """The quantized values a parameter can take: range_min + i * step"""
+
+    def __init__(self, start, stop, step):
+        if not step > 0:
+            raise ValueError(f"Grid step must be positive, got {step}")
+        self.start = start
+        self.step = step
+        self.inv_step = 1 / step
+        self.size = int(round((stop - start) / step)) + 1
+        # Rounded so grid values equal the floats a user or sensor would report (0.3, not 0.30000000000000004)
+        self.values = np.round(start + np.arange(self.size) * step, 10)
+        self.values.setflags(write=False)
+
+    def quantize(self, values):
+        """Grid index of each reading, or OFF_GRID where it is not exactly a grid value"""
+        values = np.asarray(values, dtype=np.float64)
+        position = np.array((values - self.start) * self.inv_step, dtype=np.float64)
+        on_grid = (position > -0.5) & (position < self.size - 0.5)  # also False for NaN
+        position[~on_grid] = 0
+        index = np.rint(position, out=position).astype(np.intp)
+        on_grid &= self.values[index] == values
+        index[~on_grid] = OFF_GRID
+        return index
+
+
+class StageTable:
+    """Precomputed optimal flags and danger classes of one stage"""
+
+    def __init__(self, stage_rules, steps):
+        self.name = stage_rules.name
+        self.params = stage_rules.params
+        self.rules = stage_rules
+        self.grids = {}
+        self.flags = {}
+        for param in self.params:
+            rule = stage_rules[param]
+            if steps.get(param) is None:
+                continue  # No known grid (e.g. a profile-only parameter): always compared exactly
+            grid = ParameterGrid(rule.range_min, rule.range_max, steps[param])
+            flags = ((grid.values >= rule.lower) & (grid.values <= rule.upper)).astype(np.uint8)
+            flags.setflags(write=False)
+            self.grids[param] = grid
+            self.flags[param] = flags
+
+        counts = np.arange(len(self.params) + 1)
+        self.percentage_by_count = counts / len(self.params) * 100
+        self.class_by_count = classify_danger(self.percentage_by_count)
+        self.percentage_by_count.setflags(write=False)
+        self.class_by_count.setflags(write=False)
+
+    def quantize(self, columns):
+        """Grid index arrays for each parameter's readings (OFF_GRID where not on the grid)"""
+        return {param: self.grids[param].quantize(columns[param]) for param in self.grids}
+
+    def score_codes(self, codes):
+        """Score readings given as grid indices; every index must be on the grid.
+
+        Returns optimal counts, danger percentages and danger classes like
+        score_batch.
+        """
+        missing = [param for param in self.params if param not in self.flags]
+        if missing:
+            raise ValueError(f"No grid for {', '.join(missing)}; use score() for these readings")
+        optimal_count = None
+        for param in self.params:
+            flags = np.take(self.flags[param], codes[param])
+            if optimal_count is None:
+                optimal_count = flags.astype(np.int64)
+            else:
+                optimal_count += flags
+        return self.classify_counts(optimal_count)
+
+    def classify_counts(self, optimal_count, n_params=None):
+        """Danger percentages and classes for optimal counts out of n_params (default: all the stage's).
+
+        Counts over every parameter use the precomputed tables; other subsets
+        are computed as score_batch does.
+        """
+        if n_params is None or n_params == len(self.params):
+            return (
+                optimal_count,
+                np.take(self.percentage_by_count, optimal_count),
+                np.take(self.class_by_count, optimal_count),
+            )
+        danger_percentage = (optimal_count / n_params) * 100
+        return optimal_count, danger_percentage, classify_danger(danger_percentage)
+
+    def score(self, columns):
+        """Score float readings through the tables, comparing off-grid readings exactly.
+
+        Like score_batch, the parameters given in `columns` are scored, all
+        of the stage's or any subset, and a parameter the stage does not
+        have raises KeyError.
+        """
+        optimal_count = None
+        for param in columns:
+            values = np.asarray(columns[param], dtype=np.float64)
+            rule = self.rules[param]
+            grid = self.grids.get(param)
+            if grid is None:
+                in_range = (values >= rule.lower) & (values <= rule.upper)
+            else:
+                index = grid.quantize(values)
+                in_range = np.take(self.flags[param], index)  # OFF_GRID entries read the last flag and are replaced below
+                off_grid = np.flatnonzero(index == OFF_GRID)
+                if off_grid.size:
+                    in_range = np.array(in_range)
+                    stray = values.flat[off_grid]
+                    in_range.flat[off_grid] = (stray >= rule.lower) & (stray <= rule.upper)
+            if optimal_count is None:
+                optimal_count = in_range.astype(np.int64)
+            else:
+                optimal_count += in_range
+        return self.classify_counts(optimal_count, len(columns))
+
+
+def compile_tables(profile=None, steps=None):
+    """Build the lookup tables of every stage of a rule set"""
+    profile = resolve_profile(profile)
+    steps = param_steps if steps is None else steps
+    return {stage: StageTable(profile[stage], steps) for stage in profile}
+
+
+# Built with the rules at import; tables for other profiles are built on first use
+tables = compile_tables(rules)
+_profile_tables = LRUCache(maxsize=PROFILE_TABLES_SIZE)
+
+
+def get_tables(profile=None):
+    """Lookup tables for a compiled profile (built once per rule set, the most recent few kept)"""
+    profile = resolve_profile(profile)
+    if profile.fingerprint == rules.fingerprint:
+        return tables
+    return _profile_tables.get_or_create(profile.fingerprint, lambda: compile_tables(profile))
+
+
+def score_batch_lut(columns, stage, profile=None):
+    """Drop-in for score_batch that scores through the lookup tables (any subset of the stage's parameters)"""
+    return get_tables(profile)[stage].score(columns)
@@ -0,0 +1,167 @@
+"""Lightweight timing spans and counters for the rerun hot path.
+
+Instrumentation is off unless LOCAST_METRICS=1 is set (or it is switched
+on for the whole process with set_enabled()). While off,
+span() hands back one shared no-op context manager and count()/gauge()
+return after a single flag check, so instrumented code pays almost nothing.
+
+Metrics are process-wide and can be exported in the Prometheus text format,
+e.g. to a file picked up by node_exporter's textfile collector;
+start_exporter() rewrites such a file periodically from a background thread.
+"""
+
+import os
+import threading
+import time
+from contextlib import nullcontext
+
+enabled_by_default = os.environ.get("LOCAST_METRICS", "") not in ("", "0")
+enabled = enabled_by_default
+
+# Seconds between writes of start_exporter()'s textfile
+EXPORT_INTERVAL = 15.0
+
+_noop_span = nullcontext()
+_lock = threading.Lock()
+_spans = {}
+_counters = {}
+_gauges = {}
+
+
+def set_enabled(flag):
+    global enabled
+    enabled = bool(flag)
+
+
+class Span:
+    """Context manager adding its wall time to the named span"""
+
+    __slots__ = ("name", "started")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        elapsed = time.perf_counter() - self.started
+        with _lock:
+            stats = _spans.get(self.name)
+            if stats is None:
+                stats = _spans[self.name] = [0, 0.0, 0.0]
+            stats[0] += 1
+            stats[1] += elapsed
+            stats[2] = elapsed
+
+
+def span(name):
+    """Time a block: `with span("render_chart"): ...`"""
+    if not enabled:
+        return _noop_span
+    return Span(name)
+
+
+def count(name, amount=1):
+    """Increase a counter"""
+    if not enabled:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + amount
+
+
+def gauge(name, value):
+    """Set a gauge to its current value"""
+    if not enabled:
+        return
+    with _lock:
+        _gauges[name] = value
+
+
+def reset():
+    with _lock:
+        _spans.clear()
+        _counters.clear()
+        _gauges.clear()
+
+
+def snapshot():
+    """Copy of all metrics: spans as {name: (count, total_s, last_s)}, counters and gauges"""
+    with _lock:
+        return {
+            "spans": {name: tuple(stats) for name, stats in _spans.items()},
+            "counters": dict(_counters),
+            "gauges": dict(_gauges),
+        }
+
+
+def escape_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def prometheus_text(prefix="locast"):
+    """Render the current metrics in the Prometheus text exposition format"""
+    metrics = snapshot()
+    lines = [
+        f"# HELP {prefix}_span_seconds_total Wall time spent in each instrumented span.",
+        f"# TYPE {prefix}_span_seconds_total counter",
+    ]
+    lines += [
+        f'{prefix}_span_seconds_total{{span="{escape_label(name)}"}} {total:.9f}'
+        for name, (_, total, _) in sorted(metrics["spans"].items())
+    ]
+    lines += [
+        f"# HELP {prefix}_span_calls_total Number of times each instrumented span ran.",
+        f"# TYPE {prefix}_span_calls_total counter",
+    ]
+    lines += [
+        f'{prefix}_span_calls_total{{span="{escape_label(name)}"}} {calls}'
+        for name, (calls, _, _) in sorted(metrics["spans"].items())
+    ]
+    lines += [
+        f"# HELP {prefix}_events_total Instrumentation counters.",
+        f"# TYPE {prefix}_events_total counter",
+    ]
+    lines += [
+        f'{prefix}_events_total{{event="{escape_label(name)}"}} {value}'
+        for name, value in sorted(metrics["counters"].items())
+    ]
+    lines += [
+        f"# HELP {prefix}_gauge Instrumentation gauges.",
+        f"# TYPE {prefix}_gauge gauge",
+    ]
+    lines += [
+        f'{prefix}_gauge{{name="{escape_label(name)}"}} {value}'
+        for name, value in sorted(metrics["gauges"].items())
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(path):
+    """Atomically write the metrics to a Prometheus textfile"""
+    temporary = f"{path}.tmp"
+    with open(temporary, "w", encoding="utf-8") as handle:
+        handle.write(prometheus_text())
+    os.replace(temporary, path)
+
+
+def start_exporter(path, interval=EXPORT_INTERVAL):
+    """Write the metrics to a Prometheus textfile every `interval` seconds from a daemon thread.
+
+    Returns an Event; setting it stops the exporter after one last write.
+    """
+    stop = threading.Event()
+
+    def export():
+        while True:
+            stopping = stop.wait(interval)
+            try:
+                write_prometheus(path)
+            except OSError:
+                pass  # e.g. the directory is briefly unavailable; retry next interval
+            if stopping:
+                return
+
+    threading.Thread(target=export, name="locast-metrics-exporter", daemon=True).start()
+    return stop
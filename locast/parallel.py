@@ -0,0 +1,157 @@
+"""Process-pool scoring of large regions with shared-memory inputs.
+
+Readings are copied once into `multiprocessing.shared_memory` blocks and
+workers score disjoint cell ranges in place, so neither inputs nor results
+are pickled. Each worker runs the same kernel as `score_batch`, which keeps
+results identical to the serial path.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from locast.scoring import compile_stage_bounds, score_with_bounds
+
+# Smallest number of cells handed to a worker in one task
+MIN_CHUNK_SIZE = 1 << 16
+
+# Input blocks attached by this (worker) process, by name; they live as long as the pool
+_attached = {}
+
+
+def create_shared_array(shape, dtype):
+    """Allocate a shared memory block and an ndarray view onto it"""
+    dtype = np.dtype(dtype)
+    size = max(1, int(np.prod(shape)) * dtype.itemsize)
+    block = shared_memory.SharedMemory(create=True, size=size)
+    return block, np.ndarray(shape, dtype=dtype, buffer=block.buf)
+
+
+def open_shared_block(name):
+    """Attach to a shared memory block created by the parent process (which unlinks it)"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # Python < 3.13 has no track argument
+        return shared_memory.SharedMemory(name=name)
+
+
+def attach_shared_array(name, shape, dtype):
+    """View of an input block, attached once per worker and reused by every task"""
+    block = _attached.get(name)
+    if block is None:
+        block = _attached[name] = open_shared_block(name)
+    return np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+
+
+def write_shared_array(spec, start, stop, values):
+    """Write values[start:stop] into an output block, detaching from it again afterwards"""
+    name, shape, dtype = spec
+    block = open_shared_block(name)
+    try:
+        target = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+        target[start:stop] = values
+        del target  # the block cannot be closed while a view exports its buffer
+    finally:
+        block.close()
+
+
+def score_range(inputs, outputs, start, stop, params, lower, upper):
+    """Worker task: score cells [start, stop) and write the results in place"""
+    columns = {param: attach_shared_array(*inputs[param])[start:stop] for param in params}
+    optimal_count, danger_percentage, danger_class = score_with_bounds(columns, params, lower, upper)
+    for spec, result in zip(outputs, (optimal_count, danger_percentage, danger_class)):
+        write_shared_array(spec, start, stop, result)
+    return stop - start
+
+
+class ParallelScorer:
+    """Holds readings in shared memory and scores them across a process pool.
+
+    Use as a context manager so the pool and shared memory are released:
+
+        with ParallelScorer(columns, workers=32) as scorer:
+            for stage in rules:
+                optimal_count, danger_percentage, danger_class = scorer.score(stage)
+    """
+
+    def __init__(self, columns, workers=None, chunk_size=None):
+        arrays = {param: np.asarray(values) for param, values in columns.items()}
+        shapes = {values.shape for values in arrays.values()}
+        if len(shapes) != 1:
+            raise ValueError("All parameter arrays must have the same shape")
+        self.shape = shapes.pop()
+        self.size = int(np.prod(self.shape))
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size or max(MIN_CHUNK_SIZE, -(-self.size // (self.workers * 4)))
+
+        self._blocks = []
+        self._inputs = {}
+        try:
+            for param, values in arrays.items():
+                block, shared = create_shared_array((self.size,), np.float64)
+                self._blocks.append(block)
+                shared[:] = values.reshape(-1)
+                self._inputs[param] = (block.name, (self.size,), np.float64)
+        except BaseException:
+            self.close()
+            raise
+        self._executor = ProcessPoolExecutor(max_workers=self.workers)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def score(self, stage, profile=None):
+        """Score every cell for one stage; same result as score_batch(columns, stage)"""
+        params, lower, upper = compile_stage_bounds(stage, None, profile)
+        missing = [param for param in params if param not in self._inputs]
+        if missing:
+            raise ValueError(f"No readings for {', '.join(missing)}")
+
+        dtypes = (np.int64, np.float64, np.uint8)
+        blocks, outputs = [], []
+        try:
+            for dtype in dtypes:
+                block, _ = create_shared_array((self.size,), dtype)
+                blocks.append(block)
+                outputs.append((block.name, (self.size,), dtype))
+
+            futures = [
+                self._executor.submit(
+                    score_range, self._inputs, outputs, start, min(start + self.chunk_size, self.size),
+                    params, lower, upper,
+                )
+                for start in range(0, self.size, self.chunk_size)
+            ]
+            for future in futures:
+                future.result()
+
+            # Copy out so the shared blocks can be released straight away
+            return tuple(
+                np.ndarray((self.size,), dtype=dtype, buffer=block.buf).reshape(self.shape).copy()
+                for block, dtype in zip(blocks, dtypes)
+            )
+        finally:
+            for block in blocks:
+                block.close()
+                block.unlink()
+
+    def close(self):
+        executor = getattr(self, "_executor", None)
+        if executor is not None:
+            executor.shutdown()
+            self._executor = None
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks = []
+
+
+def score_parallel(columns, stage, workers=None, chunk_size=None, profile=None):
+    """Parallel drop-in for score_batch(columns, stage, profile)"""
+    with ParallelScorer(columns, workers=workers, chunk_size=chunk_size) as scorer:
+        return scorer.score(stage, profile)
@@ -0,0 +1,138 @@
+"""Threshold profiles loaded from JSON or TOML files.
+
+A profile replaces the built-in Cressman & Stefanski thresholds with a
+regional calibration:
+
+    name = "Thar Desert"
+
+    [thresholds."Egg Laying"]
+    Rainfall = [20, 28]
+    "Soil Moisture" = [20, 40]
+
+    [thresholds.Swarm]
+    "Wind Speed 850hPa" = [6, inf]     # JSON: [6, null]
+
+`param_ranges` and `param_units` tables are optional and are merged over the
+built-in ones. Parsed profiles are cached per path and reused until the
+file's modification time or size changes, so loading an unchanged profile on
+every Streamlit rerun only costs a stat() call.
+"""
+
+import json
+import os
+import threading
+
+from locast.rules import compile_rules
+from locast.scoring import param_ranges, param_units
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    try:
+        import tomli as tomllib
+    except ImportError:
+        tomllib = None
+
+PROFILE_SUFFIXES = (".json", ".toml")
+
+# Default location of profile files, relative to the working directory
+PROFILE_DIR = os.environ.get("LOCAST_PROFILE_DIR", "profiles")
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def parse_bound(value, where):
+    """Parse one threshold bound; null, "inf" and inf all mean unbounded"""
+    if value is None or (isinstance(value, str) and value.strip().lower() in ("inf", "infinity", "∞")):
+        return float('inf')
+    if not is_number(value):
+        raise ValueError(f"{where}: bound must be a number, got {value!r}")
+    return value
+
+
+def is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def parse_table(data, key, source):
+    """An optional table of the profile ({} when absent)"""
+    table = data.get(key, {})
+    if not isinstance(table, dict):
+        raise ValueError(f"{source}: '{key}' must be a table mapping parameters to values")
+    return table
+
+
+def parse_profile(data, source="<profile>"):
+    """Validate raw profile data and compile it into a CompiledRules object"""
+    if not isinstance(data, dict) or not isinstance(data.get("thresholds"), dict):
+        raise ValueError(f"{source}: profile needs a 'thresholds' table")
+
+    thresholds = {}
+    for stage, params in data["thresholds"].items():
+        if not isinstance(params, dict):
+            raise ValueError(f"{source}: stage {stage!r} must map parameters to [min, max]")
+        thresholds[stage] = {}
+        for param, bounds in params.items():
+            if not isinstance(bounds, (list, tuple)) or len(bounds) != 2:
+                raise ValueError(f"{source}: {stage}/{param} must be a [min, max] pair")
+            where = f"{source}: {stage}/{param}"
+            thresholds[stage][param] = (parse_bound(bounds[0], where), parse_bound(bounds[1], where))
+
+    ranges = dict(param_ranges)
+    for param, bounds in parse_table(data, "param_ranges", source).items():
+        if not isinstance(bounds, (list, tuple)) or len(bounds) != 2 or not all(is_number(bound) for bound in bounds):
+            raise ValueError(f"{source}: param_ranges/{param} must be a [min, max] pair of numbers")
+        ranges[param] = tuple(bounds)
+    units = dict(param_units)
+    for param, unit in parse_table(data, "param_units", source).items():
+        if not isinstance(unit, str):
+            raise ValueError(f"{source}: param_units/{param} must be a string, got {unit!r}")
+        units[param] = unit
+
+    name = data.get("name") or os.path.splitext(os.path.basename(source))[0]
+    if not isinstance(name, str):
+        raise ValueError(f"{source}: name must be a string, got {name!r}")
+    try:
+        return compile_rules(thresholds, ranges, units, name=name)
+    except ValueError as error:
+        raise ValueError(f"{source}: {error}") from None
+
+
+def read_profile_file(path):
+    """Read a JSON or TOML profile file into a dict"""
+    if path.endswith(".toml"):
+        if tomllib is None:
+            raise ValueError(f"{path}: reading TOML profiles needs Python 3.11+ or tomli")
+        with open(path, "rb") as handle:
+            return tomllib.load(handle)
+    with open(path, encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def load_profile(path):
+    """Load a compiled profile, re-parsing only when the file has changed"""
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    version = (stat.st_mtime_ns, stat.st_size)
+    with _cache_lock:
+        cached = _cache.get(path)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    profile = parse_profile(read_profile_file(path), source=path)
+    with _cache_lock:
+        _cache[path] = (version, profile)
+    return profile
+
+
+def list_profiles(directory=None):
+    """Paths of the profile files in a directory, sorted by file name"""
+    directory = PROFILE_DIR if directory is None else directory
+    if not os.path.isdir(directory):
+        return []
+    return sorted(
+        os.path.join(directory, entry)
+        for entry in os.listdir(directory)
+        if entry.endswith(PROFILE_SUFFIXES)
+    )
@@ -0,0 +1,169 @@
+"""Multi-resolution pyramid of a danger class raster for map display.
+
+Level 0 is the class raster itself; every further level halves both
+dimensions, and each of its cells holds the maximum and the mean danger
+class of the 2x2 block below it (nodata cells are left out). A map view
+picks the finest level that still shows the requested window in at most
+`max_cells` cells, so the browser never receives more than that however
+large the raster is.
+
+The first level is reduced tile by tile from the memory-mapped raster, and
+the rest from the level below, so building the pyramid reads the raster
+once. `python -m locast raster` builds it at the end of the run and saves it
+next to the raster (`<raster>.pyramid.npz`), where the app picks it up.
+Time-stacked (T, rows, cols) rasters are mapped by their last time slice.
+"""
+
+import numpy as np
+
+from locast.raster import DEFAULT_TILE_SHAPE, NODATA_CLASS, iter_tiles, open_class_raster
+
+# Cells sent to the browser per map view, at most
+DEFAULT_MAX_CELLS = 256 * 256
+
+# Levels stop once both dimensions are this small
+MIN_LEVEL_SIZE = 64
+
+
+def pyramid_path(raster_path):
+    return f"{raster_path}.pyramid.npz"
+
+
+def block_reduce(array, func):
+    """Reduce every 2x2 block of a 2-D array with func (odd edges are zero-padded)"""
+    rows, cols = array.shape
+    if rows % 2 or cols % 2:
+        array = np.pad(array, ((0, rows % 2), (0, cols % 2)))
+    rows, cols = array.shape
+    return func(array.reshape(rows // 2, 2, cols // 2, 2), axis=(1, 3))
+
+
+def reduce_level(maxima, sums, counts):
+    """Next level's (max, sum, count) arrays from the current level's"""
+    return block_reduce(maxima, np.max), block_reduce(sums, np.sum), block_reduce(counts, np.sum)
+
+
+def level_slice(window, level):
+    """Slice of a level's cells covering the (start, stop) full-resolution window"""
+    start, stop = window
+    return slice(start >> level, -(-stop >> level))
+
+
+def level_cells(window, level):
+    """Number of a level's cells the (start, stop) window touches"""
+    cells = level_slice(window, level)
+    return cells.stop - cells.start
+
+
+def latest_slice(raster):
+    """The last time slice of a time-stacked raster (2-D rasters are returned as they are)"""
+    return raster[(-1,) * (raster.ndim - 2)] if raster.ndim > 2 else raster
+
+
+class Pyramid:
+    """Danger class raster plus its max/mean reduced levels"""
+
+    def __init__(self, raster, levels):
+        self.raster = raster
+        self.shape = raster.shape
+        # levels[k - 1] holds (max, class sum, valid count) of level k; empty blocks have max 0 and count 0
+        self.levels = levels
+
+    @property
+    def depth(self):
+        """Number of levels, including the full-resolution raster"""
+        return len(self.levels) + 1
+
+    @classmethod
+    def build(cls, raster, tile_shape=DEFAULT_TILE_SHAPE):
+        """Build all levels of a 2-D class raster, reading it tile by tile"""
+        if raster.ndim != 2:
+            raise ValueError(f"Pyramids need a 2-D raster, got shape {raster.shape}")
+        rows, cols = raster.shape
+        if max(rows, cols) <= MIN_LEVEL_SIZE:
+            return cls(raster, [])
+
+        # Even tile edges keep every 2x2 block inside one tile
+        tile_shape = tuple(size + size % 2 for size in tile_shape)
+        shape = ((rows + 1) // 2, (cols + 1) // 2)
+        maxima = np.zeros(shape, dtype=np.uint8)
+        sums = np.zeros(shape, dtype=np.float32)
+        counts = np.zeros(shape, dtype=np.uint32)
+        for row_slice, col_slice in iter_tiles(raster.shape, tile_shape):
+            tile = np.asarray(raster[row_slice, col_slice])
+            valid = tile != NODATA_CLASS
+            classes = np.where(valid, tile, 0)
+            target = (slice(row_slice.start // 2, None), slice(col_slice.start // 2, None))
+            reduced = reduce_level(classes, classes.astype(np.float32), valid.astype(np.uint32))
+            for level_array, block in zip((maxima, sums, counts), reduced):
+                level_array[target][:block.shape[0], :block.shape[1]] = block
+
+        levels = [(maxima, sums, counts)]
+        while max(levels[-1][0].shape) > MIN_LEVEL_SIZE:
+            levels.append(reduce_level(*levels[-1]))
+        return cls(raster, levels)
+
+    def save(self, path):
+        arrays = {}
+        for index, (maxima, sums, counts) in enumerate(self.levels, start=1):
+            arrays[f"max_{index}"] = maxima
+            arrays[f"sum_{index}"] = sums
+            arrays[f"count_{index}"] = counts
+        np.savez(path, depth=self.depth, shape=np.array(self.shape), **arrays)
+
+    @classmethod
+    def load(cls, path, raster):
+        """Load a pyramid saved with save() for the given raster"""
+        with np.load(path) as data:
+            if tuple(data["shape"]) != raster.shape:
+                raise ValueError(f"{path} was built for shape {tuple(data['shape'])}, not {raster.shape}")
+            levels = [
+                (data[f"max_{index}"], data[f"sum_{index}"], data[f"count_{index}"])
+                for index in range(1, int(data["depth"]))
+            ]
+        return cls(raster, levels)
+
+    def level_for(self, rows, cols, max_cells=DEFAULT_MAX_CELLS):
+        """Finest level that shows the (start, stop) window in at most max_cells cells.
+
+        Cells are counted the way view() slices them, including partial
+        blocks at either edge. The coarsest level is returned if none fits.
+        """
+        level = 0
+        while level < self.depth - 1 and level_cells(rows, level) * level_cells(cols, level) > max_cells:
+            level += 1
+        return level
+
+    def view(self, rows=None, cols=None, stat="max", max_cells=DEFAULT_MAX_CELLS):
+        """Danger per displayed cell for a window of the raster.
+
+        `rows`/`cols` are (start, stop) in full-resolution cells (default:
+        everything). Returns (level, array) where each array cell covers
+        2**level x 2**level raster cells and holds the max or mean danger
+        class, NaN where there is no data.
+        """
+        if stat not in ("max", "mean"):
+            raise ValueError(f"Unknown statistic {stat!r}")
+        row_start, row_stop = rows or (0, self.shape[0])
+        col_start, col_stop = cols or (0, self.shape[1])
+        level = self.level_for((row_start, row_stop), (col_start, col_stop), max_cells)
+        window = (level_slice((row_start, row_stop), level), level_slice((col_start, col_stop), level))
+
+        if level == 0:
+            tile = np.asarray(self.raster[window])
+            return 0, np.where(tile == NODATA_CLASS, np.nan, tile.astype(np.float32))
+
+        maxima, sums, counts = (array[window] for array in self.levels[level - 1])
+        with np.errstate(invalid="ignore", divide="ignore"):
+            values = maxima.astype(np.float32) if stat == "max" else (sums / counts).astype(np.float32)
+        values[counts == 0] = np.nan
+        return level, values
+
+
+def load_pyramid(raster_path):
+    """The raster's saved pyramid, or a freshly built one if none was saved"""
+    raster = latest_slice(open_class_raster(raster_path))
+    try:
+        return Pyramid.load(pyramid_path(raster_path), raster)
+    except (OSError, KeyError, ValueError):
+        return Pyramid.build(raster)
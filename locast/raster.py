@@ -0,0 +1,121 @@
+"""Tile-by-tile scoring of gridded parameter fields.
+
+Each parameter grid is opened as a read-only memory map, either a `.npy`
+file or a raw binary file described by a small JSON header next to it
+(`<file>.json`):
+
+    {"shape": [rows, cols], "dtype": "float32", "nodata": -9999}
+
+Grids are scored one tile at a time with `score_batch`, and the danger
+classes are written to a uint8 raster in the same formats, so only a tile's
+worth of data is ever held in memory.
+"""
+
+import json
+
+import numpy as np
+
+from locast.scoring import danger_levels, resolve_profile, score_batch
+
+# Danger class written for cells where any input is missing
+NODATA_CLASS = 255
+
+DEFAULT_TILE_SHAPE = (1024, 1024)
+
+
+def header_path(path):
+    return f"{path}.json"
+
+
+def read_header(path):
+    """Read the JSON header describing a raw binary grid"""
+    with open(header_path(path), encoding="utf-8") as handle:
+        header = json.load(handle)
+    if "shape" not in header or "dtype" not in header:
+        raise ValueError(f"{header_path(path)}: header needs 'shape' and 'dtype'")
+    return header
+
+
+def write_header(path, shape, dtype, nodata=None):
+    """Write the JSON header for a raw binary grid"""
+    header = {"shape": list(shape), "dtype": np.dtype(dtype).str}
+    if nodata is not None:
+        header["nodata"] = nodata
+    with open(header_path(path), "w", encoding="utf-8") as handle:
+        json.dump(header, handle)
+
+
+def open_grid(path):
+    """Open a grid read-only without loading it; returns (array, nodata value or None)"""
+    if path.endswith(".npy"):
+        return np.load(path, mmap_mode="r"), None
+    header = read_header(path)
+    grid = np.memmap(path, dtype=np.dtype(header["dtype"]), mode="r", shape=tuple(header["shape"]))
+    return grid, header.get("nodata")
+
+
+def create_class_raster(path, shape):
+    """Create a writable uint8 danger class raster (.npy, or raw binary plus header)"""
+    if path.endswith(".npy"):
+        return np.lib.format.open_memmap(path, mode="w+", dtype=np.uint8, shape=tuple(shape))
+    write_header(path, shape, np.uint8, nodata=NODATA_CLASS)
+    return np.memmap(path, dtype=np.uint8, mode="w+", shape=tuple(shape))
+
+
+def open_class_raster(path):
+    """Open a danger class raster written by score_raster, read-only"""
+    grid, _ = open_grid(path)
+    if grid.dtype != np.uint8:
+        raise ValueError(f"{path}: expected a uint8 danger class raster, got {grid.dtype}")
+    return grid
+
+
+def iter_tiles(shape, tile_shape=DEFAULT_TILE_SHAPE):
+    """Yield index tuples covering a grid tile by tile (leading axes are iterated whole)"""
+    *leading, rows, cols = shape
+    tile_rows, tile_cols = tile_shape
+    for index in np.ndindex(*leading):
+        for row in range(0, rows, tile_rows):
+            for col in range(0, cols, tile_cols):
+                yield index + (slice(row, row + tile_rows), slice(col, col + tile_cols))
+
+
+def score_raster(grid_paths, stage, output_path, tile_shape=DEFAULT_TILE_SHAPE, profile=None):
+    """Score parameter grids tile by tile and write a uint8 danger class raster.
+
+    `grid_paths` maps each of the stage's parameters to a grid file; all grids
+    must share one shape (rows x cols, optionally with leading time axes).
+    Returns the number of cells in each danger class, plus nodata.
+    """
+    params = list(resolve_profile(profile)[stage].params)
+    missing = [param for param in params if param not in grid_paths]
+    if missing:
+        raise ValueError(f"No grid given for {', '.join(missing)}")
+
+    grids = {param: open_grid(grid_paths[param]) for param in params}
+    shape = grids[params[0]][0].shape
+    for param, (grid, _) in grids.items():
+        if grid.shape != shape:
+            raise ValueError(f"Grid for {param!r} has shape {grid.shape}, expected {shape}")
+
+    output = create_class_raster(output_path, shape)
+    class_counts = np.zeros(NODATA_CLASS + 1, dtype=np.int64)
+    for tile in iter_tiles(shape, tile_shape):
+        columns = {}
+        missing_data = None
+        for param, (grid, nodata) in grids.items():
+            values = np.asarray(grid[tile], dtype=np.float64)
+            invalid = np.isnan(values) if nodata is None else np.isnan(values) | (values == nodata)
+            missing_data = invalid if missing_data is None else missing_data | invalid
+            columns[param] = values
+
+        _, _, danger_class = score_batch(columns, stage, profile)
+        danger_class[missing_data] = NODATA_CLASS
+        output[tile] = danger_class
+        class_counts += np.bincount(danger_class.ravel(), minlength=NODATA_CLASS + 1)
+
+    output.flush()
+
+    counts = {level[0]: int(class_counts[index]) for index, level in enumerate(danger_levels)}
+    counts["NO DATA"] = int(class_counts[NODATA_CLASS])
+    return counts
@@ -0,0 +1,176 @@
+"""Compiled, read-only form of the threshold tables.
+
+The raw `thresholds`, `param_ranges` and `param_units` dicts are compiled
+once into frozen objects holding bound arrays, reciprocal spans and display
+strings, so scoring and rendering never re-derive them per call.
+"""
+
+import hashlib
+import json
+import math
+from dataclasses import dataclass
+from types import MappingProxyType
+
+import numpy as np
+
+
+def format_bound(bound):
+    """Display a threshold bound the way the app always has ('∞' for no upper bound)"""
+    return "∞" if bound == float('inf') else f"{bound}"
+
+
+def read_only_array(values):
+    array = np.array(values, dtype=np.float64)
+    array.setflags(write=False)
+    return array
+
+
+@dataclass(frozen=True)
+class ParameterRule:
+    """Optimal range of one parameter for one stage, with its display range"""
+
+    name: str
+    unit: str
+    lower: float
+    upper: float
+    range_min: float
+    range_max: float
+    inv_range_span: float
+    inv_optimal_span: float
+    optimal_left_pct: float
+    optimal_width_pct: float
+    optimal_display: str
+    range_min_display: str
+    range_max_display: str
+
+    @property
+    def unbounded(self):
+        return self.upper == float('inf')
+
+    def is_optimal(self, value):
+        return self.lower <= value <= self.upper
+
+    def normalize(self, value):
+        """Position of a value within the display range, clipped to 0-1"""
+        return max(0, min(1, (value - self.range_min) * self.inv_range_span))
+
+    def suitability(self, value):
+        """Suitability (0-100%) of a value within the optimal range"""
+        if self.unbounded:
+            return 100 if value >= self.lower else 0
+        return min(100, max(0, (value - self.lower) * self.inv_optimal_span * 100))
+
+
+@dataclass(frozen=True)
+class StageRules:
+    """All parameter rules of a stage plus their bounds as arrays"""
+
+    name: str
+    params: tuple
+    rules: MappingProxyType
+    lower: np.ndarray
+    upper: np.ndarray
+    index: MappingProxyType
+
+    def __getitem__(self, param):
+        return self.rules[param]
+
+    def bounds(self, params=None):
+        """Lower/upper bound arrays for the given parameters (default: all, in stage order)"""
+        if params is None:
+            return list(self.params), self.lower, self.upper
+        params = list(params)
+        positions = [self.index[param] for param in params]
+        return params, self.lower[positions], self.upper[positions]
+
+
+@dataclass(frozen=True)
+class CompiledRules:
+    """Validated, immutable rule set covering every stage"""
+
+    name: str
+    stages: MappingProxyType
+    parameters: tuple
+    fingerprint: str
+
+    def __getitem__(self, stage):
+        return self.stages[stage]
+
+    def __iter__(self):
+        return iter(self.stages)
+
+    def __len__(self):
+        return len(self.stages)
+
+
+def compile_rules(thresholds, param_ranges, param_units, name="custom"):
+    """Validate the raw tables and compile them into a CompiledRules object"""
+    stages = {}
+    for stage, stage_thresholds in thresholds.items():
+        if not stage_thresholds:
+            raise ValueError(f"Stage {stage!r} has no parameters")
+        rules = {}
+        for param, (lower, upper) in stage_thresholds.items():
+            if param not in param_ranges:
+                raise ValueError(f"No display range for parameter {param!r}")
+            if param not in param_units:
+                raise ValueError(f"No unit for parameter {param!r}")
+            if not math.isfinite(lower) or math.isnan(upper) or lower > upper:
+                raise ValueError(f"Invalid optimal range {lower}-{upper} for {param!r} in {stage!r}")
+            range_min, range_max = param_ranges[param]
+            if not range_min < range_max:
+                raise ValueError(f"Invalid display range {range_min}-{range_max} for {param!r}")
+
+            optimal_span = upper - lower
+            range_span = range_max - range_min
+            optimal_left = max(0, min(1, (lower - range_min) / range_span))
+            optimal_right = max(0, min(1, (upper - range_min) / range_span))  # Capped at 1 for infinite max
+            rules[param] = ParameterRule(
+                name=param,
+                unit=param_units[param],
+                lower=lower,
+                upper=upper,
+                range_min=range_min,
+                range_max=range_max,
+                inv_range_span=1 / range_span,
+                inv_optimal_span=1 / optimal_span if 0 < optimal_span < float('inf') else 0.0,
+                optimal_left_pct=optimal_left * 100,
+                optimal_width_pct=(optimal_right - optimal_left) * 100,
+                optimal_display=f"{lower}-{format_bound(upper)}",
+                range_min_display=f"{range_min}{param_units[param]}",
+                range_max_display=f"{range_max}{param_units[param]}",
+            )
+
+        params = tuple(rules)
+        stages[stage] = StageRules(
+            name=stage,
+            params=params,
+            rules=MappingProxyType(rules),
+            lower=read_only_array([rules[param].lower for param in params]),
+            upper=read_only_array([rules[param].upper for param in params]),
+            index=MappingProxyType({param: position for position, param in enumerate(params)}),
+        )
+
+    parameters = tuple(dict.fromkeys(param for stage in stages.values() for param in stage.params))
+    return CompiledRules(
+        name=name,
+        stages=MappingProxyType(stages),
+        parameters=parameters,
+        fingerprint=rules_fingerprint(thresholds, param_ranges, param_units),
+    )
+
+
+def rules_fingerprint(thresholds, param_ranges, param_units):
+    """Short content hash identifying a rule set (inf is encoded as a string)"""
+    canonical = json.dumps(
+        {
+            "thresholds": {
+                stage: {param: [lower, format_bound(upper)] for param, (lower, upper) in params.items()}
+                for stage, params in thresholds.items()
+            },
+            "param_ranges": {param: list(bounds) for param, bounds in param_ranges.items()},
+            "param_units": param_units,
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
@@ -0,0 +1,223 @@
+"""Scoring rules and kernels for LOCAST, importable without the Streamlit UI"""
+
+import numpy as np
+
+from locast.rules import compile_rules
+
+# Environmental Suitability Thresholds (OPTIMAL CONDITIONS for locusts)
+thresholds = {
+    "Egg Laying": {
+        "Rainfall": (20, 28),
+        "Soil Moisture": (20, 40),
+        "Soil Temperature": (15, 35),
+        "Air Temperature": (18, 35),
+    },
+    "Hopper": {
+        "Rainfall": (20, 28),
+        "Surface Wind Speed": (0, 2),
+        "Air Temperature": (22, 34),
+    },
+    "Adult": {
+        "Rainfall": (20, 28),
+        "Surface Wind Speed": (6, 8),
+        "Soil Temperature": (15, 24),
+        "Air Temperature": (20, 22),
+    },
+    "Swarm": {
+        "Rainfall": (20, 28),
+        "Wind Speed 850hPa": (6, float('inf')),  # >6 m/s
+        "Air Temperature": (23, 26),
+        "Vegetation (NDVI)": (0.5, 1.0),
+    }
+}
+
+# Danger classes, indexed by score_batch danger class (0 = safe, 2 = high)
+danger_levels = [
+    ("SAFE CONDITIONS", "🟢", "safe"),
+    ("MODERATE DANGER", "🟡", "danger-moderate"),
+    ("HIGH DANGER", "🔴", "danger-high"),
+]
+
+# Parameter ranges for visualization
+param_ranges = {
+    "Rainfall": (0, 50),
+    "Soil Moisture": (0, 50),
+    "Soil Temperature": (15, 50),
+    "Air Temperature": (15, 50),
+    "Surface Wind Speed": (0, 10),
+    "Wind Speed 850hPa": (0, 10),
+    "Vegetation (NDVI)": (0, 1),
+}
+
+# Parameter units
+param_units = {
+    "Rainfall": "mm",
+    "Soil Moisture": "%",
+    "Soil Temperature": "°C",
+    "Air Temperature": "°C",
+    "Surface Wind Speed": "m/s",
+    "Wind Speed 850hPa": "m/s",
+    "Vegetation (NDVI)": ""
+}
+
+# Input resolution of each parameter (the sidebar's number_input steps);
+# readings on this grid can be scored through lookup tables (locast.lut)
+param_steps = {
+    "Rainfall": 1.0,
+    "Soil Moisture": 1.0,
+    "Soil Temperature": 0.5,
+    "Air Temperature": 0.5,
+    "Surface Wind Speed": 0.1,
+    "Wind Speed 850hPa": 0.1,
+    "Vegetation (NDVI)": 0.1,
+}
+
+# Compiled once at import; every scoring and rendering path reads from this
+# unless a threshold profile (see locast.profiles) is passed instead
+rules = compile_rules(thresholds, param_ranges, param_units, name="Cressman & Stefanski (2016)")
+
+def resolve_profile(profile=None):
+    """Return the given compiled profile, or the built-in rules"""
+    return rules if profile is None else profile
+
+def calculate_suitability(inputs, stage, profile=None):
+    """Calculate danger level based on input parameters and stage thresholds"""
+    optimal_count = 0
+    total_params = len(inputs)
+    
+    stage_rules = resolve_profile(profile)[stage]
+    for param, value in inputs.items():
+        if stage_rules[param].is_optimal(value):
+            optimal_count += 1
+    
+    danger_percentage = (optimal_count / total_params) * 100
+    
+    if danger_percentage >= 80:
+        return danger_levels[2]
+    elif danger_percentage >= 50:
+        return danger_levels[1]
+    else:
+        return danger_levels[0]
+
+def compile_stage_bounds(stage, params=None, profile=None):
+    """Lower/upper bound arrays of a stage's thresholds (upper may be inf)"""
+    return resolve_profile(profile)[stage].bounds(params)
+
+def classify_danger(danger_percentage):
+    """Map danger percentages to danger class indices into danger_levels"""
+    danger_percentage = np.asarray(danger_percentage)
+    return (danger_percentage >= 50).astype(np.uint8) + (danger_percentage >= 80)
+
+def score_batch(columns, stage, profile=None):
+    """Score many readings at once.
+
+    `columns` maps each parameter name to an array of readings (1-D per cell or
+    any N-D grid, all of the same shape). Returns the per-cell optimal counts,
+    danger percentages and danger class indices into `danger_levels`, matching
+    `calculate_suitability` cell for cell. `profile` is an optional compiled
+    threshold profile used instead of the built-in rules.
+    """
+    params, lower, upper = compile_stage_bounds(stage, columns, profile)
+    return score_with_bounds(columns, params, lower, upper)
+
+def score_with_bounds(columns, params, lower, upper):
+    """Score column arrays against already compiled bound arrays (the score_batch kernel)"""
+    optimal_count = None
+    for param, min_threshold, max_threshold in zip(params, lower, upper):
+        values = np.asarray(columns[param], dtype=np.float64)
+        in_range = (values >= min_threshold) & (values <= max_threshold)
+        if optimal_count is None:
+            optimal_count = in_range.astype(np.int64)
+        else:
+            optimal_count += in_range
+    
+    danger_percentage = (optimal_count / len(params)) * 100
+    return optimal_count, danger_percentage, classify_danger(danger_percentage)
+
+def score_all_stages(columns, stages=None, profile=None):
+    """Score readings against several stages in one pass.
+
+    `columns` must hold readings for every parameter of the requested stages.
+    Parameters that share bounds across stages (e.g. Rainfall) are checked
+    once. Returns the stage names plus stage x cell danger percentage and
+    danger class arrays.
+    """
+    profile = resolve_profile(profile)
+    stages = list(profile) if stages is None else list(stages)
+    in_range_cache = {}
+    danger_percentages = []
+    for stage in stages:
+        params, lower, upper = profile[stage].bounds()
+        optimal_count = 0
+        for param, min_threshold, max_threshold in zip(params, lower, upper):
+            key = (param, min_threshold, max_threshold)
+            if key not in in_range_cache:
+                values = np.asarray(columns[param], dtype=np.float64)
+                in_range_cache[key] = (values >= min_threshold) & (values <= max_threshold)
+            optimal_count = optimal_count + in_range_cache[key]
+        danger_percentages.append((optimal_count / len(params)) * 100)
+    
+    danger_percentage = np.stack(danger_percentages)
+    return stages, danger_percentage, classify_danger(danger_percentage)
+
+def sweep_values(rule, resolution=None):
+    """Values a parameter rule is swept over: its input grid, or `resolution` evenly spaced points"""
+    step = param_steps.get(rule.name)
+    if resolution is None and step:
+        count = int(round((rule.range_max - rule.range_min) / step)) + 1
+        return np.round(rule.range_min + np.arange(count) * step, 10)
+    return np.linspace(rule.range_min, rule.range_max, resolution or 101)
+
+def score_sweep(stage, x_param, y_param, fixed, resolution=None, profile=None):
+    """Danger surface over two parameters with the stage's others held fixed.
+
+    `fixed` gives the reading of every other stage parameter. Both swept
+    parameters run over their display range (see sweep_values). Returns the
+    x and y values plus y x x danger percentage and danger class arrays.
+    """
+    if x_param == y_param:
+        raise ValueError("Sweep needs two different parameters")
+    stage_rules = resolve_profile(profile)[stage]
+    x_values = sweep_values(stage_rules[x_param], resolution)
+    y_values = sweep_values(stage_rules[y_param], resolution)
+    shape = (len(y_values), len(x_values))
+    columns = {}
+    for param in stage_rules.params:
+        if param == x_param:
+            columns[param] = np.broadcast_to(x_values, shape)
+        elif param == y_param:
+            columns[param] = np.broadcast_to(y_values[:, None], shape)
+        else:
+            columns[param] = np.broadcast_to(np.float64(fixed[param]), shape)
+    _, danger_percentage, danger_class = score_batch(columns, stage, profile)
+    return x_values, y_values, danger_percentage, danger_class
+
+def stage_slug(stage):
+    """Column- and file-friendly name for a stage, e.g. 'Egg Laying' -> 'egg_laying'"""
+    return stage.lower().replace(" ", "_")
+
+def get_stage_parameters(stage, profile=None):
+    """Get the parameters for a specific stage"""
+    return list(resolve_profile(profile)[stage].params)
+
+def get_all_parameters(profile=None):
+    """Get the union of parameters across all stages, in first-seen order"""
+    return list(resolve_profile(profile).parameters)
+
+def get_parameter_defaults(param):
+    """Get default values for parameters"""
+    defaults = {
+        "Rainfall": 25.0,
+        "Soil Moisture": 30.0,
+        "Soil Temperature": 25.0,
+        "Air Temperature": 25.0,
+        "Surface Wind Speed": 5.0,
+        "Wind Speed 850hPa": 5.0,
+        "Vegetation (NDVI)": 0.5,
+    }
+    return defaults.get(param, 0.0)
+
+def parameter_suitability(inputs, stage, profile=None):
+    """Per-parameter suitability (0-100%) of readings within the stage's optimal range"""
+    stage_rules = resolve_profile(profile)[stage]
+    return [stage_rules[param].suitability(inputs[param]) for param in inputs]
@@ -0,0 +1,161 @@
+"""JSON scoring service for machine clients.
+
+    POST /score   {"stage": "Hopper", "readings": {"Rainfall": 22.0, ...}}
+                  -> {"stage": "Hopper", "level": "MODERATE DANGER", "danger_class": 1, "percentage": 60.0}
+    GET /health   request counts, batch sizes and latency percentiles
+
+A POST body may also be a list of such objects, answered with a list. Every
+reading of the stage is required and must be a finite number. Requests that arrive while a batch is
+being collected (up to max_delay, a few milliseconds) are scored together:
+one vectorized score_with_bounds call per stage in the batch, after which
+each caller's future gets its own row. The verdicts match
+calculate_suitability for the same readings.
+"""
+
+import asyncio
+import json
+import math
+import time
+from collections import deque
+
+import numpy as np
+
+from locast.http import start_server
+from locast.ingest import collect_batch
+from locast.scoring import danger_levels, resolve_profile, score_with_bounds
+
+# Most recent request latencies kept for the /health percentiles
+LATENCY_WINDOW = 10_000
+
+LATENCY_PERCENTILES = (50, 90, 99)
+
+
+def parse_request(data, profile):
+    """Validate one scoring request; returns (stage, readings in stage parameter order)"""
+    if not isinstance(data, dict):
+        raise ValueError("Each request must be a JSON object")
+    stage = data.get("stage")
+    if not isinstance(stage, str) or stage not in profile:
+        raise ValueError(f"Unknown stage {stage!r}; expected one of {', '.join(profile)}")
+    readings = data.get("readings")
+    if not isinstance(readings, dict):
+        raise ValueError("Request needs a 'readings' object")
+    values = []
+    for param in profile[stage].params:
+        if param not in readings:
+            raise ValueError(f"Missing reading {param!r} for {stage!r}")
+        value = readings[param]
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError(f"Reading {param!r} must be a number")
+        try:
+            value = float(value)
+        except OverflowError:  # integers beyond the float range
+            raise ValueError(f"Reading {param!r} is out of range") from None
+        if not math.isfinite(value):
+            raise ValueError(f"Reading {param!r} must be finite")
+        values.append(value)
+    return stage, values
+
+
+class ScoringService:
+    """Micro-batching scorer behind the /score and /health endpoints"""
+
+    def __init__(self, profile=None, max_batch=1024, max_delay=0.002, queue_size=10_000):
+        self.profile = resolve_profile(profile)
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.queue_size = queue_size
+        self.bounds = {stage: self.profile[stage].bounds() for stage in self.profile}
+        self.stats = {"requests": 0, "rejected": 0, "readings": 0, "batches": 0}
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.started = time.monotonic()
+        self.queue = None
+
+    async def score(self, stage, values):
+        """Queue one reading set and wait for its (danger percentage, danger class)"""
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((stage, values, future))
+        return await future
+
+    def score_batch(self, batch):
+        """Score a batch of queued reading sets, one vectorized pass per stage, and resolve their futures"""
+        by_stage = {}
+        for item in batch:
+            by_stage.setdefault(item[0], []).append(item)
+        for stage, items in by_stage.items():
+            params, lower, upper = self.bounds[stage]
+            values = np.array([item[1] for item in items])
+            columns = {param: values[:, index] for index, param in enumerate(params)}
+            _, danger_percentage, danger_class = score_with_bounds(columns, params, lower, upper)
+            for item, percentage, level in zip(items, danger_percentage.tolist(), danger_class.tolist()):
+                future = item[2]
+                if not future.done():  # the caller may have gone away
+                    future.set_result((percentage, level))
+        self.stats["readings"] += len(batch)
+        self.stats["batches"] += 1
+
+    async def score_batches(self):
+        while True:
+            self.score_batch(await collect_batch(self.queue, self.max_batch, self.max_delay))
+
+    async def handle(self, method, path, body):
+        """HTTP handler: POST /score for verdicts, GET /health for service statistics"""
+        if path == "/score":
+            if method != "POST":
+                return 405, {"error": "Use POST"}
+            started = time.perf_counter()
+            self.stats["requests"] += 1
+            try:
+                data = json.loads(body)
+                requests = [parse_request(item, self.profile) for item in (data if isinstance(data, list) else [data])]
+            except ValueError as error:
+                self.stats["rejected"] += 1
+                return 400, {"error": str(error)}
+            results = await asyncio.gather(*(self.score(stage, values) for stage, values in requests))
+            verdicts = [
+                {
+                    "stage": stage,
+                    "level": danger_levels[danger_class][0],
+                    "danger_class": danger_class,
+                    "percentage": percentage,
+                }
+                for (stage, _), (percentage, danger_class) in zip(requests, results)
+            ]
+            self.latencies.append(time.perf_counter() - started)
+            return 200, verdicts if isinstance(data, list) else verdicts[0]
+        if path == "/health":
+            if method != "GET":
+                return 405, {"error": "Use GET"}
+            return 200, self.health()
+        return 404, {"error": f"No route for {method} {path}"}
+
+    def health(self):
+        batches = self.stats["batches"]
+        latency = {}
+        if self.latencies:
+            values = np.percentile(np.array(self.latencies) * 1000, LATENCY_PERCENTILES)
+            latency = {f"p{percentile}": round(value, 3) for percentile, value in zip(LATENCY_PERCENTILES, values)}
+        return {
+            "status": "ok",
+            "profile": self.profile.name,
+            "uptime_seconds": round(time.monotonic() - self.started, 1),
+            **self.stats,
+            "mean_batch_size": round(self.stats["readings"] / batches, 2) if batches else 0.0,
+            "queued": self.queue.qsize() if self.queue is not None else 0,
+            "latency_ms": latency,
+        }
+
+    async def start(self, host="127.0.0.1", port=8080):
+        """Start the batch scorer and the HTTP server; returns (scorer task, asyncio Server)"""
+        self.queue = asyncio.Queue(maxsize=self.queue_size)
+        scorer = asyncio.create_task(self.score_batches())
+        return scorer, await start_server(self.handle, host, port)
+
+    async def run(self, host="127.0.0.1", port=8080):
+        """Serve until cancelled"""
+        scorer, server = await self.start(host, port)
+        try:
+            await scorer
+        finally:
+            scorer.cancel()
+            server.close()
@@ -0,0 +1,217 @@
+"""Persistent SQLite store of scoring results.
+
+Each scored reading is stored under a 64-bit key hashed from its parameter
+values, seeded with the rule set fingerprint and the stage, so editing a
+threshold profile never serves stale results. The readings themselves are
+stored next to the result and compared on every hit, so two readings whose
+keys collide are never confused; a collision is simply scored again.
+
+    with ScoreStore("scores.sqlite") as store:
+        optimal_count, danger_percentage, danger_class = store.score(columns, "Hopper")
+
+Keys are computed for whole columns at once with NumPy, lookups go through
+a temporary key table joined against the store, and new results are
+written with one executemany per batch in key order, so the store works in
+bulk at millions of rows. Only the optimal count is stored; the percentage
+and class are derived from it exactly as score_batch does.
+
+For the threshold rules themselves the store does not save time: on a
+million rows score_batch takes about 15 ms, hashing the keys alone about
+30 ms, and a pass through SQLite seconds. It is meant for callers whose
+results are costlier to produce than to look up, or that want the scored
+readings kept on disk; re-scoring a region is fastest with score_batch.
+"""
+
+import hashlib
+import sqlite3
+from itertools import chain
+
+import numpy as np
+
+from locast.scoring import classify_danger, resolve_profile, score_batch
+
+# Rows per executemany / temporary-table batch
+BATCH_SIZE = 100_000
+
+_MIX_1 = np.uint64(0xBF58476D1CE4E5B9)
+_MIX_2 = np.uint64(0x94D049BB133111EB)
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+
+
+def mix64(h):
+    """splitmix64 finalizer, applied in place to a uint64 array"""
+    h ^= h >> np.uint64(30)
+    h *= _MIX_1
+    h ^= h >> np.uint64(27)
+    h *= _MIX_2
+    h ^= h >> np.uint64(31)
+    return h
+
+
+def key_seed(fingerprint, stage):
+    """64-bit seed tying keys to one rule set and stage"""
+    digest = hashlib.sha256(f"{fingerprint}\0{stage}".encode("utf-8")).digest()
+    return np.uint64(int.from_bytes(digest[:8], "little"))
+
+
+def canonical_readings(columns, params):
+    """(rows, len(params)) float64 readings with -0.0 as 0.0 and a single NaN bit pattern"""
+    readings = np.empty((np.size(columns[params[0]]), len(params)))
+    for index, param in enumerate(params):
+        readings[:, index] = np.asarray(columns[param], dtype=np.float64).ravel() + 0.0  # -0.0 becomes 0.0
+    readings[np.isnan(readings)] = np.nan
+    return readings
+
+
+def reading_keys(columns, params, seed):
+    """Signed 64-bit key per row, hashed from the readings of `params` in order"""
+    bits = canonical_readings(columns, params).view(np.uint64)
+    keys = np.full(bits.shape[0], seed, dtype=np.uint64)
+    for index in range(len(params)):
+        keys ^= bits[:, index]
+        keys += _GOLDEN
+        mix64(keys)
+    return keys.view(np.int64)
+
+
+class ScoreStore:
+    """SQLite-backed cache of optimal counts keyed by reading hash and checked against the stored readings"""
+
+    def __init__(self, path, batch_size=BATCH_SIZE):
+        self.path = path
+        self.batch_size = batch_size
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        columns = [row[1] for row in self.connection.execute("PRAGMA table_info(scores)")]
+        if columns and "readings" not in columns:
+            # Stores from before readings were kept cannot be checked for collisions; start afresh
+            self.connection.execute("DROP TABLE scores")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS scores "
+            "(key INTEGER PRIMARY KEY, readings BLOB NOT NULL, optimal_count INTEGER NOT NULL)"
+        )
+        self.connection.execute("CREATE TEMP TABLE lookup (key INTEGER PRIMARY KEY)")
+        self.connection.commit()
+        self.hits = 0
+        self.misses = 0
+        self.collisions = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.connection.close()
+
+    def __len__(self):
+        return self.connection.execute("SELECT COUNT(*) FROM scores").fetchone()[0]
+
+    def lookup(self, keys, readings):
+        """Stored optimal counts for keys; returns (counts, found mask), counts are 0 where not found.
+
+        `readings` holds each key's canonical readings (one row per key); a
+        stored entry only counts as found when its readings are identical.
+        """
+        keys = np.asarray(keys, dtype=np.int64)
+        counts = np.zeros(keys.shape, dtype=np.int64)
+        found = np.zeros(keys.shape, dtype=bool)
+        if not keys.size:
+            return counts, found
+
+        # Sorted unique keys, so the join walks the B-tree in order and the
+        # results can be matched with searchsorted over sorted queries
+        order = np.argsort(keys, axis=None)
+        sorted_keys = keys.ravel()[order]
+        first = np.empty(sorted_keys.size, dtype=bool)
+        first[0] = True
+        np.not_equal(sorted_keys[1:], sorted_keys[:-1], out=first[1:])
+        unique_keys = sorted_keys[first]
+
+        rows = []
+        for start in range(0, unique_keys.size, self.batch_size):
+            batch = unique_keys[start:start + self.batch_size]
+            with self.connection:
+                self.connection.execute("DELETE FROM lookup")
+                self.connection.executemany("INSERT INTO lookup (key) VALUES (?)", zip(batch.tolist()))
+                rows += self.connection.execute(
+                    "SELECT scores.key, scores.optimal_count, scores.readings "
+                    "FROM lookup JOIN scores ON scores.key = lookup.key"
+                ).fetchall()
+        if not rows:
+            return counts, found
+
+        stored_keys = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+        stored_counts = np.fromiter((row[1] for row in rows), dtype=np.int64, count=len(rows))
+        readings = np.asarray(readings, dtype=np.float64).reshape(keys.size, -1)
+        width = readings.shape[1] * readings.itemsize
+        # An entry of another stage (other parameter count) becomes a NaN pattern no canonical reading has
+        blobs = (row[2] if len(row[2]) == width else b"\xff" * width for row in rows)
+        stored_readings = np.frombuffer(b"".join(blobs), dtype=np.float64).reshape(len(rows), -1)
+        stored_order = np.argsort(stored_keys)
+        stored_keys, stored_counts, stored_readings = (
+            array[stored_order] for array in (stored_keys, stored_counts, stored_readings)
+        )
+        position = np.searchsorted(stored_keys, unique_keys).clip(max=len(stored_keys) - 1)
+        unique_found = stored_keys[position] == unique_keys
+
+        # Expand to every queried row, and only accept entries holding the row's own readings
+        run = np.cumsum(first) - 1
+        entry = np.empty(keys.size, dtype=np.intp)
+        entry[order] = position[run]
+        key_found = np.empty(keys.size, dtype=bool)
+        key_found[order] = unique_found[run]
+        same = (stored_readings[entry].view(np.uint64) == readings.view(np.uint64)).all(axis=1)
+        self.collisions += int(np.count_nonzero(key_found & ~same))
+        found.ravel()[:] = key_found & same
+        counts.ravel()[:] = np.where(found.ravel(), stored_counts[entry], 0)
+        return counts, found
+
+    def upsert(self, keys, readings, optimal_counts):
+        """Insert or replace stored readings and optimal counts in bulk"""
+        keys = np.asarray(keys, dtype=np.int64).ravel()
+        readings = np.ascontiguousarray(readings, dtype=np.float64).reshape(keys.size, -1)
+        optimal_counts = np.asarray(optimal_counts, dtype=np.int64).ravel()
+        order = np.argsort(keys)  # in-order inserts are several times faster than random ones
+        keys, readings, optimal_counts = keys[order], readings[order], optimal_counts[order]
+        for start in range(0, keys.size, self.batch_size):
+            stop = start + self.batch_size
+            with self.connection:
+                self.connection.executemany(
+                    "INSERT OR REPLACE INTO scores (key, readings, optimal_count) VALUES (?, ?, ?)",
+                    zip(keys[start:stop].tolist(), map(bytes, readings[start:stop]), optimal_counts[start:stop].tolist()),
+                )
+
+    def score(self, columns, stage, profile=None):
+        """Score readings like score_batch, serving unchanged readings from the store.
+
+        `columns` must hold readings for each of the stage's parameters; only
+        rows missing from the store are scored and then written back.
+        """
+        profile = resolve_profile(profile)
+        params = profile[stage].params
+        shape = np.shape(columns[params[0]])
+        readings = canonical_readings(columns, params)
+        keys = reading_keys(columns, params, key_seed(profile.fingerprint, stage))
+        optimal_count, found = self.lookup(keys, readings)
+
+        missing = np.flatnonzero(~found)
+        if missing.size:
+            subset = {param: readings[missing, index] for index, param in enumerate(params)}
+            optimal_count[missing], _, _ = score_batch(subset, stage, profile)
+            self.upsert(keys[missing], readings[missing], optimal_count[missing])
+        self.hits += keys.size - missing.size
+        self.misses += missing.size
+
+        optimal_count = optimal_count.reshape(shape)
+        danger_percentage = (optimal_count / len(params)) * 100
+        return optimal_count, danger_percentage, classify_danger(danger_percentage)
+
+    def score_all_stages(self, columns, stages=None, profile=None):
+        """Like score_all_stages, stage by stage through the store"""
+        profile = resolve_profile(profile)
+        stages = list(profile) if stages is None else list(stages)
+        danger_percentage = np.stack([self.score(columns, stage, profile)[1] for stage in stages])
+        return stages, danger_percentage, classify_danger(danger_percentage)
@@ -0,0 +1,220 @@
+"""Rolling-window aggregation of daily readings per station or grid cell.
+
+Thresholds such as Rainfall 20-28 mm describe accumulations, not single
+readings, so daily observations are aggregated over a trailing window
+(rainfall summed, temperatures and moisture averaged, wind speeds maxed)
+before scoring. Each new day updates the aggregates in O(1) per location:
+
+* sums keep a running total and subtract the reading leaving the window;
+* maxima use the block (van Herk/Gil-Werman) scheme: the window is split
+  into the suffix of the previous block and the prefix of the current one,
+  and the suffix maxima are rebuilt once per block, i.e. O(1) amortized.
+
+Missing readings (NaN) are left out: sums and means only cover the valid
+readings in the window (a count of them is kept per location), and maxima
+ignore them. A location with no valid reading in the window aggregates to
+NaN, which never scores as optimal.
+
+The window state can be saved and reloaded, so a daily run only processes
+the new day of data. Locations added later start with an all-missing
+history.
+"""
+
+import numpy as np
+
+from locast.scoring import resolve_profile, score_all_stages, score_batch
+
+DEFAULT_WINDOW_DAYS = 30
+
+# How each parameter is aggregated over the window
+window_aggregations = {
+    "Rainfall": "sum",
+    "Soil Moisture": "mean",
+    "Soil Temperature": "mean",
+    "Air Temperature": "mean",
+    "Surface Wind Speed": "max",
+    "Wind Speed 850hPa": "max",
+    "Vegetation (NDVI)": "mean",
+}
+
+AGGREGATIONS = ("sum", "mean", "max")
+
+
+def skip_missing(values):
+    """Max-aggregation values with missing readings (NaN) as -inf, so maxima ignore them"""
+    return np.where(np.isnan(values), -np.inf, values)
+
+
+class RollingWindow:
+    """Trailing window of daily readings for a fixed set of locations"""
+
+    def __init__(self, params, n_locations, window=DEFAULT_WINDOW_DAYS, aggregations=None):
+        if window < 1:
+            raise ValueError("window must be at least 1 day")
+        aggregations = {**window_aggregations, **(aggregations or {})}
+        self.params = list(params)
+        self.aggregations = {param: aggregations.get(param, "mean") for param in self.params}
+        for param, aggregation in self.aggregations.items():
+            if aggregation not in AGGREGATIONS:
+                raise ValueError(f"Unknown aggregation {aggregation!r} for {param!r}")
+        self.n_locations = n_locations
+        self.window = window
+        self.days = 0
+
+        shape = (window, n_locations)
+        self.history = {param: np.zeros(shape) for param in self.params}
+        self.sums = {param: np.zeros(n_locations) for param in self.params if self.aggregations[param] != "max"}
+        # Which history slots hold a valid reading, and how many per location
+        self.valid = {param: np.zeros(shape, dtype=bool) for param in self.sums}
+        self.counts = {param: np.zeros(n_locations, dtype=np.int64) for param in self.sums}
+        self.suffix_max = {param: np.full(shape, -np.inf) for param in self.params if self.aggregations[param] == "max"}
+        self.prefix_max = {param: np.full(n_locations, -np.inf) for param in self.suffix_max}
+
+    @property
+    def full(self):
+        """Whether a whole window of days has been seen"""
+        return self.days >= self.window
+
+    def add_locations(self, count):
+        """Append locations with no readings in the window yet (their aggregates are NaN until they report)"""
+        for param in self.params:
+            missing = 0.0 if param in self.sums else -np.inf
+            self.history[param] = np.concatenate([self.history[param], np.full((self.window, count), missing)], axis=1)
+        for param in self.sums:
+            self.sums[param] = np.concatenate([self.sums[param], np.zeros(count)])
+            self.valid[param] = np.concatenate([self.valid[param], np.zeros((self.window, count), dtype=bool)], axis=1)
+            self.counts[param] = np.concatenate([self.counts[param], np.zeros(count, dtype=np.int64)])
+        for param in self.suffix_max:
+            self.suffix_max[param] = np.concatenate([self.suffix_max[param], np.full((self.window, count), -np.inf)], axis=1)
+            self.prefix_max[param] = np.concatenate([self.prefix_max[param], np.full(count, -np.inf)])
+        self.n_locations += count
+
+    def push(self, readings):
+        """Add one day of readings ({param: array of n_locations values})"""
+        position = self.days % self.window
+        for param in self.params:
+            values = np.asarray(readings[param], dtype=np.float64)
+            if values.shape != (self.n_locations,):
+                raise ValueError(f"Expected {self.n_locations} readings for {param!r}, got shape {values.shape}")
+            history = self.history[param]
+            finite = np.isfinite(values)
+
+            if self.aggregations[param] == "max":
+                values = skip_missing(values)
+                if position == 0:
+                    if self.days:
+                        # history now holds exactly the block that just finished
+                        self.suffix_max[param] = np.maximum.accumulate(history[::-1], axis=0)[::-1]
+                    self.prefix_max[param] = values.copy()
+                else:
+                    np.maximum(self.prefix_max[param], values, out=self.prefix_max[param])
+                history[position] = values
+            else:
+                # Missing readings are stored as 0 and left out of the valid count
+                values = np.where(finite, values, 0.0)
+                history_sum = self.sums[param]
+                valid = self.valid[param]
+                if self.full:
+                    history_sum -= history[position]
+                    self.counts[param] -= valid[position]
+                history_sum += values
+                self.counts[param] += finite
+                history[position] = values
+                valid[position] = finite
+                if position == self.window - 1:
+                    # Resynchronise once per block so float error cannot accumulate
+                    history_sum[:] = history.sum(axis=0)
+        self.days += 1
+
+    def aggregates(self):
+        """Current window aggregate per parameter (over the days seen so far if not yet full)"""
+        if self.days == 0:
+            raise ValueError("No readings have been pushed yet")
+        last = (self.days - 1) % self.window
+        result = {}
+        for param in self.params:
+            aggregation = self.aggregations[param]
+            if aggregation == "max":
+                if last + 1 < self.window:
+                    maxima = np.maximum(self.suffix_max[param][last + 1], self.prefix_max[param])
+                else:
+                    maxima = self.prefix_max[param].copy()
+                maxima[maxima == -np.inf] = np.nan
+                result[param] = maxima
+            else:
+                counts = self.counts[param]
+                with np.errstate(invalid="ignore", divide="ignore"):
+                    total = np.where(counts > 0, self.sums[param], np.nan)
+                    result[param] = total if aggregation == "sum" else total / counts
+        return result
+
+    def save(self, path, **extra):
+        """Save the window state (plus any extra arrays) to an .npz file"""
+        arrays = {
+            "params": np.array(self.params),
+            "aggregations": np.array([self.aggregations[param] for param in self.params]),
+            "window": self.window,
+            "days": self.days,
+        }
+        for index, param in enumerate(self.params):
+            arrays[f"history_{index}"] = self.history[param]
+            if param in self.sums:
+                arrays[f"sum_{index}"] = self.sums[param]
+                arrays[f"valid_{index}"] = self.valid[param]
+            else:
+                arrays[f"suffix_max_{index}"] = self.suffix_max[param]
+                arrays[f"prefix_max_{index}"] = self.prefix_max[param]
+        np.savez(path, **arrays, **extra)
+
+    @classmethod
+    def load(cls, path):
+        """Load a window saved with save(); returns (window, extra arrays)"""
+        with np.load(path) as data:
+            params = [str(param) for param in data["params"]]
+            aggregations = {param: str(kind) for param, kind in zip(params, data["aggregations"])}
+            n_locations = data["history_0"].shape[1]
+            rolling = cls(params, n_locations, window=int(data["window"]), aggregations=aggregations)
+            rolling.days = int(data["days"])
+            for index, param in enumerate(params):
+                rolling.history[param] = data[f"history_{index}"].copy()
+                if param in rolling.sums:
+                    rolling.load_sums(param, data[f"sum_{index}"], data.get(f"valid_{index}"))
+                else:
+                    # Older states may hold NaN for missing readings; maxima now skip them as -inf
+                    rolling.history[param] = skip_missing(rolling.history[param])
+                    rolling.suffix_max[param] = skip_missing(data[f"suffix_max_{index}"])
+                    rolling.prefix_max[param] = skip_missing(data[f"prefix_max_{index}"])
+            reserved = {"params", "aggregations", "window", "days"}
+            extra = {
+                key: data[key] for key in data.files
+                if key not in reserved and not key.startswith(("history_", "sum_", "valid_", "suffix_max_", "prefix_max_"))
+            }
+        return rolling, extra
+
+    def load_sums(self, param, sums, valid):
+        """Restore a sum/mean parameter's state; states saved without a valid mask are rebuilt from the history"""
+        if valid is not None:
+            self.sums[param] = sums.copy()
+            self.valid[param] = valid.copy()
+        else:
+            history = self.history[param]
+            valid = np.isfinite(history)
+            valid[min(self.days, self.window):] = False
+            history[~valid] = 0.0
+            self.valid[param] = valid
+            self.sums[param] = history.sum(axis=0)
+        self.counts[param] = self.valid[param].sum(axis=0)
+
+
+def score_day(rolling, readings, stage=None, profile=None):
+    """Push one day of readings and score the updated window aggregates.
+
+    With a stage, returns score_batch's result for that stage; without one,
+    returns score_all_stages's result for every stage.
+    """
+    rolling.push(readings)
+    aggregates = rolling.aggregates()
+    if stage is None:
+        return score_all_stages(aggregates, profile=profile)
+    params = resolve_profile(profile)[stage].params
+    return score_batch({param: aggregates[param] for param in params}, stage, profile)
@@ -1,302 +1,164 @@
+import base64
+import io
+import os
+import re
 import streamlit as st
 from datetime import datetime
-import plotly.graph_objects as go
-
-# Configure page
-st.set_page_config(
-    page_title="LOCAST",
-    page_icon="",
-    layout="wide",
-    initial_sidebar_state="expanded"
+from locast.profiles import list_profiles, load_profile
+from locast import metrics
+from locast.cache import LRUCache
+from locast.ensemble import class_probabilities, ensemble_probabilities, read_ensemble_csv
+from locast.ingest import read_state
+from locast.pyramid import load_pyramid, pyramid_path
+from locast.scoring import (
+    calculate_suitability,
+    danger_levels,
+    get_all_parameters,
+    get_parameter_defaults,
+    get_stage_parameters,
+    parameter_suitability,
+    resolve_profile,
+    score_all_stages,
+    score_sweep,
+    stage_slug,
 )
 
-# Initialize session state
-if 'show_locust_info' not in st.session_state:
-    st.session_state.show_locust_info = False
-if 'show_stage_info' not in st.session_state:
-    st.session_state.show_stage_info = False
-if 'show_recent_events' not in st.session_state:
-    st.session_state.show_recent_events = False
-if 'show_organizations' not in st.session_state:
-    st.session_state.show_organizations = False
-
-# Custom CSS with Montserrat and Glacial Indifference fonts, and new color palette
-st.markdown("""
-<style>
-    @import url('https://fonts.googleapis.com/css2?family=Montserrat:wght@700&family=Glacial+Indifference:wght@700&display=swap');
-    body, .main-header {
-        background: #ffdb99 !important;
-    }
-    .main-header {
-        padding: 2rem;
-        border-radius: 10px;
-        margin-bottom: 2rem;
-        box-shadow: 0 4px 6px rgba(0,0,0,0.1);
-    }
-    .main-header h1 {
-        color: #ffffff;
-        text-align: center;
-        margin: 0;
-        font-size: 3rem;
-        font-family: 'Montserrat', sans-serif;
-        font-weight: 400;
-        text-shadow: 2px 2px 4px rgba(0,0,0,0.3);
-    }
-    .tagline {
-        color: #ffffff;
-        text-align: center;
-        font-size: 1.4rem;
-        margin: 0.5rem 0;
-        font-family: 'Glacial Indifference', sans-serif;
-        font-weight: 700;
-    }
-    .region-info {
-        color: #ffffff;
-        text-align: center;
-        font-size: 1.1rem;
-        margin: 0;
-        font-family: 'Glacial Indifference', sans-serif;
-    }
-    .parameter-container {
-        background: #fff8e1;
-        padding: 1.5rem;
-        border-radius: 10px;
-        margin-bottom: 1rem;
-        border-left: 4px solid #ffbd59;
-        box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-    }
-    .result-container {
-        padding: 2rem;
-        border-radius: 15px;
-        margin: 1rem 0;
-        text-align: center;
-        font-size: 1.4rem;
-        font-weight: bold;
-        box-shadow: 0 4px 6px rgba(0,0,0,0.1);
-    }
-    .danger-high {
-        background: #ffcdd2;
-        color: #c62828;
-        border: 3px solid #e57373;
-    }
-    .danger-moderate {
-        background: #ffcc02;
-        color: #ef6c00;
-        border: 3px solid #ffb74d;
-    }
-    .safe {
-        background: #c8e6c9;
-        color: #2e7d32;
-        border: 3px solid #81c784;
-    }
-    .info-button {
-        background: #ffdb99;
-        color: #ffffff;
-        border: none;
-        padding: 0.8rem 1.5rem;
-        border-radius: 25px;
-        font-size: 1rem;
-        font-weight: bold;
-        cursor: pointer;
-        margin: 0.5rem;
-        transition: all 0.3s ease;
-        box-shadow: 0 2px 4px rgba(0,0,0,0.2);
-        font-family: 'Glacial Indifference', sans-serif;
-    }
-    .info-button:hover {
-        transform: translateY(-2px);
-        box-shadow: 0 4px 8px rgba(0,0,0,0.3);
-    }
-    .logo-container {
-        text-align: center;
-        margin-bottom: 1rem;
-    }
-    .logo-image {
-        border-radius: 10px;
-        box-shadow: 0 2px 4px rgba(0,0,0,0.2);
-        margin: 1rem 0;
-        max-width: 200px;
-        height: auto;
-    }
-    .alert-banner {
-        background: #ffdb99;
-        color: #ffffff;
-        padding: 1rem;
-        border-radius: 10px;
-        margin: 1rem 0;
-        text-align: center;
-        font-weight: bold;
-        font-family: 'Glacial Indifference', sans-serif;
-    }
-    .reference-note {
-        font-style: italic;
-        color: #666;
-        font-size: 0.9rem;
-        margin-top: 1rem;
-        text-align: center;
-    }
-    @media (max-width: 600px) {
-        .main-header h1 { font-size: 2rem; }
-        .parameter-container { padding: 1rem; }
-        .result-container { font-size: 1.2rem; }
-        .info-button { padding: 0.6rem 1rem; font-size: 0.9rem; }
-        .logo-image { max-width: 150px; }
-    }
-</style>
-""", unsafe_allow_html=True)
-
-# Environmental Suitability Thresholds (OPTIMAL CONDITIONS for locusts)
-thresholds = {
-    "Egg Laying": {
-        "Rainfall": (20, 28),
-        "Soil Moisture": (20, 40),
-        "Soil Temperature": (15, 35),
-        "Air Temperature": (18, 35),
-    },
-    "Hopper": {
-        "Rainfall": (20, 28),
-        "Surface Wind Speed": (0, 2),
-        "Air Temperature": (22, 34),
-    },
-    "Adult": {
-        "Rainfall": (20, 28),
-        "Surface Wind Speed": (6, 8),
-        "Soil Temperature": (15, 24),
-        "Air Temperature": (20, 22),
-    },
-    "Swarm": {
-        "Rainfall": (20, 28),
-        "Wind Speed 850hPa": (6, float('inf')),  # >6 m/s
-        "Air Temperature": (23, 26),
-        "Vegetation (NDVI)": (0.5, 1.0),
-    }
-}
-
-# Parameter ranges for visualization
-param_ranges = {
-    "Rainfall": (0, 50),
-    "Soil Moisture": (0, 50),
-    "Soil Temperature": (15, 50),
-    "Air Temperature": (15, 50),
-    "Surface Wind Speed": (0, 10),
-    "Wind Speed 850hPa": (0, 10),
-    "Vegetation (NDVI)": (0, 1),
-}
-
-# Parameter units
-param_units = {
-    "Rainfall": "mm",
-    "Soil Moisture": "%",
-    "Soil Temperature": "°C",
-    "Air Temperature": "°C",
-    "Surface Wind Speed": "m/s",
-    "Wind Speed 850hPa": "m/s",
-    "Vegetation (NDVI)": ""
-}
-
-@st.cache_data
-def create_parameter_bar(param_name, value, stage):
-    """Create a visual bar showing safe and optimal (locust-suitable) zones"""
-    min_val, max_val = param_ranges[param_name]
-    optimal_min, optimal_max = thresholds[stage][param_name]
-
-    # Normalize values for HTML positioning
-    def normalize(v): 
-        return max(0, min(1, (v - min_val) / (max_val - min_val)))
-
-    normalized_value = normalize(value)
-    normalized_optimal_min = normalize(optimal_min)
-    normalized_optimal_max = min(normalize(optimal_max), 1.0)  # Cap at 1 for infinite max
-
-    is_optimal = optimal_min <= value <= optimal_max
-    marker_color = '#1a1a1a' if is_optimal else '#ffffff'
-    badge_bg = '#ffcdd2' if is_optimal else '#c8e6c9'
-    badge_text = '#c62828' if is_optimal else '#2e7d32'
-
-    # Modularized HTML components
-    bar_background = """
-    <div style="position: relative; height: 40px; background: linear-gradient(to right, #c8e6c9, #a5d6a7); border-radius: 20px; overflow: hidden; border: 2px solid #ddd;">
-    """
-    optimal_zone = f"""
-    <div style="position: absolute; left: {normalized_optimal_min * 100}%; width: {(normalized_optimal_max - normalized_optimal_min) * 100}%; height: 100%;
-                background: linear-gradient(135deg, #d32f2f 0%, #f44336 100%); opacity: 0.9;">
-    </div>
-    """
-    value_marker = f"""
-    <div style="position: absolute; left: {normalized_value * 100}%; width: 6px; height: 100%; background: {marker_color}; border-radius: 3px;
-                transform: translateX(-50%); box-shadow: 0 0 10px rgba(0,0,0,0.5);">
-    </div>
-    """
-    value_labels = f"""
-    <div style="position: absolute; left: 8px; top: 50%; transform: translateY(-50%);
-                font-size: 13px; color: #000; font-weight: bold;">
-        {min_val}{param_units[param_name]}
-    </div>
-    <div style="position: absolute; right: 8px; top: 50%; transform: translateY(-50%);
-                font-size: 13px; color: #000; font-weight: bold;">
-        {max_val}{param_units[param_name]}
-    </div>
-    </div>
-    """
-    current_value = f"""
-    <div style="text-align: center; margin-top: 8px;">
-        <span style="background: {badge_bg}; padding: 4px 12px; border-radius: 15px;
-                     font-size: 14px; font-weight: bold; color: {badge_text};">
-            Current: {value:.1f}{param_units[param_name]}
-        </span>
-    </div>
+# Latest-state file written by the ingestion service (python -m locast ingest)
+INGEST_STATE_PATH = os.environ.get("LOCAST_INGEST_STATE", "station_state.json")
+FEED_REFRESH_SECONDS = 10
+FEED_TABLE_ROWS = 200
+
+# Danger class rasters written by python -m locast raster, one per stage (e.g. rasters/hopper.npy)
+RASTER_DIR = os.environ.get("LOCAST_RASTER_DIR", "rasters")
+
+# Stylesheet and logo; static/ is served at ./app/static/ when server.enableStaticServing is on
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+STYLESHEET_PATH = os.path.join(APP_DIR, "static", "locast.css")
+# Relative font URLs in the stylesheet, e.g. url('fonts/montserrat-700-latin.woff2')
+FONT_URL = re.compile(r"url\('fonts/([^']+)'\)")
+LOGO_PATH = os.path.join(APP_DIR, "logo", "LOCAST_2.png")
+LOGO_WIDTH = 200
+
+# Safe, moderate and high danger colors of the heatmaps (the result box backgrounds)
+DANGER_COLORS = ("#c8e6c9", "#ffcc02", "#ffcdd2")
+
+def configure_page():
+    """Configure the Streamlit page; must run before any other st call"""
+    st.set_page_config(
+        page_title="LOCAST",
+        page_icon="",
+        layout="wide",
+        initial_sidebar_state="expanded"
+    )
+
+def init_session_state():
+    """Initialize the information center toggles for a new session"""
+    for key in ("show_locust_info", "show_stage_info", "show_recent_events", "show_organizations"):
+        if key not in st.session_state:
+            st.session_state[key] = False
+
+def inject_styles():
+    """Link the stylesheet (static/locast.css) with its self-hosted Montserrat and Glacial Indifference fonts.
+
+    With static serving on, a run only sends a short <link>; the browser
+    downloads the stylesheet and fonts once and reuses them. Otherwise the
+    stylesheet, read once per version of the file, is inlined with the
+    fonts embedded.
     """
-    range_info = f"""
-    <div style="display: flex; justify-content: space-between; margin-top: 8px; font-size: 12px;">
-        <span style="color: #2e7d32;">🟢 Safe Zone</span>
-        <span style="color: #666;">Optimal Zone: {optimal_min}-{optimal_max if optimal_max != float('inf') else '∞'}{param_units[param_name]}</span>
-        <span style="color: #d32f2f;">🔴 Locust Optimal</span>
-    </div>
+    version = file_version(STYLESHEET_PATH)
+    if st.get_option("server.enableStaticServing"):
+        html = f'<link rel="stylesheet" href="./app/static/locast.css?v={version}">'
+    else:
+        html = f"<style>\n{load_stylesheet(STYLESHEET_PATH, version)}</style>"
+    with metrics.span("inject_styles"):
+        st.markdown(html, unsafe_allow_html=True)
+    metrics.count("html_bytes", len(html))
+
+@st.cache_resource(max_entries=2)
+def load_stylesheet(path, version):
+    """Stylesheet text for inlining, read once per version of the file.
+
+    Inlined, the relative font URLs would resolve against the page, and
+    without static serving nothing serves them there, so the fonts are
+    embedded as data: URIs instead.
     """
+    with open(path, encoding="utf-8") as handle:
+        css = handle.read()
+    font_dir = os.path.join(os.path.dirname(path), "fonts")
+    return FONT_URL.sub(lambda match: font_data_url(os.path.join(font_dir, match.group(1))), css)
 
-    return f"""
-    <div style="margin: 15px 0;">
-        {bar_background}
-        {optimal_zone}
-        {value_marker}
-        {value_labels}
-        {current_value}
-        {range_info}
-    </div>
+def font_data_url(path):
+    """CSS url() embedding a woff2 font file"""
+    with open(path, "rb") as handle:
+        return f"url('data:font/woff2;base64,{base64.b64encode(handle.read()).decode('ascii')}')"
+
+@st.cache_resource(max_entries=4)
+def load_logo(path, width, version):
+    """PNG bytes of an image downsized to twice its display width (sharp on high-DPI screens)"""
+    from PIL import Image
+    
+    with Image.open(path) as image:
+        image.thumbnail((width * 2, image.height), Image.LANCZOS)
+        # A flat logo loses nothing visible in a 256-color palette, and the PNG shrinks about 5x
+        image = image.quantize(256, method=Image.Quantize.FASTOCTREE)
+        buffer = io.BytesIO()
+        image.save(buffer, format="PNG", optimize=True)
+    return buffer.getvalue()
+
+@st.cache_resource
+def get_bar_cache():
+    """Process-wide LRU cache of rendered parameter bars, shared by all sessions"""
+    return LRUCache(maxsize=int(os.environ.get("LOCAST_BAR_CACHE_SIZE", "2048")))
+
+def create_parameter_bar(param_name, value, stage, profile=None):
+    """Create a visual bar showing safe and optimal (locust-suitable) zones.
+
+    Bars are cached per reading quantized to the displayed precision (0.1);
+    the exact optimal check is part of the key so a reading just outside a
+    threshold never reuses the bar of one just inside it.
     """
+    profile = resolve_profile(profile)
+    rule = profile[stage][param_name]
+    is_optimal = rule.is_optimal(value)
+    display_value = f"{value:.1f}"
+    key = (profile.fingerprint, stage, param_name, display_value, is_optimal)
+    return get_bar_cache().get_or_create(
+        key, lambda: build_parameter_bar(rule, float(display_value), is_optimal)
+    )
 
-def calculate_suitability(inputs, stage):
-    """Calculate danger level based on input parameters and stage thresholds"""
-    optimal_count = 0
-    total_params = len(inputs)
-    
-    for param, value in inputs.items():
-        min_threshold, max_threshold = thresholds[stage][param]
-        if min_threshold <= value <= max_threshold:
-            optimal_count += 1
-    
-    danger_percentage = (optimal_count / total_params) * 100
-    
-    if danger_percentage >= 80:
-        return "HIGH DANGER", "🔴", "danger-high"
-    elif danger_percentage >= 50:
-        return "MODERATE DANGER", "🟡", "danger-moderate"
-    else:
-        return "SAFE CONDITIONS", "🟢", "safe"
+def build_parameter_bar(rule, value, is_optimal):
+    """Build the HTML of one parameter bar"""
+    # Only the positions vary per bar; all styling comes from the shared .param-bar classes
+    state = " optimal" if is_optimal else ""
+    return (
+        f'<div class="param-bar{state}" style="--zone-left:{rule.optimal_left_pct:.2f}%;'
+        f'--zone-width:{rule.optimal_width_pct:.2f}%;--value:{rule.normalize(value) * 100:.2f}%">'
+        f'<div class="param-bar-track"><div class="param-bar-zone"></div><div class="param-bar-marker"></div>'
+        f'<div class="param-bar-label min">{rule.range_min_display}</div>'
+        f'<div class="param-bar-label max">{rule.range_max_display}</div></div>'
+        f'<div class="param-bar-current"><span>Current: {value:.1f}{rule.unit}</span></div>'
+        f'<div class="param-bar-legend"><span class="legend-safe">🟢 Safe Zone</span>'
+        f'<span class="legend-zone">Optimal Zone: {rule.optimal_display}{rule.unit}</span>'
+        f'<span class="legend-optimal">🔴 Locust Optimal</span></div></div>'
+    )
+
+def render_parameter_bars(inputs, stage, profile=None):
+    """Render every parameter bar of a stage as one HTML block (a single Streamlit message)"""
+    return "".join(
+        f'<p class="param-bar-title"><strong>{param}</strong> - Current Reading</p>'
+        f'{create_parameter_bar(param, value, stage, profile)}<hr>'
+        for param, value in inputs.items()
+    )
+
+def build_chart_template(params, stage):
+    """Build the suitability chart skeleton (layout, colors, axes) with empty y-values"""
+    # Imported lazily: Plotly is only needed once the chart is drawn
+    import plotly.graph_objects as go
 
-def render_chart(inputs, stage):
-    """Render Plotly bar chart for parameter suitability"""
-    suitability = [
-        min(100, max(0, (inputs[param] - thresholds[stage][param][0]) / 
-                     (thresholds[stage][param][1] - thresholds[stage][param][0]) * 100 
-                     if thresholds[stage][param][1] != float('inf') else (100 if inputs[param] >= thresholds[stage][param][0] else 0)))
-        for param in inputs
-    ]
-    
     fig = go.Figure(data=[
         go.Bar(
-            x=list(inputs.keys()),
-            y=suitability,
+            x=list(params),
+            y=[0] * len(params),
             marker_color=["#ffbd59", "#ffdb99", "#ffcc80", "#ffa726", "#ff9800"],
             marker_line_color=["#ff8c00", "#e65100", "#ff6f00", "#ef6c00", "#f57c00"],
             marker_line_width=1
@@ -312,8 +174,103 @@ def render_chart(inputs, stage):
         height=400,
         margin=dict(l=50, r=50, t=50, b=50)
     )
+    return fig
+
+def render_chart(inputs, stage, profile=None):
+    """Render Plotly bar chart for parameter suitability"""
+    with metrics.span("render_chart"):
+        draw_chart(inputs, stage, resolve_profile(profile))
+
+def draw_chart(inputs, stage, profile):
+    
+    # Each session keeps one figure per chart layout and only patches its
+    # y-values on rerun, skipping Plotly's figure construction and validation
+    templates = st.session_state.setdefault("chart_templates", {})
+    template_key = (profile.fingerprint, stage, tuple(inputs))
+    fig = templates.get(template_key)
+    if fig is None:
+        fig = templates[template_key] = build_chart_template(inputs, stage)
+    
+    fig.data[0].y = parameter_suitability(inputs, stage, profile)
+    with metrics.span("chart_serialize"):
+        st.plotly_chart(fig, width="stretch")
+
+@st.cache_resource
+def get_sweep_cache():
+    """Process-wide LRU cache of what-if danger surfaces, shared by all sessions"""
+    return LRUCache(maxsize=int(os.environ.get("LOCAST_SWEEP_CACHE_SIZE", "256")))
+
+def build_sweep_figure(surface, x_param, y_param, stage, profile):
+    """Danger class heatmap of a sweep surface, plus an (empty) marker for the current readings"""
+    import plotly.graph_objects as go
+
+    x_values, y_values, danger_percentage, danger_class = surface
+    stage_rules = profile[stage]
+    safe, moderate, high = DANGER_COLORS
+    fig = go.Figure(data=[
+        go.Heatmap(
+            x=x_values,
+            y=y_values,
+            z=danger_class,
+            zmin=-0.5,
+            zmax=2.5,
+            colorscale=[
+                [0, safe], [1 / 3, safe], [1 / 3, moderate], [2 / 3, moderate], [2 / 3, high], [1, high]
+            ],
+            colorbar=dict(tickvals=[0, 1, 2], ticktext=[level[0] for level in danger_levels]),
+            customdata=danger_percentage,
+            hovertemplate=(
+                f"{x_param}: %{{x}}<br>{y_param}: %{{y}}<br>Danger: %{{customdata:.0f}}%<extra></extra>"
+            ),
+        ),
+        go.Scatter(
+            x=[None],
+            y=[None],
+            mode="markers",
+            marker=dict(symbol="x", size=12, color="#333333"),
+            hoverinfo="skip",
+        ),
+    ])
+    
+    fig.update_layout(
+        title=f"Danger for {stage} Stage vs {x_param} and {y_param}",
+        xaxis_title=f"{x_param} ({stage_rules[x_param].unit})" if stage_rules[x_param].unit else x_param,
+        yaxis_title=f"{y_param} ({stage_rules[y_param].unit})" if stage_rules[y_param].unit else y_param,
+        showlegend=False,
+        height=400,
+        margin=dict(l=50, r=50, t=50, b=50)
+    )
+    return fig
+
+def render_sweep(inputs, stage, profile=None):
+    """What-if heatmap of the danger class over two parameters, the others held at their current readings"""
+    with metrics.span("render_sweep"):
+        draw_sweep(inputs, stage, resolve_profile(profile))
+
+def draw_sweep(inputs, stage, profile):
+    params = list(inputs)
+    x_col, y_col = st.columns(2)
+    x_param = x_col.selectbox("Horizontal axis", params, key="sweep_x")
+    y_param = y_col.selectbox("Vertical axis", [param for param in params if param != x_param], key="sweep_y")
+    
+    # The surface only depends on the readings held fixed, so nudging either
+    # swept reading reuses it (across sessions) and just moves the marker
+    fixed = tuple((param, inputs[param]) for param in params if param not in (x_param, y_param))
+    key = (profile.fingerprint, stage, x_param, y_param, fixed)
+    surface = get_sweep_cache().get_or_create(
+        key, lambda: score_sweep(stage, x_param, y_param, dict(fixed), profile=profile)
+    )
     
-    st.plotly_chart(fig, use_container_width=True)
+    sweep_figure = st.session_state.get("sweep_figure")
+    if sweep_figure is None or sweep_figure[0] != key:
+        sweep_figure = st.session_state["sweep_figure"] = (
+            key, build_sweep_figure(surface, x_param, y_param, stage, profile)
+        )
+    fig = sweep_figure[1]
+    fig.data[1].x = [inputs[x_param]]
+    fig.data[1].y = [inputs[y_param]]
+    with metrics.span("chart_serialize"):
+        st.plotly_chart(fig, width="stretch")
 
 def display_locust_info():
     """Display comprehensive information about desert locusts"""
@@ -453,50 +410,69 @@ def display_organizations():
         - Bio-control research
         """)
 
-def get_stage_parameters(stage):
-    """Get the parameters for a specific stage"""
-    return list(thresholds[stage].keys())
-
-def get_parameter_defaults(param):
-    """Get default values for parameters"""
-    defaults = {
-        "Rainfall": 25.0,
-        "Soil Moisture": 30.0,
-        "Soil Temperature": 25.0,
-        "Air Temperature": 25.0,
-        "Surface Wind Speed": 5.0,
-        "Wind Speed 850hPa": 5.0,
-        "Vegetation (NDVI)": 0.5,
-    }
-    return defaults.get(param, 0.0)
-
-def main():
-    # Header with logo
-    try:
-        st.image(
-            "logo/LOCAST_2.png",
-            width=200
+def parameter_input(param):
+    """Render the sidebar input for a parameter and return its value"""
+    if param == "Rainfall":
+        return st.sidebar.number_input(
+            f"💧 {param} (mm)",
+            min_value=0.0,
+            max_value=50.0,
+            value=get_parameter_defaults(param),
+            step=1.0,
+            help="Recent rainfall measurement in millimeters"
         )
-    except:
-        # Fallback if logo not found
-        st.markdown("### Logo: LOCAST")
-    
-    st.markdown("""
-    <div class="main-header">
-        <h1>LOCAST</h1>
-        <p class="tagline">LOCust Activity Suitability Tracker</p>
-        <p class="tagline">Predicting the Threat, Protecting the Crops</p>
-        <p class="region-info">Desert Locust Status Warning System</p>
-    </div>
-    """, unsafe_allow_html=True)
-    
-    # Alert banner
-    st.markdown("""
-    <div class="alert-banner">
-        🚨 ACTIVE MONITORING: Desert Locust Activity in Thar Desert Region 🚨
-    </div>
-    """, unsafe_allow_html=True)
-    
+    elif param == "Soil Moisture":
+        return st.sidebar.number_input(
+            f"🌱 {param} (%)",
+            min_value=0.0,
+            max_value=50.0,
+            value=get_parameter_defaults(param),
+            step=1.0,
+            help="Current soil moisture percentage"
+        )
+    elif param == "Soil Temperature":
+        return st.sidebar.number_input(
+            f"🌡️ {param} (°C)",
+            min_value=15.0,
+            max_value=50.0,
+            value=get_parameter_defaults(param),
+            step=0.5,
+            help="Current soil temperature in Celsius"
+        )
+    elif param == "Air Temperature":
+        return st.sidebar.number_input(
+            f"🌡️ {param} (°C)",
+            min_value=15.0,
+            max_value=50.0,
+            value=get_parameter_defaults(param),
+            step=0.5,
+            help="Current air temperature in Celsius"
+        )
+    elif param in ["Surface Wind Speed", "Wind Speed 850hPa"]:
+        return st.sidebar.number_input(
+            f"💨 {param} (m/s)",
+            min_value=0.0,
+            max_value=10.0,
+            value=get_parameter_defaults(param),
+            step=0.1,
+            help="Current wind speed in meters per second"
+        )
+    elif param == "Vegetation (NDVI)":
+        return st.sidebar.number_input(
+            f"🌿 {param}",
+            min_value=0.0,
+            max_value=1.0,
+            value=get_parameter_defaults(param),
+            step=0.1,
+            help="Normalized Difference Vegetation Index (0-1)"
+        )
+    else:
+        # Parameters introduced by a custom threshold profile
+        return st.sidebar.number_input(param, value=get_parameter_defaults(param))
+
+@st.fragment
+def render_information_center():
+    """Information center buttons and panels; clicks rerun only this fragment"""
     # Information buttons
     st.markdown("### 📚 Information Center")
     col1, col2, col3, col4 = st.columns(4)
@@ -549,83 +525,46 @@ def main():
         display_organizations()
         if st.button("❌ Close", key="close_orgs"):
             st.session_state.show_organizations = False
-    
-    st.markdown("---")
-    
-    # Sidebar for inputs
-    st.sidebar.header("🔧 Environmental Assessment")
-    
-    # Stage selection
-    stage = st.sidebar.selectbox(
-        "Select Locust Stage:",
-        ["Egg Laying", "Hopper", "Adult", "Swarm"],
-        help="Choose the locust life stage for danger assessment"
-    )
-    
-    st.sidebar.markdown("---")
+
+@st.fragment
+def render_analysis(stage, profile):
+    """Field condition inputs and the analysis they drive.
+
+    Runs as a fragment: changing a reading reruns only this function, not the
+    header, information center or footer. Its inputs are still written to
+    the sidebar.
+    """
+    metrics.count("analysis_reruns")
+    with metrics.span("analysis"):
+        draw_analysis(stage, profile)
+
+def draw_analysis(stage, profile):
     st.sidebar.subheader("📊 Current Field Conditions")
     
     # Get stage-specific parameters
-    stage_params = get_stage_parameters(stage)
+    stage_params = get_stage_parameters(stage, profile)
+    show_all_stages = st.sidebar.checkbox(
+        "Show all stage verdicts",
+        help="Enter readings for every parameter and assess all four stages at once"
+    )
+    input_params = get_all_parameters(profile) if show_all_stages else stage_params
     
     # Input parameters with validation - only show relevant parameters for selected stage
-    inputs = {}
-    
-    for param in stage_params:
-        if param == "Rainfall":
-            inputs[param] = st.sidebar.number_input(
-                f"💧 {param} (mm)",
-                min_value=0.0,
-                max_value=50.0,
-                value=get_parameter_defaults(param),
-                step=1.0,
-                help="Recent rainfall measurement in millimeters"
-            )
-        elif param == "Soil Moisture":
-            inputs[param] = st.sidebar.number_input(
-                f"🌱 {param} (%)",
-                min_value=0.0,
-                max_value=50.0,
-                value=get_parameter_defaults(param),
-                step=1.0,
-                help="Current soil moisture percentage"
-            )
-        elif param == "Soil Temperature":
-            inputs[param] = st.sidebar.number_input(
-                f"🌡️ {param} (°C)",
-                min_value=15.0,
-                max_value=50.0,
-                value=get_parameter_defaults(param),
-                step=0.5,
-                help="Current soil temperature in Celsius"
-            )
-        elif param == "Air Temperature":
-            inputs[param] = st.sidebar.number_input(
-                f"🌡️ {param} (°C)",
-                min_value=15.0,
-                max_value=50.0,
-                value=get_parameter_defaults(param),
-                step=0.5,
-                help="Current air temperature in Celsius"
-            )
-        elif param in ["Surface Wind Speed", "Wind Speed 850hPa"]:
-            inputs[param] = st.sidebar.number_input(
-                f"💨 {param} (m/s)",
-                min_value=0.0,
-                max_value=10.0,
-                value=get_parameter_defaults(param),
-                step=0.1,
-                help="Current wind speed in meters per second"
-            )
-        elif param == "Vegetation (NDVI)":
-            inputs[param] = st.sidebar.number_input(
-                f"🌿 {param}",
-                min_value=0.0,
-                max_value=1.0,
-                value=get_parameter_defaults(param),
-                step=0.1,
-                help="Normalized Difference Vegetation Index (0-1)"
-            )
+    all_inputs = {}
+    
+    for param in input_params:
+        all_inputs[param] = parameter_input(param)
+    inputs = {param: all_inputs[param] for param in stage_params}
+    ensemble_file = st.sidebar.file_uploader(
+        "Ensemble forecast (CSV)",
+        type="csv",
+        help="One row per member and lead day: 'member', 'lead' and parameter columns. "
+        "Parameters the forecast leaves out are held at the readings above."
+    )
+    
+    # Filled in once the analysis below has been rendered; without the debug panel only the cache statistics
+    show_panel = metrics.enabled and st.session_state.get("debug_metrics", True)
+    debug_panel = st.sidebar.expander("🐞 Debug Metrics", expanded=True) if show_panel else st.sidebar.container()
     
     # Add reference note in sidebar
     st.sidebar.markdown("""
@@ -640,23 +579,28 @@ def main():
     with col1:
         st.subheader(f"📈 Environmental Analysis for {stage} Stage")
         
-        # Display parameter bars (prioritized at the top)
-        for param, value in inputs.items():
-            with st.container():
-                st.markdown(f"**{param}** - Current Reading")
-                bar_html = create_parameter_bar(param, value, stage)
-                st.markdown(bar_html, unsafe_allow_html=True)
-                st.markdown("---")
+        # Display parameter bars (prioritized at the top), sent as a single element
+        with metrics.span("parameter_bars"):
+            bars_html = render_parameter_bars(inputs, stage, profile)
+            st.markdown(bars_html, unsafe_allow_html=True)
+        metrics.count("html_bytes", len(bars_html))
         
         # Render Plotly chart (below bars)
         st.markdown("**Parameter Suitability Overview**")
-        render_chart(inputs, stage)
+        render_chart(inputs, stage, profile)
+        
+        if len(inputs) >= 2 and st.toggle(
+            "🧭 What-if heatmap",
+            help="Danger class over two parameters, with the others held at their current readings"
+        ):
+            render_sweep(inputs, stage, profile)
     
     with col2:
         st.subheader("🎯 Threat Assessment")
         
         # Calculate danger level
-        danger_level, emoji, css_class = calculate_suitability(inputs, stage)
+        with metrics.span("calculate_suitability"):
+            danger_level, emoji, css_class = calculate_suitability(inputs, stage, profile)
         
         # Display result
         st.markdown(f"""
@@ -672,9 +616,9 @@ def main():
         optimal_params = []
         safe_params = []
         
+        stage_rules = profile[stage]
         for param, value in inputs.items():
-            min_thresh, max_thresh = thresholds[stage][param]
-            if min_thresh <= value <= max_thresh:
+            if stage_rules[param].is_optimal(value):
                 optimal_params.append(param)
             else:
                 safe_params.append(param)
@@ -688,12 +632,15 @@ def main():
             st.success(f"🟢 **Safe Parameters ({len(safe_params)}):**")
             for param in safe_params:
                 value = inputs[param]
-                min_thresh, max_thresh = thresholds[stage][param]
-                st.write(f"• {param}: {value:.1f} {param_units[param]} (outside {min_thresh}-{max_thresh if max_thresh != float('inf') else '∞'})")
+                rule = stage_rules[param]
+                st.write(f"• {param}: {value:.1f} {rule.unit} (outside {rule.optimal_display})")
         
         # Overall threat score
         threat_score = len(optimal_params) / len(inputs) * 100
-        st.metric("Threat Level", f"{threat_score:.0f}%")
+        if ensemble_file is None:
+            st.metric("Threat Level", f"{threat_score:.0f}%")
+        else:
+            render_ensemble_outlook(ensemble_file, inputs, stage, profile)
         
         # Recommendation
         if threat_score >= 80:
@@ -702,6 +649,321 @@ def main():
             st.warning("⚠️ **MODERATE RISK:** Increased surveillance needed")
         else:
             st.success("✅ **LOW RISK:** Continue routine monitoring")
+        
+        if show_all_stages:
+            st.subheader("🗂️ All Stage Verdicts")
+            stages, stage_percentages, stage_classes = score_all_stages(all_inputs, profile=profile)
+            for other_stage, percentage, danger_class in zip(stages, stage_percentages, stage_classes):
+                other_level, other_emoji, _ = danger_levels[danger_class]
+                st.write(f"{other_emoji} **{other_stage}:** {other_level} ({percentage:.0f}%)")
+    
+    if show_panel:
+        render_debug_panel(debug_panel)
+    else:
+        with debug_panel:
+            render_cache_stats(get_bar_cache().stats(), get_sweep_cache().stats())
+
+@st.cache_data(max_entries=4)
+def load_ensemble(data):
+    """Lead days and member x lead readings of an uploaded ensemble CSV"""
+    return read_ensemble_csv(io.StringIO(data.decode("utf-8-sig")))
+
+def render_ensemble_outlook(ensemble_file, inputs, stage, profile):
+    """Probability of each danger level per lead day of an uploaded ensemble forecast"""
+    try:
+        leads, forecast = load_ensemble(ensemble_file.getvalue())
+    except (UnicodeDecodeError, ValueError) as error:
+        st.warning(f"Could not read ensemble forecast: {error}")
+        return
+    if not any(param in forecast for param in inputs):
+        st.warning(f"The ensemble forecast has none of the {stage} stage parameters")
+        return
+    
+    columns = {param: forecast.get(param, value) for param, value in inputs.items()}
+    with metrics.span("ensemble"):
+        exceedance = ensemble_probabilities(columns, stage, profile)
+    members = len(next(values for values in columns.values() if hasattr(values, "shape")))
+    
+    peak = int(exceedance[2].argmax())
+    high_col, moderate_col = st.columns(2)
+    high_col.metric(
+        "P(High Danger)", f"{exceedance[2, peak]:.0%}",
+        help=f"Share of the {members} members at HIGH DANGER on the worst lead day (day {leads[peak]})"
+    )
+    moderate_col.metric(
+        "P(Moderate+)", f"{exceedance[1].max():.0%}",
+        help="Share of members at MODERATE DANGER or worse on the worst lead day"
+    )
+    probabilities = class_probabilities(exceedance)
+    st.bar_chart(
+        {"Lead day": leads, **{level: probabilities[index] for index, (level, _, _) in enumerate(danger_levels)}},
+        x="Lead day",
+        y=[level for level, _, _ in danger_levels],
+        color=list(DANGER_COLORS),
+        y_label="Probability",
+        height=220,
+    )
+
+def update_cache_gauges():
+    """Record the bar and what-if cache statistics as gauges"""
+    stats = get_bar_cache().stats()
+    sweep_stats = get_sweep_cache().stats()
+    for name in ("size", "hits", "misses", "evictions", "hit_rate"):
+        metrics.gauge(f"bar_cache_{name}", stats[name])
+        metrics.gauge(f"sweep_cache_{name}", sweep_stats[name])
+    return stats, sweep_stats
+
+@st.cache_resource(show_spinner=False)
+def start_metrics_export():
+    """Start the process-wide Prometheus textfile exporter once, if LOCAST_METRICS_FILE is set"""
+    metrics_file = os.environ.get("LOCAST_METRICS_FILE")
+    if metrics.enabled and metrics_file:
+        return metrics.start_exporter(metrics_file)
+    return None
+
+def render_debug_panel(panel):
+    """Show the process-wide instrumentation"""
+    stats, sweep_stats = update_cache_gauges()
+    snapshot = metrics.snapshot()
+    
+    with panel:
+        st.caption("Process-wide; span times are from the last completed run")
+        st.dataframe(
+            [
+                {"span": name, "calls": calls, "last ms": last * 1e3, "mean ms": total / calls * 1e3}
+                for name, (calls, total, last) in sorted(snapshot["spans"].items())
+            ],
+            hide_index=True,
+        )
+        counters = snapshot["counters"]
+        st.caption(
+            f"Reruns: {counters.get('reruns', 0)} full, {counters.get('analysis_reruns', 0)} analysis · "
+            f"HTML sent: {counters.get('html_bytes', 0) / 1024:.1f} KB"
+        )
+        render_cache_stats(stats, sweep_stats)
+
+def render_cache_stats(stats, sweep_stats):
+    """Caption with the bar and what-if cache statistics (counted whether or not metrics are collected)"""
+    st.caption(
+        f"Bar cache: {stats['size']}/{stats['maxsize']} entries · hit rate {stats['hit_rate']:.0%} "
+        f"({stats['hits']} hits, {stats['misses']} misses) · {stats['evictions']} evictions  \n"
+        f"What-if cache: {sweep_stats['size']}/{sweep_stats['maxsize']} surfaces · "
+        f"hit rate {sweep_stats['hit_rate']:.0%}"
+    )
+
+def find_stage_raster(stage):
+    """The stage's danger class raster in RASTER_DIR, or None"""
+    for suffix in (".npy", ".bin"):
+        path = os.path.join(RASTER_DIR, stage_slug(stage) + suffix)
+        if os.path.exists(path):
+            return path
+    return None
+
+@st.cache_resource(max_entries=8)
+def get_pyramid(path, versions):
+    """Map pyramid of a class raster, loaded (or built) once per version of the raster and pyramid files"""
+    return load_pyramid(path)
+
+def file_version(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+@st.fragment
+def render_danger_map(stage, raster_path):
+    """Danger map of the stage's class raster; zooming and panning rerun only this fragment"""
+    with metrics.span("render_map"):
+        draw_danger_map(stage, raster_path)
+
+def draw_danger_map(stage, raster_path):
+    import plotly.graph_objects as go
+
+    st.markdown("---")
+    st.subheader(f"🗺️ Danger Map ({stage} Stage)")
+    try:
+        pyramid = get_pyramid(raster_path, (file_version(raster_path), file_version(pyramid_path(raster_path))))
+    except (OSError, ValueError) as error:
+        st.warning(f"Could not open the danger map raster: {error}")
+        return
+    rows, cols = pyramid.shape
+    
+    zoom_col, stat_col = st.columns([3, 1])
+    zoom = zoom_col.select_slider(
+        "Zoom", options=[1, 2, 4, 8, 16, 32, 64], format_func=lambda zoom: f"{zoom}x", key=f"map_zoom_{stage}"
+    )
+    stat = stat_col.radio(
+        "Block value", ["max", "mean"], horizontal=True, key="map_stat",
+        help="Highest or average danger class of the raster cells behind each map cell"
+    )
+    window_rows, window_cols = max(1, rows // zoom), max(1, cols // zoom)
+    center_row, center_col = rows // 2, cols // 2
+    if zoom > 1:
+        row_col, col_col = st.columns(2)
+        center_row = row_col.slider("Center row", 0, rows - 1, center_row, key=f"map_row_{stage}")
+        center_col = col_col.slider("Center column", 0, cols - 1, center_col, key=f"map_col_{stage}")
+    row_start = min(max(0, center_row - window_rows // 2), rows - window_rows)
+    col_start = min(max(0, center_col - window_cols // 2), cols - window_cols)
+    
+    # Only the finest level that fits the window in DEFAULT_MAX_CELLS cells is sent
+    level, values = pyramid.view(
+        (row_start, row_start + window_rows), (col_start, col_start + window_cols), stat
+    )
+    scale = 1 << level
+    safe, moderate, high = DANGER_COLORS
+    fig = go.Figure(go.Heatmap(
+        z=values,
+        x0=(col_start >> level) * scale,
+        dx=scale,
+        y0=(row_start >> level) * scale,
+        dy=scale,
+        zmin=0,
+        zmax=2,
+        colorscale=[[0, safe], [0.5, moderate], [1, high]],
+        colorbar=dict(tickvals=[0, 1, 2], ticktext=[level_name for level_name, _, _ in danger_levels]),
+        hovertemplate="Row %{y}, column %{x}<br>Danger class: %{z:.2f}<extra></extra>",
+    ))
+    fig.update_layout(
+        xaxis_title="Column",
+        yaxis_title="Row",
+        yaxis=dict(autorange="reversed", scaleanchor="x"),
+        height=500,
+        margin=dict(l=50, r=50, t=30, b=50)
+    )
+    with metrics.span("chart_serialize"):
+        st.plotly_chart(fig, width="stretch")
+    st.caption(
+        f"{rows}×{cols} raster · pyramid level {level} of {pyramid.depth - 1}: each map cell covers "
+        f"{scale}×{scale} raster cells · {values.size} cells sent"
+    )
+
+@st.cache_data(max_entries=2)
+def load_station_state(path, mtime_ns, size):
+    """Parse the ingestion service's state file (cached until the file changes)"""
+    return read_state(path)
+
+@st.fragment(run_every=FEED_REFRESH_SECONDS)
+def render_station_feed(stage):
+    """Latest station readings from the ingestion service; refreshes on its own without a full rerun"""
+    try:
+        stat = os.stat(INGEST_STATE_PATH)
+        state = load_station_state(INGEST_STATE_PATH, stat.st_mtime_ns, stat.st_size)
+    except (OSError, ValueError) as error:
+        st.warning(f"Station feed unavailable: {error}")
+        return
+    
+    st.markdown("---")
+    st.subheader(f"📡 Live Station Feed ({stage} Stage)")
+    service = state.get("service", {})
+    st.caption(
+        f"Updated {state.get('updated', '?')} · {service.get('stations', 0)} stations · "
+        f"{service.get('scored', 0)} readings scored · {service.get('queued', 0)} queued"
+    )
+    
+    rows = [
+        {
+            "station": station,
+            "danger": entry["stages"][stage]["level"],
+            "percentage": entry["stages"][stage]["percentage"],
+            "time": entry["time"],
+        }
+        for station, entry in state.get("stations", {}).items()
+        if stage in entry.get("stages", {})
+    ]
+    columns = st.columns(len(danger_levels))
+    for column, (level, emoji, _) in zip(columns, reversed(danger_levels)):
+        column.metric(f"{emoji} {level}", sum(row["danger"] == level for row in rows))
+    
+    # Most dangerous first; the table is capped so the page stays light with thousands of stations
+    rows.sort(key=lambda row: -row["percentage"])
+    st.dataframe(rows[:FEED_TABLE_ROWS], hide_index=True, width="stretch")
+    if len(rows) > FEED_TABLE_ROWS:
+        st.caption(f"Showing the {FEED_TABLE_ROWS} highest of {len(rows)} stations")
+
+def main():
+    # Collection is process-wide (LOCAST_METRICS); sessions only choose whether to show the panel
+    start_metrics_export()
+    metrics.count("reruns")
+    with metrics.span("main"):
+        render_page()
+    if metrics.enabled:
+        update_cache_gauges()
+
+def render_page():
+    configure_page()
+    init_session_state()
+    inject_styles()
+    
+    # Header with logo
+    try:
+        st.image(load_logo(LOGO_PATH, LOGO_WIDTH, file_version(LOGO_PATH)), width=LOGO_WIDTH)
+    except OSError:
+        # Fallback if logo not found
+        st.markdown("### Logo: LOCAST")
+    
+    st.markdown("""
+    <div class="main-header">
+        <h1>LOCAST</h1>
+        <p class="tagline">LOCust Activity Suitability Tracker</p>
+        <p class="tagline">Predicting the Threat, Protecting the Crops</p>
+        <p class="region-info">Desert Locust Status Warning System</p>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    # Alert banner
+    st.markdown("""
+    <div class="alert-banner">
+        🚨 ACTIVE MONITORING: Desert Locust Activity in Thar Desert Region 🚨
+    </div>
+    """, unsafe_allow_html=True)
+    
+    render_information_center()
+    
+    st.markdown("---")
+    
+    # Sidebar for inputs
+    st.sidebar.header("🔧 Environmental Assessment")
+    
+    # Threshold profile selection (files are re-parsed only when they change)
+    profile = None
+    profile_path = st.sidebar.selectbox(
+        "Threshold Profile:",
+        [None] + list_profiles(),
+        format_func=lambda path: "Cressman & Stefanski (built-in)" if path is None else os.path.basename(path),
+        help="Regional threshold calibrations loaded from the profiles directory"
+    )
+    if profile_path is not None:
+        try:
+            profile = load_profile(profile_path)
+        except (OSError, ValueError) as error:
+            st.sidebar.error(f"Could not load profile, using built-in thresholds: {error}")
+    profile = resolve_profile(profile)
+    
+    # Stage selection
+    stage = st.sidebar.selectbox(
+        "Select Locust Stage:",
+        list(profile),
+        help="Choose the locust life stage for danger assessment"
+    )
+    
+    st.sidebar.markdown("---")
+    render_analysis(stage, profile)
+    
+    raster_path = find_stage_raster(stage)
+    if raster_path is not None:
+        render_danger_map(stage, raster_path)
+    
+    if os.path.exists(INGEST_STATE_PATH):
+        render_station_feed(stage)
+    
+    st.sidebar.toggle(
+        "🐞 Debug metrics",
+        value=metrics.enabled,
+        key="debug_metrics",
+        disabled=not metrics.enabled,
+        help="Show the server's section timings and cache statistics"
+        if metrics.enabled else "Start the app with LOCAST_METRICS=1 to collect timings"
+    )
     
     # Footer with stage information
     st.markdown("---")
@@ -714,7 +976,7 @@ def main():
         "Swarm": "🌪️ Swarm formation is most destructive. High NDVI and specific wind patterns trigger mass movement."
     }
     
-    st.warning(f"**{stage} Stage Alert:** {stage_info[stage]}")
+    st.warning(f"**{stage} Stage Alert:** {stage_info.get(stage, '')}")
     
     # Technical notes
     with st.expander("ℹ️ Technical Information"):
@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+
+from locast import danger_levels
+from locast.alerts import UNSEEN, AlertEngine
+
+SAFE, MODERATE, HIGH = (level for level, _, _ in danger_levels)
+
+
+def classes_over(engine, series):
+    """Class after each score of a single-location series"""
+    classes = []
+    for score in series:
+        engine.update([score])
+        classes.append(int(engine.state[0]))
+    return classes
+
+
+def test_without_hysteresis_every_crossing_changes_class():
+    engine = AlertEngine(1)
+    assert classes_over(engine, [40, 55, 49, 50, 80, 79.9, 20]) == [0, 1, 0, 1, 2, 1, 0]
+
+
+def test_hysteresis_holds_until_score_clears_the_cutoff():
+    engine = AlertEngine(1, hysteresis=10)
+    # Up as soon as a cutoff is reached; down only below cutoff - 10
+    series = [40, 50, 45, 40.1, 39.9, 80, 75, 70, 69.9, 85, 30, 55]
+    assert classes_over(engine, series) == [0, 1, 1, 1, 0, 2, 2, 2, 1, 2, 0, 1]
+
+
+def test_hysteresis_can_drop_one_class_at_a_time():
+    engine = AlertEngine(1, hysteresis=10)
+    # From HIGH, 45 clears the 80% cutoff by 10 but not the 50% one: only down to MODERATE
+    assert classes_over(engine, [90, 45, 39]) == [2, 1, 0]
+
+
+def test_transitions_report_changes_only():
+    engine = AlertEngine(4, hysteresis=5)
+    first = engine.update([10, 60, 90, 10])
+    assert len(first) == 0  # first scores are not transitions by default
+    assert (engine.state != UNSEEN).all()
+
+    transitions = engine.update([10, 47, 60, 85])
+    assert transitions.locations.tolist() == [2, 3]
+    assert transitions.events(names=["a", "b", "c", "d"]) == [
+        {"location": "c", "previous": HIGH, "current": MODERATE},
+        {"location": "d", "previous": SAFE, "current": HIGH},
+    ]
+
+
+def test_report_initial_and_location_subsets():
+    engine = AlertEngine(5, report_initial=True)
+    transitions = engine.update([85, 10], locations=[3, 1])
+    assert transitions.events() == [
+        {"location": 3, "previous": None, "current": HIGH},
+        {"location": 1, "previous": None, "current": SAFE},
+    ]
+    assert engine.state.tolist() == [UNSEEN, 0, UNSEEN, 2, UNSEEN]
+
+    transitions = engine.update_classes([1], locations=[3])
+    assert transitions.previous.tolist() == [2] and transitions.current.tolist() == [1]
+
+
+def test_stream_yields_non_empty_batches():
+    engine = AlertEngine(3, hysteresis=10)
+    batches = [([0, 1, 2], [10, 10, 10]), ([0], [12]), ([1], [55]), ([1], [45]), ([1], [39])]
+    transitions = list(engine.stream(batches))
+    assert [t.events() for t in transitions] == [
+        [{"location": 1, "previous": SAFE, "current": MODERATE}],
+        [{"location": 1, "previous": MODERATE, "current": SAFE}],
+    ]
+
+
+def test_matches_step_by_step_reference():
+    rng = np.random.default_rng(0)
+    hysteresis = 7.5
+    engine = AlertEngine(50, hysteresis=hysteresis)
+    state = [None] * 50
+    for _ in range(100):
+        scores = rng.choice([0, 25, 43, 49.9, 50, 57.5, 60, 72.5, 79.9, 80, 100], 50)
+        transitions = engine.update(scores)
+        changed = []
+        for location, score in enumerate(scores):
+            current = 2 if score >= 80 else 1 if score >= 50 else 0
+            previous = state[location]
+            if previous is not None and current < previous:
+                # Drop only as far as the score clears each cutoff by the hysteresis margin
+                current = min(previous, 2 if score + hysteresis >= 80 else 1 if score + hysteresis >= 50 else 0)
+            if previous is not None and current != previous:
+                changed.append(location)
+            state[location] = current
+        assert transitions.locations.tolist() == changed
+        assert engine.state.tolist() == state
+
+
+def test_negative_hysteresis_is_rejected():
+    with pytest.raises(ValueError):
+        AlertEngine(1, hysteresis=-1)
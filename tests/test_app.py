@@ -0,0 +1,48 @@
+import base64
+
+import pytest
+from streamlit import config
+from streamlit.testing.v1 import AppTest
+
+APP_PATH = "/root/package/streamlit_app.py"
+FONT_PATH = "/root/package/static/fonts/montserrat-700-latin.woff2"
+
+
+@pytest.fixture
+def static_serving_off():
+    enabled = config.get_option("server.enableStaticServing")
+    config.set_option("server.enableStaticServing", False)
+    yield
+    config.set_option("server.enableStaticServing", enabled)
+
+
+def run_app():
+    app = AppTest.from_file(APP_PATH, default_timeout=60)
+    app.run()
+    assert not app.exception
+    return app
+
+
+def test_inlined_stylesheet_embeds_fonts(static_serving_off):
+    styles = [markdown.value for markdown in run_app().markdown if markdown.value.startswith("<style>")]
+    assert len(styles) == 1
+    with open(FONT_PATH, "rb") as handle:
+        font = base64.b64encode(handle.read()).decode("ascii")
+    assert f"url('data:font/woff2;base64,{font}')" in styles[0]
+    assert "url('fonts/" not in styles[0] and "./app/static/" not in styles[0]
+
+
+def test_static_serving_links_stylesheet():
+    assert any(markdown.value.startswith('<link rel="stylesheet"') for markdown in run_app().markdown)
+
+
+def test_cache_stats_shown_without_metrics():
+    from locast import metrics
+
+    assert not metrics.enabled
+    app = run_app()
+    app.run()
+    captions = [caption.value for caption in app.sidebar.caption if caption.value.startswith("Bar cache:")]
+    assert len(captions) == 1
+    assert "What-if cache:" in captions[0]
+    assert " 0 hits" not in captions[0]  # the rerun reused the bars of the first run
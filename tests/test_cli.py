@@ -0,0 +1,114 @@
+import csv
+
+import numpy as np
+import pytest
+
+from locast import calculate_suitability, param_ranges, rules
+from locast.cli import main
+
+STAGE = "Hopper"
+
+
+def write_readings(path, rows, blank_after=()):
+    params = list(rules[STAGE].params)
+    with open(path, "w", newline="") as handle:
+        handle.write(",".join(["station"] + params) + "\n")
+        for index, row in enumerate(rows):
+            handle.write(",".join([f"S{index}"] + [str(row[param]) for param in params]) + "\n")
+            if index in blank_after:
+                handle.write("\n")
+
+
+def random_rows(count):
+    rng = np.random.default_rng(3)
+    return [
+        {param: round(float(rng.uniform(*param_ranges[param])), 1) for param in rules[STAGE].params}
+        for _ in range(count)
+    ]
+
+
+@pytest.mark.parametrize("blank_after", [(0,), (4,), (0, 2, 5, 6)])
+def test_score_skips_blank_lines(tmp_path, blank_after):
+    rows = random_rows(7)
+    source, output = tmp_path / "readings.csv", tmp_path / "scores.csv"
+    write_readings(source, rows, blank_after)
+    assert main(["score", str(source), "-s", STAGE, "-o", str(output), "--chunk-size", "2"]) == 0
+
+    with open(output, newline="") as handle:
+        scored = list(csv.DictReader(handle))
+    assert [row["station"] for row in scored] == [f"S{index}" for index in range(len(rows))]
+    for row, readings in zip(scored, rows):
+        assert row["danger_level"] == calculate_suitability(readings, STAGE)[0]
+
+
+def test_score_rejects_ragged_rows(tmp_path):
+    source = tmp_path / "readings.csv"
+    write_readings(source, random_rows(4))
+    lines = source.read_text().splitlines()
+    lines[3] += ",extra"
+    source.write_text("\n".join(lines) + "\n")
+    with pytest.raises(SystemExit, match="line 4"):
+        main(["score", str(source), "-s", STAGE, "-o", str(tmp_path / "scores.csv"), "--chunk-size", "2"])
+
+
+def test_score_reports_non_numeric_cells(tmp_path):
+    source, output = tmp_path / "readings.csv", tmp_path / "scores.csv"
+    rows = random_rows(5)
+    rows[3]["Rainfall"] = "NA"
+    write_readings(source, rows)
+    with pytest.raises(SystemExit, match=r"readings.csv, line 5: 'NA' is not a number"):
+        main(["score", str(source), "-s", STAGE, "-o", str(output)])
+    assert not output.exists()
+
+
+def test_score_leaves_no_output_when_columns_are_missing(tmp_path):
+    source, output = tmp_path / "readings.csv", tmp_path / "scores.csv"
+    source.write_text("station,Rainfall\nS0,10\n")
+    with pytest.raises(SystemExit, match="missing columns"):
+        main(["score", str(source), "-s", STAGE, "-o", str(output)])
+    assert not output.exists()
+
+
+def test_score_header_only_input_writes_header(tmp_path):
+    source, output = tmp_path / "readings.csv", tmp_path / "scores.csv"
+    write_readings(source, [])
+    assert main(["score", str(source), "-s", STAGE, "-o", str(output)]) == 0
+    header = source.read_text().strip()
+    assert output.read_text().splitlines() == [header + ",optimal_count,danger_percentage,danger_level"]
+
+
+def write_day(path, stations, seed):
+    rng = np.random.default_rng(seed)
+    params = list(rules[STAGE].params)
+    with open(path, "w", newline="") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(["station"] + params)
+        for station in stations:
+            writer.writerow([station] + [round(float(rng.uniform(*param_ranges[param])), 1) for param in params])
+
+
+def run_daily(tmp_path, stations, seed, *options):
+    source, output = tmp_path / f"day{seed}.csv", tmp_path / f"scores{seed}.csv"
+    write_day(source, stations, seed)
+    main(["daily", str(source), "--state", str(tmp_path / "state.npz"), "-s", STAGE, "-o", str(output), *options])
+    with open(output, newline="") as handle:
+        return {row["station"]: row for row in csv.DictReader(handle)}
+
+
+def test_daily_adds_new_stations(tmp_path):
+    alerts = ("--alerts", str(tmp_path / "alerts.csv"))
+    run_daily(tmp_path, ["A", "B"], 0, *alerts)
+    scores = run_daily(tmp_path, ["B", "C"], 1, *alerts)
+    assert list(scores) == ["A", "B", "C"]
+    # A reported nothing today, C only today
+    assert scores["A"]["danger_level"] and scores["C"]["window_days"] == "2"
+    scores = run_daily(tmp_path, ["A", "C", "D"], 2, *alerts)
+    assert list(scores) == ["A", "B", "C", "D"]
+
+
+def test_daily_rejects_window_change(tmp_path):
+    run_daily(tmp_path, ["A"], 0, "--window", "7")
+    run_daily(tmp_path, ["A"], 1, "--window", "7")
+    run_daily(tmp_path, ["A"], 2)
+    with pytest.raises(SystemExit, match="7-day window"):
+        run_daily(tmp_path, ["A"], 3, "--window", "14")
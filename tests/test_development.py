@@ -0,0 +1,105 @@
+import numpy as np
+
+from locast import rules, score_batch
+from locast.development import (
+    EGG,
+    HOPPER,
+    NOT_REACHED,
+    DevelopmentStage,
+    day_dates,
+    predict_development,
+    score_by_stage,
+    stage_by_day,
+)
+
+
+def reference_days(soil, air, lay_day):
+    """Hatch and fledge day of one cell, accumulating degree-days day by day"""
+    total, hatch = 0.0, NOT_REACHED
+    for day in range(lay_day, len(soil)):
+        total += 0.0 if np.isnan(soil[day]) else max(soil[day] - EGG.base_temperature, 0.0)
+        if total >= EGG.degree_days:
+            hatch = day
+            break
+    if hatch == NOT_REACHED:
+        return NOT_REACHED, NOT_REACHED
+    total = 0.0
+    for day in range(hatch, len(air)):
+        total += 0.0 if np.isnan(air[day]) else max(air[day] - HOPPER.base_temperature, 0.0)
+        if total >= HOPPER.degree_days:
+            return hatch, day
+    return hatch, NOT_REACHED
+
+
+def test_constant_temperatures():
+    days = 80
+    # 25°C soil: 10 degree-days a day, 200 reached on day 19
+    # 28°C air: 10 a day from the hatching day itself, 400 reached on day 19 + 39
+    # 16°C soil: 1 a day, never hatches within the series
+    soil = np.array([[25.0, 25.0, 16.0]] * days)
+    air = np.array([[28.0, 38.0, 28.0]] * days)
+    hatch_day, fledge_day = predict_development(soil, air)
+    assert hatch_day.tolist() == [19, 19, NOT_REACHED]
+    assert fledge_day.tolist() == [58, 38, NOT_REACHED]
+
+    # Laid on day 5: everything shifts by five days
+    hatch_day, fledge_day = predict_development(soil, air, lay_day=5)
+    assert hatch_day.tolist() == [24, 24, NOT_REACHED]
+    assert fledge_day.tolist() == [63, 43, NOT_REACHED]
+
+
+def test_hand_computed_series():
+    # Degree-days above 15°C: 0, 0, 5, 10, NaN -> 0, 20, 15, 30; cumulative 0, 0, 5, 15, 15, 35, 50, 80 on day 7
+    soil = np.array([10.0, 15.0, 20.0, 25.0, np.nan, 35.0, 30.0, 45.0, 20.0, 20.0])
+    # Degree-days above 18°C from day 7 on: 102, 50, 200; cumulative 102, 152, 352 on day 9
+    air = np.array([0.0] * 7 + [120.0, 68.0, 218.0])
+    egg = DevelopmentStage("egg", EGG.parameter, EGG.base_temperature, degree_days=80.0)
+    hopper = DevelopmentStage("hopper", HOPPER.parameter, HOPPER.base_temperature, degree_days=352.0)
+    hatch_day, fledge_day = predict_development(soil[:, None], air[:, None], egg=egg, hopper=hopper)
+    assert hatch_day.tolist() == [7]
+    assert fledge_day.tolist() == [9]
+
+
+def test_random_cells_match_day_by_day_accumulation():
+    rng = np.random.default_rng(0)
+    days, cells = 120, 200
+    # Half-degree temperatures keep every sum exact
+    soil = np.round(rng.uniform(10, 32, (days, cells)) * 2) / 2
+    air = np.round(rng.uniform(12, 36, (days, cells)) * 2) / 2
+    soil[rng.uniform(size=soil.shape) < 0.05] = np.nan
+    air[rng.uniform(size=air.shape) < 0.05] = np.nan
+    lay_day = rng.integers(0, 140, cells)
+
+    hatch_day, fledge_day = predict_development(soil, air, lay_day=lay_day, chunk_cells=37)
+    expected = [reference_days(soil[:, cell], air[:, cell], lay_day[cell]) for cell in range(cells)]
+    assert list(zip(hatch_day.tolist(), fledge_day.tolist())) == expected
+    assert (hatch_day == NOT_REACHED).any() and (fledge_day != NOT_REACHED).any()
+
+
+def test_grid_shape_is_kept():
+    soil = np.full((40, 3, 4), 25.0)
+    hatch_day, fledge_day = predict_development(soil, soil)
+    assert hatch_day.shape == fledge_day.shape == (3, 4)
+
+
+def test_stage_by_day_and_scoring():
+    hatch_day = np.array([2, NOT_REACHED, 0])
+    fledge_day = np.array([4, NOT_REACHED, NOT_REACHED])
+    stage_index = stage_by_day(hatch_day, fledge_day, 6)
+    assert stage_index.T.tolist() == [[0, 0, 1, 1, 2, 2], [0] * 6, [1] * 6]
+
+    rng = np.random.default_rng(1)
+    params = {param for stage in ("Egg Laying", "Hopper", "Adult") for param in rules[stage].params}
+    columns = {param: rng.uniform(0, 40, (6, 3)) for param in params}
+    danger_class = score_by_stage(columns, stage_index)
+    for day in range(6):
+        for cell in range(3):
+            stage = ("Egg Laying", "Hopper", "Adult")[stage_index[day, cell]]
+            readings = {param: columns[param][day, cell:cell + 1] for param in rules[stage].params}
+            assert danger_class[day, cell] == score_batch(readings, stage)[2][0]
+
+
+def test_day_dates():
+    dates = day_dates(np.array([0, 31, NOT_REACHED]), "2025-03-01")
+    assert dates[:2].tolist() == [np.datetime64("2025-03-01").item(), np.datetime64("2025-04-01").item()]
+    assert np.isnat(dates[2])
@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+
+from locast import param_ranges, rules, score_batch
+from locast.ensemble import class_probabilities, ensemble_probabilities, exceedance_counts, read_ensemble_csv
+
+STAGE = "Hopper"
+
+
+def random_ensemble(members, leads, cells, seed=0):
+    rng = np.random.default_rng(seed)
+    return {
+        param: rng.uniform(*param_ranges[param], (members, leads) + cells)
+        for param in rules[STAGE].params
+    }
+
+
+def brute_force_counts(columns):
+    """Members at or above MODERATE and HIGH DANGER, scoring the whole cube at once"""
+    danger_class = score_batch(columns, STAGE)[2]
+    return np.stack([(danger_class >= 1).sum(axis=0), (danger_class >= 2).sum(axis=0)])
+
+
+def test_counts_match_brute_force():
+    columns = random_ensemble(51, 4, (6, 5))
+    members, counts = exceedance_counts(columns, STAGE)
+    assert members == 51
+    assert counts.dtype == np.uint16
+    np.testing.assert_array_equal(counts, brute_force_counts(columns))
+    assert counts[0].any() and counts[1].any()
+
+
+def test_probabilities_match_brute_force():
+    columns = random_ensemble(50, 3, (7,), seed=1)
+    probabilities = ensemble_probabilities(columns, STAGE)
+    assert probabilities.dtype == np.float32
+    assert probabilities.shape == (3, 3, 7)
+    np.testing.assert_array_equal(probabilities[0], 1.0)
+    np.testing.assert_allclose(probabilities[1:], brute_force_counts(columns) / 50, rtol=1e-6)
+
+    exact = class_probabilities(probabilities)
+    np.testing.assert_allclose(exact.sum(axis=0), 1.0, rtol=1e-6)
+    danger_class = score_batch(columns, STAGE)[2]
+    for level in range(3):
+        np.testing.assert_allclose(exact[level], (danger_class == level).mean(axis=0), atol=1e-6)
+
+
+def test_shared_member_axis_broadcasts():
+    columns = random_ensemble(20, 3, (4,), seed=2)
+    shared = rules[STAGE].params[-1]
+    columns[shared] = columns[shared][:1]
+    _, counts = exceedance_counts(columns, STAGE)
+    full = dict(columns, **{shared: np.broadcast_to(columns[shared], (20, 3, 4))})
+    np.testing.assert_array_equal(counts, brute_force_counts(full))
+
+
+def test_memory_mapped_members(tmp_path):
+    columns = random_ensemble(10, 2, (3, 3), seed=3)
+    mapped = {}
+    for index, (param, values) in enumerate(columns.items()):
+        np.save(tmp_path / f"{index}.npy", values)
+        mapped[param] = np.load(tmp_path / f"{index}.npy", mmap_mode="r")
+    np.testing.assert_array_equal(exceedance_counts(mapped, STAGE)[1], brute_force_counts(columns))
+
+
+def test_needs_member_and_lead_axes():
+    with pytest.raises(ValueError, match="member and lead time axes"):
+        exceedance_counts({param: np.zeros(5) for param in rules[STAGE].params}, STAGE)
+
+
+def test_read_ensemble_csv():
+    lines = [
+        "member,lead,Rainfall,Air Temperature",
+        "m1,0,22.5,31",
+        "m1,2,10,",
+        "m0,2,25,30",
+    ]
+    leads, columns = read_ensemble_csv(lines)
+    assert leads == [0, 2]
+    np.testing.assert_array_equal(columns["Rainfall"], [[22.5, 10.0], [np.nan, 25.0]])
+    np.testing.assert_array_equal(columns["Air Temperature"], [[31.0, np.nan], [np.nan, 30.0]])
+
+    with pytest.raises(ValueError, match="'member' and 'lead'"):
+        read_ensemble_csv(["lead,Rainfall", "0,1"])
+    with pytest.raises(ValueError, match="no rows"):
+        read_ensemble_csv(["member,lead,Rainfall"])
+
+
+def test_member_count_fits_uint16():
+    too_many = {param: np.broadcast_to(0.0, (np.iinfo(np.uint16).max + 1, 1, 1)) for param in rules[STAGE].params}
+    with pytest.raises(ValueError, match="At most 65535 members"):
+        exceedance_counts(too_many, STAGE)
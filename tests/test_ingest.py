@@ -0,0 +1,44 @@
+import asyncio
+import json
+
+from locast.ingest import Ingestor
+
+
+def test_invalid_record_rejects_whole_body():
+    async def post():
+        ingestor = Ingestor()
+        ingestor.queue = asyncio.Queue()
+        body = json.dumps([
+            {"station": "A", "readings": {"Rainfall": 22.0}},
+            {"station": "B", "readings": {"Rainfall": "wet"}},
+        ])
+        status, _ = await ingestor.handle("POST", "/readings", body.encode())
+        return status, ingestor
+
+    status, ingestor = asyncio.run(post())
+    assert status == 400
+    assert ingestor.queue.empty()
+    assert ingestor.stats["received"] == 0
+
+
+def test_poll_survives_stations_that_hang_up():
+    async def hang_up(reader, writer):
+        await reader.readline()
+        writer.close()
+
+    async def poll():
+        server = await asyncio.start_server(hang_up, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        ingestor = Ingestor([f"http://127.0.0.1:{port}/"] * 3, interval=0.01, connections=2)
+        ingestor.queue = asyncio.Queue()
+        task = asyncio.create_task(ingestor.poll())
+        await asyncio.sleep(0.3)
+        alive = not task.done()
+        task.cancel()
+        server.close()
+        return alive, ingestor.stats["poll_errors"]
+
+    alive, poll_errors = asyncio.run(poll())
+    assert alive
+    # Every round of three stations completed, so no worker died on the first error
+    assert poll_errors >= 6
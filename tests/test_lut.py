@@ -0,0 +1,54 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from locast import lut, param_ranges, rules, score_batch
+from locast.lut import PROFILE_TABLES_SIZE, get_tables, score_batch_lut
+from locast.rules import compile_rules
+from locast.scoring import param_units, thresholds
+
+STAGE = "Hopper"
+
+
+def grid_columns(params, rows=2000, seed=0):
+    """Readings on the input grid, with some off-grid ones mixed in"""
+    rng = np.random.default_rng(seed)
+    columns = {}
+    for param in params:
+        low, high = param_ranges[param]
+        values = np.round(rng.uniform(low, high, rows) * 2) / 2
+        values[::7] += 0.013
+        columns[param] = values
+    return columns
+
+
+def test_parameter_subsets_match_score_batch():
+    params = rules[STAGE].params
+    for size in range(1, len(params) + 1):
+        for subset in itertools.combinations(params, size):
+            columns = grid_columns(subset)
+            for actual, expected in zip(score_batch_lut(columns, STAGE), score_batch(columns, STAGE)):
+                np.testing.assert_array_equal(actual, expected)
+
+
+def test_unknown_parameter_raises_key_error():
+    columns = grid_columns(rules[STAGE].params + ("Soil Moisture",))
+    with pytest.raises(KeyError):
+        score_batch(columns, STAGE)
+    with pytest.raises(KeyError):
+        score_batch_lut(columns, STAGE)
+
+
+def test_profile_tables_are_bounded(monkeypatch):
+    monkeypatch.setattr(lut, "_profile_tables", lut.LRUCache(maxsize=PROFILE_TABLES_SIZE))
+    for shift in range(1, PROFILE_TABLES_SIZE * 3 + 1):
+        edited = {stage: dict(bounds) for stage, bounds in thresholds.items()}
+        lower, upper = edited[STAGE]["Rainfall"]
+        edited[STAGE]["Rainfall"] = (lower + shift, upper + shift)
+        profile = compile_rules(edited, param_ranges, param_units, name=f"edit {shift}")
+        assert get_tables(profile) is get_tables(profile)
+    stats = lut._profile_tables.stats()
+    assert stats["size"] == PROFILE_TABLES_SIZE
+    assert stats["evictions"] == PROFILE_TABLES_SIZE * 2
+    assert get_tables(rules) is lut.tables
@@ -0,0 +1,18 @@
+from locast import metrics
+
+
+def test_exporter_writes_textfile(tmp_path, monkeypatch):
+    monkeypatch.setattr(metrics, "enabled", True)
+    metrics.reset()
+    metrics.count("reruns", 3)
+    path = tmp_path / "locast.prom"
+    stop = metrics.start_exporter(str(path), interval=0.01)
+    try:
+        for _ in range(200):
+            if path.exists():
+                break
+            stop.wait(0.01)
+    finally:
+        stop.set()
+    assert 'locast_events_total{event="reruns"} 3' in path.read_text()
+    metrics.reset()
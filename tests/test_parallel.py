@@ -0,0 +1,28 @@
+import os
+
+import numpy as np
+import pytest
+
+from locast import param_ranges, rules, score_batch
+from locast.parallel import ParallelScorer
+
+
+def mapped_shared_blocks():
+    with open("/proc/self/maps") as handle:
+        return sum("psm_" in line for line in handle)
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/maps"), reason="needs /proc")
+def test_workers_release_output_blocks():
+    rng = np.random.default_rng(0)
+    columns = {param: rng.uniform(*param_ranges[param], 1000) for param in rules.parameters}
+    with ParallelScorer(columns, workers=1, chunk_size=250) as scorer:
+        mapped = []
+        for _ in range(3):
+            for stage in rules:
+                stage_columns = {param: columns[param] for param in rules[stage].params}
+                for actual, expected in zip(scorer.score(stage), score_batch(stage_columns, stage)):
+                    np.testing.assert_array_equal(actual, expected)
+            mapped.append(scorer._executor.submit(mapped_shared_blocks).result())
+        # Output blocks are released after every call, so the worker's mappings do not grow
+        assert mapped[0] == mapped[-1]
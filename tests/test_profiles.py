@@ -0,0 +1,38 @@
+import pytest
+
+from locast.profiles import load_profile, parse_profile
+
+VALID_THRESHOLDS = {"Hopper": {"Rainfall": [20, 28], "Air Temperature": [25, 35]}}
+
+
+def test_valid_profile():
+    profile = parse_profile({"name": "Test", "thresholds": VALID_THRESHOLDS, "param_units": {"Rainfall": "mm"}})
+    assert profile["Hopper"]["Rainfall"].is_optimal(22)
+
+
+@pytest.mark.parametrize(
+    "extra, message",
+    [
+        ({"param_ranges": [1, 2]}, "param_ranges"),
+        ({"param_ranges": {"Rainfall": 5}}, "param_ranges/Rainfall"),
+        ({"param_ranges": {"Rainfall": ["a", "b"]}}, "param_ranges/Rainfall"),
+        ({"param_ranges": {"Rainfall": [0, True]}}, "param_ranges/Rainfall"),
+        ({"param_units": [1]}, "param_units"),
+        ({"param_units": {"Rainfall": 1}}, "param_units/Rainfall"),
+        ({"name": 3}, "name"),
+        ({"thresholds": {"Hopper": {"Rainfall": ["a", "b"]}}}, "Hopper/Rainfall"),
+        ({"thresholds": {"Hopper": {"Rainfall": 5}}}, "Hopper/Rainfall"),
+        ({"thresholds": [1]}, "thresholds"),
+    ],
+)
+def test_malformed_profiles_raise_value_error(extra, message):
+    with pytest.raises(ValueError, match=message) as error:
+        parse_profile({"thresholds": VALID_THRESHOLDS, **extra}, source="bad.toml")
+    assert str(error.value).startswith("bad.toml")
+
+
+def test_malformed_toml_file_names_the_file(tmp_path):
+    path = tmp_path / "bad.toml"
+    path.write_text('param_ranges = [1, 2]\n\n[thresholds.Hopper]\nRainfall = [20, 28]\n')
+    with pytest.raises(ValueError, match="bad.toml: 'param_ranges'"):
+        load_profile(str(path))
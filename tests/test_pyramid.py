@@ -0,0 +1,116 @@
+import numpy as np
+import pytest
+
+from locast.pyramid import DEFAULT_MAX_CELLS, Pyramid, load_pyramid
+from locast.raster import NODATA_CLASS
+from locast.scoring import rules, stage_slug
+
+APP_PATH = "/root/package/streamlit_app.py"
+
+
+def random_raster(shape, seed=0):
+    rng = np.random.default_rng(seed)
+    raster = rng.integers(0, 3, shape).astype(np.uint8)
+    raster[rng.uniform(size=shape) < 0.2] = NODATA_CLASS
+    # A block with no data at every level
+    raster[:40, :40] = NODATA_CLASS
+    return raster
+
+
+def reference_view(raster, level, stat):
+    """Max or mean class of the valid cells in every 2**level block, NaN where there are none"""
+    size = 1 << level
+    rows, cols = -(-raster.shape[0] // size), -(-raster.shape[1] // size)
+    expected = np.full((rows, cols), np.nan, dtype=np.float32)
+    for row in range(rows):
+        for col in range(cols):
+            block = raster[row * size:(row + 1) * size, col * size:(col + 1) * size]
+            valid = block[block != NODATA_CLASS]
+            if valid.size:
+                expected[row, col] = valid.max() if stat == "max" else valid.mean()
+    return expected
+
+
+@pytest.fixture(scope="module")
+def pyramid():
+    # Odd edges and small tiles exercise the padding and the tile seams
+    return Pyramid.build(random_raster((301, 259)), tile_shape=(50, 70))
+
+
+@pytest.mark.parametrize("stat", ["max", "mean"])
+def test_levels_match_brute_force(pyramid, stat):
+    assert pyramid.depth == 4
+    for level in range(pyramid.depth):
+        cells = pyramid.shape[0] * pyramid.shape[1] >> 2 * level
+        got_level, values = pyramid.view(stat=stat, max_cells=cells + pyramid.shape[0] + pyramid.shape[1])
+        assert got_level == level
+        np.testing.assert_allclose(values, reference_view(pyramid.raster, level, stat), rtol=1e-6)
+
+
+def test_nodata_blocks_are_nan(pyramid):
+    level, values = pyramid.view((0, 40), (0, 40), max_cells=16)
+    assert level == 3
+    assert np.isnan(values).all()
+
+
+def test_view_never_exceeds_max_cells():
+    pyramid = Pyramid.build(np.zeros((1100, 1100), dtype=np.uint8))
+    # 513 cells starting at an odd offset touch a partial block at both ends
+    level, values = pyramid.view((1, 514), (1, 514))
+    assert values.size <= DEFAULT_MAX_CELLS
+    assert level == 2
+
+    rng = np.random.default_rng(1)
+    for _ in range(200):
+        row_start, col_start = rng.integers(0, 600, 2)
+        rows, cols = rng.integers(1, 500, 2)
+        max_cells = int(rng.integers(1_000, 70_000))
+        level, values = pyramid.view((row_start, row_start + rows), (col_start, col_start + cols), max_cells=max_cells)
+        if level < pyramid.depth - 1:
+            assert values.size <= max_cells
+        if level > 0:
+            # The next finer level would not have fitted
+            finer = pyramid.view((row_start, row_start + rows), (col_start, col_start + cols), max_cells=values.size - 1)
+            assert finer[0] >= level
+
+
+def test_saved_pyramid_loads(tmp_path, pyramid):
+    path = str(tmp_path / "hopper.npy")
+    np.save(path, np.asarray(pyramid.raster))
+    pyramid.save(f"{path}.pyramid.npz")
+    loaded = load_pyramid(path)
+    assert loaded.depth == pyramid.depth
+    for loaded_level, level in zip(loaded.levels, pyramid.levels):
+        for loaded_array, array in zip(loaded_level, level):
+            np.testing.assert_array_equal(loaded_array, array)
+
+
+def test_time_stacked_raster_maps_last_slice(tmp_path):
+    stacked = np.stack([random_raster((200, 200), seed) for seed in range(3)])
+    path = str(tmp_path / "hopper.npy")
+    np.save(path, stacked)
+    pyramid = load_pyramid(path)
+    assert pyramid.shape == (200, 200)
+    np.testing.assert_array_equal(pyramid.view(max_cells=200 * 200)[1], reference_view(stacked[-1], 0, "max"))
+
+
+def run_app_with_raster(tmp_path, monkeypatch, raster):
+    from streamlit.testing.v1 import AppTest
+
+    np.save(tmp_path / f"{stage_slug(list(rules)[0])}.npy", raster)
+    monkeypatch.setenv("LOCAST_RASTER_DIR", str(tmp_path))
+    app = AppTest.from_file(APP_PATH, default_timeout=60)
+    app.run()
+    assert not app.exception
+    return app
+
+
+def test_app_maps_time_stacked_raster(tmp_path, monkeypatch):
+    app = run_app_with_raster(tmp_path, monkeypatch, np.stack([random_raster((200, 200), seed) for seed in range(3)]))
+    assert not any("Could not open" in warning.value for warning in app.warning)
+    assert any(subheader.value.startswith("🗺️ Danger Map") for subheader in app.subheader)
+
+
+def test_app_warns_about_unreadable_raster(tmp_path, monkeypatch):
+    app = run_app_with_raster(tmp_path, monkeypatch, np.zeros((200, 200), dtype=np.float32))
+    assert any("Could not open the danger map raster" in warning.value for warning in app.warning)
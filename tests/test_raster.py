@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+
+from locast import danger_levels, param_ranges, rules, score_batch
+from locast.raster import NODATA_CLASS, open_class_raster, open_grid, score_raster, write_header
+
+STAGE = "Hopper"
+NODATA = -9999.0
+
+
+def random_grids(shape, seed=0):
+    rng = np.random.default_rng(seed)
+    grids = {}
+    for param in rules[STAGE].params:
+        low, high = param_ranges[param]
+        grids[param] = rng.uniform(low, high, shape)
+        # Exact bounds are the cells most likely to be scored differently
+        rule = rules[STAGE][param]
+        grids[param].flat[::11] = rule.lower
+        grids[param].flat[5::13] = rule.upper
+    return grids
+
+
+def save_grids(tmp_path, grids, raw=()):
+    """Save grids as .npy, or raw float32 binaries with a nodata header for the parameters in raw"""
+    paths = {}
+    for index, (param, grid) in enumerate(grids.items()):
+        if param in raw:
+            path = str(tmp_path / f"grid{index}.bin")
+            grid.astype(np.float32).tofile(path)
+            write_header(path, grid.shape, np.float32, nodata=NODATA)
+        else:
+            path = str(tmp_path / f"grid{index}.npy")
+            np.save(path, grid)
+        paths[param] = path
+    return paths
+
+
+def expected_classes(grids, missing):
+    _, _, danger_class = score_batch(grids, STAGE)
+    return np.where(missing, NODATA_CLASS, danger_class)
+
+
+def assert_counts(counts, classes):
+    for index, (level, _, _) in enumerate(danger_levels):
+        assert counts[level] == np.count_nonzero(classes == index)
+    assert counts["NO DATA"] == np.count_nonzero(classes == NODATA_CLASS)
+
+
+@pytest.mark.parametrize("output", ["danger.npy", "danger.bin"])
+def test_tiles_match_score_batch_with_nodata(tmp_path, output):
+    shape = (37, 53)
+    grids = random_grids(shape)
+    raw_param, nan_param = rules[STAGE].params[:2]
+    rng = np.random.default_rng(1)
+    # float32 files: compare against the values as stored
+    grids[raw_param] = grids[raw_param].astype(np.float32).astype(np.float64)
+    grids[raw_param][rng.uniform(size=shape) < 0.1] = NODATA
+    grids[nan_param][rng.uniform(size=shape) < 0.1] = np.nan
+    missing = (grids[raw_param] == NODATA) | np.isnan(grids[nan_param])
+
+    paths = save_grids(tmp_path, grids, raw=(raw_param,))
+    counts = score_raster(paths, STAGE, str(tmp_path / output), tile_shape=(8, 16))
+    classes = open_class_raster(str(tmp_path / output))
+    assert classes.dtype == np.uint8
+    np.testing.assert_array_equal(classes, expected_classes(grids, missing))
+    assert_counts(counts, np.asarray(classes))
+
+
+def test_time_stacked_grids(tmp_path):
+    grids = random_grids((3, 20, 30), seed=2)
+    grids[rules[STAGE].params[0]][1, 4:9, 4:9] = np.nan
+    missing = np.isnan(grids[rules[STAGE].params[0]])
+
+    counts = score_raster(save_grids(tmp_path, grids), STAGE, str(tmp_path / "danger.npy"), tile_shape=(7, 7))
+    classes = open_class_raster(str(tmp_path / "danger.npy"))
+    assert classes.shape == (3, 20, 30)
+    np.testing.assert_array_equal(classes, expected_classes(grids, missing))
+    assert_counts(counts, np.asarray(classes))
+
+
+def test_grids_must_match(tmp_path):
+    grids = random_grids((10, 10))
+    paths = save_grids(tmp_path, grids)
+    np.save(paths[rules[STAGE].params[-1]], np.zeros((10, 11)))
+    with pytest.raises(ValueError, match="shape"):
+        score_raster(paths, STAGE, str(tmp_path / "danger.npy"))
+    del paths[rules[STAGE].params[-1]]
+    with pytest.raises(ValueError, match="No grid given"):
+        score_raster(paths, STAGE, str(tmp_path / "danger.npy"))
+
+
+def test_raw_grid_header(tmp_path):
+    path = str(tmp_path / "grid.bin")
+    np.arange(6, dtype=np.int16).tofile(path)
+    write_header(path, (2, 3), np.int16, nodata=-1)
+    grid, nodata = open_grid(path)
+    assert nodata == -1
+    np.testing.assert_array_equal(grid, np.arange(6).reshape(2, 3))
@@ -0,0 +1,138 @@
+"""Every batch scoring path must agree with calculate_suitability row for row."""
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from locast import calculate_suitability, danger_levels, rules, score_all_stages, score_batch
+from locast.lut import score_batch_lut
+from locast.parallel import score_parallel
+from locast.profiles import load_profile
+from locast.store import ScoreStore
+
+PROFILES = {"builtin": rules, "thar": load_profile(str(Path(__file__).parent.parent / "profiles" / "thar.toml"))}
+
+ROWS = 3000
+
+
+def candidate_values(rule):
+    """Readings worth checking for one parameter: bounds, their neighbours and special values"""
+    edges = [rule.lower, rule.upper]
+    neighbours = [np.nextafter(rule.lower, -np.inf), np.nextafter(rule.upper, np.inf)]
+    special = [np.nan, -0.0, 0.0, np.inf, -np.inf]
+    in_range = np.linspace(rule.range_min, rule.range_max, 7).tolist()
+    return np.array(edges + neighbours + special + in_range)
+
+
+def random_columns(profile, rows=ROWS, seed=0):
+    """Columns for every parameter, mixing candidate values with uniform readings"""
+    rng = np.random.default_rng(seed)
+    columns = {}
+    for param in profile.parameters:
+        # Any stage's rule gives the display range; every stage's bounds are candidates
+        stage_rules = [profile[stage][param] for stage in profile if param in profile[stage].params]
+        candidates = np.concatenate([candidate_values(rule) for rule in stage_rules])
+        picked = rng.choice(candidates, rows)
+        uniform = rng.uniform(stage_rules[0].range_min, stage_rules[0].range_max, rows)
+        columns[param] = np.where(rng.uniform(size=rows) < 0.7, picked, uniform)
+    return columns
+
+
+def reference(columns, stage, profile):
+    """Optimal counts, percentages and classes from the scalar functions"""
+    stage_rules = profile[stage]
+    params = stage_rules.params
+    optimal_count, danger_class = [], []
+    for row in range(len(columns[params[0]])):
+        inputs = {param: float(columns[param][row]) for param in params}
+        optimal_count.append(sum(stage_rules[param].is_optimal(inputs[param]) for param in params))
+        danger_class.append(danger_levels.index(calculate_suitability(inputs, stage, profile)))
+    optimal_count = np.array(optimal_count)
+    return optimal_count, optimal_count / len(params) * 100, np.array(danger_class)
+
+
+def stage_columns(columns, stage, profile):
+    return {param: columns[param] for param in profile[stage].params}
+
+
+def assert_matches(result, expected):
+    optimal_count, danger_percentage, danger_class = result
+    np.testing.assert_array_equal(optimal_count, expected[0])
+    np.testing.assert_array_equal(danger_percentage, expected[1])
+    np.testing.assert_array_equal(danger_class, expected[2])
+
+
+@pytest.fixture(scope="module", params=list(PROFILES))
+def case(request):
+    profile = PROFILES[request.param]
+    columns = random_columns(profile)
+    expected = {stage: reference(stage_columns(columns, stage, profile), stage, profile) for stage in profile}
+    return profile, columns, expected
+
+
+def test_candidate_values_are_covered(case):
+    profile, columns, _ = case
+    for param, values in columns.items():
+        assert np.isnan(values).any(), param
+        assert (np.signbit(values) & (values == 0)).any(), param
+
+
+def test_score_batch(case):
+    profile, columns, expected = case
+    for stage in profile:
+        assert_matches(score_batch(stage_columns(columns, stage, profile), stage, profile), expected[stage])
+
+
+def test_score_batch_grid_shape(case):
+    profile, columns, expected = case
+    for stage in profile:
+        grid = {param: values.reshape(60, 50) for param, values in stage_columns(columns, stage, profile).items()}
+        result = score_batch(grid, stage, profile)
+        assert_matches([array.ravel() for array in result], expected[stage])
+
+
+def test_score_all_stages(case):
+    profile, columns, expected = case
+    stages, danger_percentage, danger_class = score_all_stages(columns, profile=profile)
+    assert stages == list(profile)
+    for index, stage in enumerate(stages):
+        np.testing.assert_array_equal(danger_percentage[index], expected[stage][1])
+        np.testing.assert_array_equal(danger_class[index], expected[stage][2])
+
+
+def test_score_parallel(case):
+    profile, columns, expected = case
+    for stage in profile:
+        result = score_parallel(stage_columns(columns, stage, profile), stage, workers=2, chunk_size=700, profile=profile)
+        assert_matches(result, expected[stage])
+
+
+def test_score_batch_lut(case):
+    profile, columns, expected = case
+    for stage in profile:
+        assert_matches(score_batch_lut(stage_columns(columns, stage, profile), stage, profile), expected[stage])
+
+
+def test_score_store(case, tmp_path):
+    profile, columns, expected = case
+    with ScoreStore(str(tmp_path / "scores.sqlite")) as store:
+        for stage in profile:
+            # First pass scores and stores every row, the second is served from the store
+            for _ in range(2):
+                assert_matches(store.score(stage_columns(columns, stage, profile), stage, profile), expected[stage])
+        assert store.misses > 0 and store.hits > 0
+
+        stages, danger_percentage, danger_class = store.score_all_stages(columns, profile=profile)
+        for index, stage in enumerate(stages):
+            np.testing.assert_array_equal(danger_class[index], expected[stage][2])
+
+
+def test_negative_zero_scores_like_zero():
+    stage = "Hopper"
+    params = rules[stage].params
+    for param in params:
+        columns = {other: np.full(2, rules[stage][other].lower) for other in params}
+        columns[param] = np.array([0.0, -0.0])
+        optimal_count, _, _ = score_batch(columns, stage)
+        assert optimal_count[0] == optimal_count[1]
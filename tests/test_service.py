@@ -0,0 +1,145 @@
+import asyncio
+import json
+
+import numpy as np
+import pytest
+
+from locast import calculate_suitability, danger_levels, param_ranges, rules
+from locast.http import ConnectionPool
+from locast.service import ScoringService
+
+STAGE = "Hopper"
+
+
+def random_readings(count, seed=0):
+    rng = np.random.default_rng(seed)
+    return [
+        {param: float(rng.uniform(*param_ranges[param])) for param in rules[STAGE].params}
+        for _ in range(count)
+    ]
+
+
+def run_with_service(exchange, **options):
+    """Start a service on a free port, run exchange(service, base URL, pool) against it and stop it"""
+
+    async def main():
+        service = ScoringService(**options)
+        scorer, server = await service.start(port=0)
+        port = server.sockets[0].getsockname()[1]
+        pool = ConnectionPool(per_host=50)
+        try:
+            return await exchange(service, f"http://127.0.0.1:{port}", pool)
+        finally:
+            pool.close()
+            scorer.cancel()
+            server.close()
+
+    return asyncio.run(main())
+
+
+def test_concurrent_requests_are_batched_and_match_scalar_scoring():
+    readings = random_readings(200)
+
+    async def exchange(service, url, pool):
+        replies = await asyncio.gather(*(
+            pool.request("POST", f"{url}/score", {"stage": STAGE, "readings": values}) for values in readings
+        ))
+        return replies, await pool.get_json(f"{url}/health")
+
+    replies, health = run_with_service(exchange, max_delay=0.02)
+    for (status, body), values in zip(replies, readings):
+        assert status == 200
+        verdict = json.loads(body)
+        level = calculate_suitability(values, STAGE)
+        assert verdict["level"] == level[0]
+        assert verdict["danger_class"] == danger_levels.index(level)
+    assert health["requests"] == health["readings"] == 200
+    assert health["batches"] < 200
+    assert health["mean_batch_size"] > 1
+    assert set(health["latency_ms"]) == {"p50", "p90", "p99"}
+
+
+def test_list_body_gets_list_of_verdicts():
+    readings = random_readings(3, seed=1)
+
+    async def exchange(service, url, pool):
+        return await pool.request("POST", f"{url}/score", [{"stage": STAGE, "readings": values} for values in readings])
+
+    status, body = run_with_service(exchange)
+    assert status == 200
+    assert [verdict["level"] for verdict in json.loads(body)] == [
+        calculate_suitability(values, STAGE)[0] for values in readings
+    ]
+
+
+def bad_requests():
+    readings = random_readings(1)[0]
+    param = rules[STAGE].params[0]
+    yield b"{not json"
+    yield b"\xff\xfe"
+    yield b"[1]"
+    yield json.dumps({"stage": "Adult", "readings": readings}).encode()
+    yield json.dumps({"stage": STAGE}).encode()
+    yield json.dumps({"stage": STAGE, "readings": {**readings, param: "wet"}}).encode()
+    yield json.dumps({"stage": STAGE, "readings": {**readings, param: True}}).encode()
+    yield json.dumps({"stage": STAGE, "readings": {p: v for p, v in readings.items() if p != param}}).encode()
+    yield json.dumps({"stage": STAGE, "readings": {**readings, param: float("nan")}}).encode()
+    yield json.dumps({"stage": STAGE, "readings": {**readings, param: float("inf")}}).encode()
+    yield json.dumps({"stage": STAGE, "readings": readings})[:-2].encode() + b", \"" + param.encode() + b"\": " + b"9" * 400 + b"}}"
+    yield json.dumps([{"stage": STAGE, "readings": readings}, {"stage": STAGE, "readings": {}}]).encode()
+
+
+@pytest.mark.parametrize("body", list(bad_requests()))
+def test_bad_requests_get_400(body):
+    async def exchange(service, url, pool):
+        reader, writer = await asyncio.open_connection(*url[len("http://"):].split(":"))
+        writer.write(b"POST /score HTTP/1.1\r\nHost: test\r\nConnection: close\r\nContent-Length: %d\r\n\r\n%s" % (len(body), body))
+        await writer.drain()
+        reply = await reader.read()
+        writer.close()
+        health = await pool.get_json(f"{url}/health")
+        return reply, health
+
+    reply, health = run_with_service(exchange)
+    assert reply.startswith(b"HTTP/1.1 400 ")
+    assert b'"error"' in reply
+    # Nothing from a rejected body is scored
+    assert health["rejected"] == 1 and health["readings"] == 0
+
+
+def test_chunked_body():
+    values = random_readings(1, seed=2)[0]
+    body = json.dumps({"stage": STAGE, "readings": values}).encode()
+    chunks = [body[:10], body[10:25], body[25:]]
+
+    async def exchange(service, url, pool):
+        reader, writer = await asyncio.open_connection(*url[len("http://"):].split(":"))
+        writer.write(b"POST /score HTTP/1.1\r\nHost: test\r\nTransfer-Encoding: chunked\r\nConnection: close\r\n\r\n")
+        for chunk in chunks:
+            writer.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+        reply = await reader.read()
+        writer.close()
+        return reply
+
+    reply = run_with_service(exchange)
+    head, _, payload = reply.partition(b"\r\n\r\n")
+    assert head.startswith(b"HTTP/1.1 200 ")
+    assert json.loads(payload)["level"] == calculate_suitability(values, STAGE)[0]
+
+
+def test_routes_and_methods():
+    async def exchange(service, url, pool):
+        return [
+            (await pool.request("GET", f"{url}/score"))[0],
+            (await pool.request("POST", f"{url}/health", {}))[0],
+            (await pool.request("GET", f"{url}/nowhere"))[0],
+            await pool.get_json(f"{url}/health"),
+        ]
+
+    score_get, health_post, missing, health = run_with_service(exchange)
+    assert (score_get, health_post, missing) == (405, 405, 404)
+    assert health["status"] == "ok"
+    assert health["profile"] == rules.name
+    assert health["requests"] == 0 and health["latency_ms"] == {}
@@ -0,0 +1,51 @@
+import sqlite3
+
+import numpy as np
+
+from locast import rules, score_batch
+from locast import store as store_module
+from locast.store import ScoreStore
+
+STAGE = "Hopper"
+
+
+def random_columns(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    return {param: rng.uniform(0, 40, rows).round(1) for param in rules[STAGE].params}
+
+
+def test_colliding_keys_are_scored_not_served(tmp_path, monkeypatch):
+    # Every reading hashes to one of two keys, so nearly every lookup collides
+    monkeypatch.setattr(store_module, "reading_keys", lambda columns, params, seed: (
+        np.arange(np.size(columns[params[0]]), dtype=np.int64) % 2
+    ))
+    with ScoreStore(str(tmp_path / "scores.sqlite")) as store:
+        for seed in range(3):
+            columns = random_columns(50, seed)
+            for _ in range(2):
+                np.testing.assert_array_equal(store.score(columns, STAGE)[0], score_batch(columns, STAGE)[0])
+        assert store.collisions > 0
+        assert len(store) == 2
+
+
+def test_unchanged_readings_are_served(tmp_path):
+    columns = random_columns(1000)
+    with ScoreStore(str(tmp_path / "scores.sqlite")) as store:
+        store.score(columns, STAGE)
+        changed = {param: values.copy() for param, values in columns.items()}
+        changed["Rainfall"][:10] += 0.5
+        np.testing.assert_array_equal(store.score(changed, STAGE)[0], score_batch(changed, STAGE)[0])
+        assert store.misses == 1000 + 10
+        assert store.hits == 990
+        assert store.collisions == 0
+
+
+def test_stores_without_readings_start_afresh(tmp_path):
+    path = str(tmp_path / "scores.sqlite")
+    with sqlite3.connect(path) as connection:
+        connection.execute("CREATE TABLE scores (key INTEGER PRIMARY KEY, optimal_count INTEGER NOT NULL)")
+        connection.execute("INSERT INTO scores VALUES (1, 3)")
+    with ScoreStore(path) as store:
+        assert len(store) == 0
+        columns = random_columns(10)
+        np.testing.assert_array_equal(store.score(columns, STAGE)[0], score_batch(columns, STAGE)[0])
@@ -0,0 +1,93 @@
+import warnings
+
+import numpy as np
+import pytest
+
+from locast.timeseries import RollingWindow
+
+PARAMS = ["Rainfall", "Air Temperature", "Surface Wind Speed"]
+
+
+def reference_aggregates(days, window):
+    """Brute-force aggregates over the trailing window, ignoring missing readings"""
+    recent = {param: np.array(values[-window:]) for param, values in days.items()}
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN windows
+        rainfall_seen = np.isfinite(recent["Rainfall"]).any(axis=0)
+        return {
+            "Rainfall": np.where(rainfall_seen, np.nansum(recent["Rainfall"], axis=0), np.nan),
+            "Air Temperature": np.nanmean(recent["Air Temperature"], axis=0),
+            "Surface Wind Speed": np.nanmax(recent["Surface Wind Speed"], axis=0),
+        }
+
+
+def assert_aggregates(rolling, days):
+    expected = reference_aggregates(days, rolling.window)
+    actual = rolling.aggregates()
+    for param in PARAMS:
+        np.testing.assert_allclose(actual[param], expected[param], err_msg=param)
+
+
+def test_gap_leaves_window_with_the_missing_day():
+    rolling = RollingWindow(PARAMS, 1, window=3)
+    days = {param: [] for param in PARAMS}
+    for day in range(8):
+        value = np.nan if day == 0 else float(day)
+        readings = {param: np.array([value]) for param in PARAMS}
+        rolling.push(readings)
+        for param in PARAMS:
+            days[param].append(readings[param])
+        assert_aggregates(rolling, days)
+    # Day 0 is long gone: nothing is NaN any more
+    assert rolling.aggregates()["Rainfall"][0] == 5 + 6 + 7
+
+
+def test_all_missing_window_is_nan():
+    rolling = RollingWindow(PARAMS, 2, window=2)
+    for _ in range(3):
+        rolling.push({param: np.array([np.nan, 1.0]) for param in PARAMS})
+    aggregates = rolling.aggregates()
+    for param in PARAMS:
+        assert np.isnan(aggregates[param][0])
+    assert aggregates["Rainfall"][1] == 2.0
+    assert aggregates["Air Temperature"][1] == 1.0
+    assert aggregates["Surface Wind Speed"][1] == 1.0
+
+
+@pytest.mark.parametrize("window", [1, 3, 7])
+def test_random_gaps_match_reference(window, tmp_path):
+    rng = np.random.default_rng(window)
+    rolling = RollingWindow(PARAMS, 20, window=window)
+    days = {param: [] for param in PARAMS}
+    for day in range(40):
+        readings = {}
+        for param in PARAMS:
+            values = rng.uniform(0, 30, 20)
+            values[rng.uniform(size=20) < 0.3] = np.nan
+            readings[param] = values
+            days[param].append(values)
+        rolling.push(readings)
+        if day == 17:
+            rolling.save(tmp_path / "window.npz")
+            rolling, _ = RollingWindow.load(tmp_path / "window.npz")
+        assert_aggregates(rolling, days)
+
+
+def test_added_locations_start_empty(tmp_path):
+    rng = np.random.default_rng(5)
+    rolling = RollingWindow(PARAMS, 3, window=4)
+    days = {param: [] for param in PARAMS}
+    for day in range(10):
+        if day in (2, 6):
+            rolling.add_locations(2)
+            for param in PARAMS:
+                days[param] = [np.concatenate([values, np.full(2, np.nan)]) for values in days[param]]
+        if day == 7:
+            rolling.save(tmp_path / "window.npz")
+            rolling, _ = RollingWindow.load(tmp_path / "window.npz")
+        readings = {param: rng.uniform(0, 30, rolling.n_locations) for param in PARAMS}
+        rolling.push(readings)
+        for param in PARAMS:
+            days[param].append(readings[param])
+        assert_aggregates(rolling, days)
+    assert rolling.n_locations == 7